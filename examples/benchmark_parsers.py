@@ -0,0 +1,126 @@
+import argparse
+import time
+import tracemalloc
+
+from resource_tracker.procfs_parsers import (
+    SystemRecord,
+    parse_meminfo,
+    parse_net_dev,
+    parse_stat,
+)
+from resource_tracker.tracker_procfs import ProcFile
+
+
+def parse_stat_text(content):
+    """Parse the aggregated CPU times from `/proc/stat` by splitting lines."""
+    for line in content.splitlines():
+        if line.startswith("cpu "):
+            cpu_stats = line.split()
+            return int(cpu_stats[1]), int(cpu_stats[2]), int(cpu_stats[3])
+
+
+def parse_meminfo_text(content):
+    """Parse `/proc/meminfo` into a dictionary by splitting lines."""
+    mem_info = {}
+    for line in content.splitlines():
+        parts = line.split(":")
+        if len(parts) == 2:
+            value_parts = parts[1].strip().split()
+            if len(value_parts) > 0:
+                try:
+                    mem_info[parts[0].strip()] = int(value_parts[0])
+                except ValueError:
+                    pass
+    return mem_info
+
+
+def parse_net_dev_text(content):
+    """Parse the total network traffic from `/proc/net/dev` by splitting lines."""
+    recv_bytes = sent_bytes = 0
+    for line in content.splitlines()[2:]:
+        parts = line.split(":")
+        if len(parts) == 2 and parts[0].strip() != "lo":
+            values = parts[1].strip().split()
+            recv_bytes += int(values[0])
+            sent_bytes += int(values[8])
+    return recv_bytes, sent_bytes
+
+
+def measure(fn, iterations):
+    """Measure the average time and peak temporary memory usage of a function.
+
+    Args:
+        fn: The function to call without arguments.
+        iterations: Number of times to call the function.
+
+    Returns:
+        Tuple of the average execution time in seconds and the peak memory
+        allocated during a single call in bytes.
+    """
+    start_time = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    elapsed = (time.perf_counter() - start_time) / iterations
+
+    tracemalloc.start()
+    current, _ = tracemalloc.get_traced_memory()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak - current
+
+
+def benchmark_parsers(iterations=1000):
+    """Benchmark the byte-level procfs parsers against splitting decoded text.
+
+    Both variants reread the same open files into a reused buffer, so only
+    the cost of decoding and parsing differs.
+
+    Args:
+        iterations: Number of iterations for each parser.
+
+    Returns:
+        Dictionary mapping file paths to the average execution times and
+        peak temporary memory usage of both parsers.
+    """
+    record = SystemRecord()
+    parsers = {
+        "/proc/stat": (parse_stat, parse_stat_text),
+        "/proc/meminfo": (parse_meminfo, parse_meminfo_text),
+        "/proc/net/dev": (parse_net_dev, parse_net_dev_text),
+    }
+    results = {}
+    for path, (parse_bytes, parse_text) in parsers.items():
+        file = ProcFile(path)
+        try:
+            result = {}
+            result["text"] = measure(lambda: parse_text(file.read()), iterations)
+            result["bytes"] = measure(
+                lambda: parse_bytes(file.buffer, file.readinto(), record), iterations
+            )
+        finally:
+            file.close()
+        results[path] = result
+        print(
+            f"{path:<14} "
+            + ", ".join(
+                f"{name} {elapsed * 1e6:.1f} us ({peak / 1024:.1f} KiB peak)"
+                for name, (elapsed, peak) in result.items()
+            )
+        )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark byte-level procfs parsers against text parsing"
+    )
+    parser.add_argument(
+        "--iterations",
+        type=int,
+        default=1000,
+        help="Number of iterations for benchmarking (default: 1000)",
+    )
+    args = parser.parse_args()
+
+    benchmark_parsers(iterations=args.iterations)
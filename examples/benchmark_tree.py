@@ -0,0 +1,107 @@
+import argparse
+import os
+import subprocess
+import time
+
+from resource_tracker.helpers import is_psutil_available
+from resource_tracker.tracker_procfs import (
+    get_process_stats as get_process_stats_procfs,
+)
+
+
+def spawn_children(n):
+    """Start `n` idle child processes of the current process.
+
+    Args:
+        n: Number of child processes to start.
+
+    Returns:
+        List of `subprocess.Popen` objects.
+    """
+    return [subprocess.Popen(["sleep", "600"]) for _ in range(n)]
+
+
+def time_get_process_stats(get_process_stats, pid, iterations=10):
+    """Measure the average time of collecting process-level stats.
+
+    Args:
+        get_process_stats: The `get_process_stats` implementation to benchmark.
+        pid: Process ID to analyze.
+        iterations: Number of times to run the implementation for averaging.
+
+    Returns:
+        Average execution time in seconds.
+    """
+    times = []
+    for _ in range(iterations):
+        start_time = time.perf_counter()
+        get_process_stats(pid)
+        times.append(time.perf_counter() - start_time)
+    return sum(times) / iterations
+
+
+def benchmark_tree_sizes(sizes=(0, 10, 50, 100, 300), iterations=10):
+    """Benchmark how the cost of `get_process_stats` grows with the size of the process tree.
+
+    Args:
+        sizes: Number of child processes to benchmark with.
+        iterations: Number of iterations for each tree size.
+
+    Returns:
+        List of dictionaries with the tree size and average execution times.
+    """
+    implementations = {"procfs": get_process_stats_procfs}
+    if is_psutil_available():
+        from resource_tracker.tracker_psutil import (
+            get_process_stats as get_process_stats_psutil,
+        )
+
+        implementations["psutil"] = get_process_stats_psutil
+
+    pid = os.getpid()
+    results = []
+    children = []
+    try:
+        for size in sorted(sizes):
+            children += spawn_children(size - len(children))
+            result = {"processes": size + 1}
+            for name, get_process_stats in implementations.items():
+                result[name] = time_get_process_stats(
+                    get_process_stats, pid, iterations
+                )
+            results.append(result)
+            print(
+                f"{size + 1:>5} processes: "
+                + ", ".join(
+                    f"{name} {result[name] * 1000:.2f} ms "
+                    f"({result[name] * 1e6 / (size + 1):.1f} us/process)"
+                    for name in implementations
+                )
+            )
+    finally:
+        for child in children:
+            child.kill()
+            child.wait()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark process-level stats collection by process tree size"
+    )
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[0, 10, 50, 100, 300],
+        help="Number of child processes to benchmark with (default: 0 10 50 100 300)",
+    )
+    parser.add_argument(
+        "--iterations",
+        type=int,
+        default=10,
+        help="Number of iterations for benchmarking (default: 10)",
+    )
+    args = parser.parse_args()
+
+    benchmark_tree_sizes(sizes=args.sizes, iterations=args.iterations)
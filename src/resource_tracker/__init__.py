@@ -1,12 +1,19 @@
 """
 Resource Tracker package for monitoring resource usage, detecting cloud environments, and more.
+
+The public API is imported lazily on first access, so that e.g. the
+[resource_tracker.agent][] entry point only loads the collectors.
 """
 
+from importlib import import_module
 from logging import NullHandler, getLogger
+from typing import TYPE_CHECKING
 
-from .cloud_info import get_cloud_info
-from .server_info import get_server_info
-from .tracker import ProcessTracker, ResourceTracker, SystemTracker
+if TYPE_CHECKING:
+    from .cloud_info import get_cloud_info
+    from .server_info import get_server_info
+    from .tracker import ResourceTracker
+    from .trackers import CombinedTracker, ProcessTracker, SystemTracker
 
 logger = getLogger(__name__)
 logger.addHandler(NullHandler())
@@ -15,7 +22,25 @@ __all__ = [
     "ProcessTracker",
     "SystemTracker",
     "ResourceTracker",
+    "CombinedTracker",
     "get_cloud_info",
     "get_server_info",
     "ProcessTracker",
 ]
+
+# the submodule of each lazily imported public object
+_LAZY_IMPORTS = {
+    "ProcessTracker": "trackers",
+    "SystemTracker": "trackers",
+    "CombinedTracker": "trackers",
+    "ResourceTracker": "tracker",
+    "get_cloud_info": "cloud_info",
+    "get_server_info": "server_info",
+}
+
+
+def __getattr__(name: str):
+    """Import the public objects of the package on first access."""
+    if name in _LAZY_IMPORTS:
+        return getattr(import_module(f".{_LAZY_IMPORTS[name]}", __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
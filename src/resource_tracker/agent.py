@@ -0,0 +1,59 @@
+"""
+Lean entry point to run a tracker in a new Python process.
+
+Only imports the trackers and their collector backends (see
+[resource_tracker.trackers][]), so it starts quickly and keeps a small resident
+memory footprint, independently of the modules loaded in the tracked process.
+Used by [resource_tracker.ResourceTracker][] with `method="agent"`, but can be
+also started manually, e.g. to track the system-wide resource usage into a file:
+
+```sh
+python -m resource_tracker.agent system '{"output_file": "system.csv"}'
+```
+
+The first argument is the tracker type ("process", "system" or "combined"), and
+the optional second argument is a JSON object of keyword arguments passed to
+the [resource_tracker.ProcessTracker][], [resource_tracker.SystemTracker][] or
+[resource_tracker.CombinedTracker][] class.
+"""
+
+from json import loads
+from signal import SIGINT, SIGTERM, signal
+from sys import argv, exit, stderr
+from typing import List, Optional
+
+from .trackers import CombinedTracker, ProcessTracker, SystemTracker
+
+TRACKERS = {
+    "process": ProcessTracker,
+    "system": SystemTracker,
+    "combined": CombinedTracker,
+}
+
+
+def main(args: Optional[List[str]] = None):
+    """Parse the command-line arguments and run the tracker until terminated.
+
+    Args:
+        args: The command-line arguments. Defaults to `sys.argv[1:]`.
+    """
+    args = argv[1:] if args is None else args
+    if not args or args[0] not in TRACKERS or len(args) > 2:
+        print(
+            f"Usage: python -m {__package__}.agent {{{','.join(TRACKERS)}}} [JSON]",
+            file=stderr,
+        )
+        exit(2)
+
+    def signal_handler(signum, frame):
+        # exit via an exception to close the output file and GPU monitors
+        exit(0)
+
+    signal(SIGTERM, signal_handler)
+    signal(SIGINT, signal_handler)
+    kwargs = loads(args[1]) if len(args) > 1 else {}
+    TRACKERS[args[0]](**kwargs)
+
+
+if __name__ == "__main__":
+    main()
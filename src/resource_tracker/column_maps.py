@@ -5,6 +5,8 @@ HUMAN_NAMES_MAPPING = {
     "timestamp": "Timestamp",
     # system-level metrics
     "processes": "processes",
+    "procs_running": "runnable tasks",
+    "procs_blocked": "blocked tasks",
     "utime": "CPU time (user)",
     "stime": "CPU time (system)",
     "cpu_usage": "CPU usage",
@@ -28,6 +30,36 @@ HUMAN_NAMES_MAPPING = {
     "pid": "PID",
     "children": "children",
     "memory_mib": "memory usage",
+    "memory_pss_share": "memory share read as PSS",
+    "run_queue_wait": "run queue wait",
+    # sampling diagnostics
+    "sample_latency_ms": "sample latency",
+    "schedule_lag_ms": "schedule lag",
+    # resource usage of the tracker itself
+    "tracker_cpu_usage": "tracker CPU usage",
+    "tracker_memory_mib": "tracker memory usage",
+    "tracker_disk_read_bytes": "tracker disk read",
+    "tracker_disk_write_bytes": "tracker disk write",
+}
+
+"""Mapping of the per-GPU metrics to human-readable names, reported in the `gpu{index}_{metric}` columns with `gpu_columns="per_device"`."""
+GPU_DEVICE_COLUMNS = {
+    "usage": "usage",
+    "vram_mib": "VRAM used",
+    "power_w": "power draw",
+    "sm_clock_mhz": "SM clock",
+    "pcie_rx_mib_s": "PCIe receive throughput",
+    "pcie_tx_mib_s": "PCIe transmit throughput",
+    "throttle_reasons": "throttle reasons",
+}
+
+"""Mapping of how to convert the per-GPU metrics to bytes."""
+GPU_DEVICE_BYTE_MAPPING = {
+    # MiB -> B
+    "vram_mib": 1024 * 1024,
+    # MiB/s -> B/s
+    "pcie_rx_mib_s": 1024 * 1024,
+    "pcie_tx_mib_s": 1024 * 1024,
 }
 
 """Mapping of how to convert column-specific values to bytes."""
@@ -41,6 +73,7 @@ BYTE_MAPPING = {
     "memory_active_mib": 1024 * 1024,
     "memory_inactive_mib": 1024 * 1024,
     "gpu_vram_mib": 1024 * 1024,
+    "tracker_memory_mib": 1024 * 1024,
     # GiB -> B
     "disk_space_total_gb": 1000 * 1000 * 1000,
     "disk_space_used_gb": 1000 * 1000 * 1000,
@@ -96,3 +129,109 @@ REPORT_CSV_MAPPING = {
     "gpu_utilized": ["Timestamp", "Process GPUs in use", "System GPUs in use"],
     "gpu_vram_mib": ["Timestamp", "Process VRAM used", "System VRAM used"],
 }
+
+"""Mapping of the per-GPU metrics used in the charts of the HTML report with `gpu_columns="per_device"`."""
+REPORT_GPU_DEVICE_MAPPING = {
+    "gpu_devices_usage": ["usage"],
+    "gpu_devices_vram": ["vram_mib"],
+    "gpu_devices_power": ["power_w"],
+    "gpu_devices_clock": ["sm_clock_mhz"],
+    "gpu_devices_pcie": ["pcie_rx_mib_s", "pcie_tx_mib_s"],
+}
+
+"""Groups of system-level metrics that can be collected at their own interval, with the keys of the collected stats and the reported columns."""
+SYSTEM_METRIC_GROUPS = {
+    "cpu": {
+        "stats": ("processes", "procs_running", "procs_blocked", "utime", "stime"),
+        "columns": (
+            "processes",
+            "procs_running",
+            "procs_blocked",
+            "utime",
+            "stime",
+            "cpu_usage",
+        ),
+    },
+    "memory": {
+        "stats": (
+            "memory_free_mib",
+            "memory_used_mib",
+            "memory_buffers_mib",
+            "memory_cached_mib",
+            "memory_active_mib",
+            "memory_inactive_mib",
+        ),
+        "columns": (
+            "memory_free_mib",
+            "memory_used_mib",
+            "memory_buffers_mib",
+            "memory_cached_mib",
+            "memory_active_mib",
+            "memory_inactive_mib",
+        ),
+    },
+    "disk_io": {
+        "stats": ("disk_stats",),
+        "columns": ("disk_read_bytes", "disk_write_bytes"),
+    },
+    "network": {
+        "stats": ("net_recv_bytes", "net_sent_bytes"),
+        "columns": ("net_recv_bytes", "net_sent_bytes"),
+    },
+    "disk_space": {
+        "stats": ("disk_spaces",),
+        "columns": (
+            "disk_space_total_gb",
+            "disk_space_used_gb",
+            "disk_space_free_gb",
+        ),
+    },
+    "gpu": {
+        "stats": ("gpu_usage", "gpu_vram_mib", "gpu_utilized", "gpu_devices"),
+        "columns": ("gpu_usage", "gpu_vram_mib", "gpu_utilized"),
+    },
+}
+
+"""Groups of process-level metrics that can be collected at their own interval, with the keys of the collected stats and the reported columns."""
+PROCESS_METRIC_GROUPS = {
+    "cpu": {
+        "stats": ("utime", "stime", "run_time", "run_queue_wait"),
+        "columns": ("utime", "stime", "cpu_usage", "run_queue_wait"),
+    },
+    "memory": {
+        "stats": ("memory_mib", "memory_pss_share"),
+        "columns": ("memory_mib", "memory_pss_share"),
+    },
+    "disk_io": {
+        "stats": ("disk_read_bytes", "disk_write_bytes"),
+        "columns": ("disk_read_bytes", "disk_write_bytes"),
+    },
+    "gpu": {
+        "stats": ("gpu_usage", "gpu_vram_mib", "gpu_utilized", "gpu_utilized_indexes"),
+        "columns": ("gpu_usage", "gpu_vram_mib", "gpu_utilized"),
+    },
+}
+
+"""Columns reporting the amount since the previous sample instead of a current value."""
+COUNTER_COLUMNS = {
+    "utime",
+    "stime",
+    "disk_read_bytes",
+    "disk_write_bytes",
+    "net_recv_bytes",
+    "net_sent_bytes",
+    "run_queue_wait",
+    "tracker_disk_read_bytes",
+    "tracker_disk_write_bytes",
+}
+
+"""Timing diagnostics of the sampling loop reported by all trackers, see [resource_tracker.helpers.SamplingClock][]."""
+SAMPLING_COLUMNS = ("sample_latency_ms", "schedule_lag_ms")
+
+"""Resource usage of the tracker itself reported by all trackers, see [resource_tracker.helpers.OverheadMeter][]."""
+OVERHEAD_COLUMNS = (
+    "tracker_cpu_usage",
+    "tracker_memory_mib",
+    "tracker_disk_read_bytes",
+    "tracker_disk_write_bytes",
+)
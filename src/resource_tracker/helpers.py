@@ -10,11 +10,40 @@ from functools import cache
 from glob import glob
 from importlib.util import find_spec
 from io import StringIO
-from multiprocessing import Process
 from os import unlink
-from re import search
+from re import match, search
 from subprocess import PIPE, Popen, TimeoutExpired
-from typing import Any, Callable, Dict, Iterable, List, Union
+from threading import Event, Thread, current_thread, main_thread
+from time import process_time, sleep, thread_time, time
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+if TYPE_CHECKING:
+    # not imported at runtime to keep the agent's startup fast
+    from multiprocessing import Process
+
+from .column_maps import (
+    BYTE_MAPPING,
+    COUNTER_COLUMNS,
+    GPU_DEVICE_BYTE_MAPPING,
+    GPU_DEVICE_COLUMNS,
+    HUMAN_NAMES_MAPPING,
+)
+
+HELPER_PIDS: Set[int] = set()
+"""PIDs of the long-lived or in-flight helper subprocesses (e.g. `nvidia-smi`,
+`zpool`) started by the trackers of the current process, excluded from the
+process-level metrics when the trackers run in threads of the tracked process."""
 
 
 @cache
@@ -65,28 +94,460 @@ def is_procfs_available() -> bool:
     return os.path.isdir("/proc") and os.access("/proc", os.R_OK)
 
 
-@cache
-def get_tracker_implementation() -> tuple[Callable, Callable]:
+TRACKER_IMPLEMENTATIONS = ("psutil", "procfs")
+"""Supported tracker implementations (collector backends)."""
+
+
+def is_tracker_implementation_available(implementation: str) -> bool:
+    """
+    Check if a tracker implementation is available on the system.
+
+    Args:
+        implementation: Name of the implementation, see [resource_tracker.helpers.TRACKER_IMPLEMENTATIONS][].
+
+    Returns:
+        bool: True if the implementation is available, False otherwise
+    """
+    if implementation == "psutil":
+        return is_psutil_available()
+    if implementation == "procfs":
+        return is_procfs_available()
+    return False
+
+
+def calibrate_tracker_implementations(
+    pid: Optional[int] = None, iterations: int = 5
+) -> Dict[str, float]:
+    """
+    Measure the cost of collecting stats with each available tracker implementation.
+
+    The process-level stats of `pid` (including its children) and the
+    system-wide stats are collected with each available implementation after
+    a warm-up call, skipping the GPU stats that are collected the same way in
+    all implementations.
+
+    Args:
+        pid: Process ID to calibrate against. Defaults to the current process.
+        iterations: Number of measured calls per implementation. Defaults to 5.
+
+    Returns:
+        Dictionary mapping the available implementations to the fastest time
+        of collecting both the process-level and the system-wide stats in seconds.
+    """
+    from importlib import import_module
+    from time import perf_counter
+
+    from .column_maps import PROCESS_METRIC_GROUPS, SYSTEM_METRIC_GROUPS
+
+    pid = os.getpid() if pid is None else pid
+    process_groups = set(PROCESS_METRIC_GROUPS) - {"gpu"}
+    system_groups = set(SYSTEM_METRIC_GROUPS) - {"gpu"}
+    timings = {}
+    for implementation in TRACKER_IMPLEMENTATIONS:
+        if not is_tracker_implementation_available(implementation):
+            continue
+        module = import_module(f".tracker_{implementation}", package=__package__)
+        elapsed = []
+        # the process might exit or the backend might not work on this system
+        with suppress(Exception):
+            for _ in range(iterations + 1):
+                start = perf_counter()
+                module.get_process_stats(pid, groups=process_groups)
+                module.get_system_stats(groups=system_groups)
+                elapsed.append(perf_counter() - start)
+        # drop the warm-up call
+        if len(elapsed) > 1:
+            timings[implementation] = round(min(elapsed[1:]), 6)
+    return timings
+
+
+def resolve_tracker_implementation(
+    implementation: Optional[str] = None, pid: Optional[int] = None
+) -> Tuple[str, Optional[Dict[str, float]]]:
+    """
+    Determine which tracker implementation to use.
+
+    Args:
+        implementation: Name of the implementation ("psutil" or "procfs"), or
+            "auto" to pick the faster one via
+            [resource_tracker.helpers.calibrate_tracker_implementations][].
+            Defaults to None, reading the `RESOURCE_TRACKER_IMPLEMENTATION`
+            environment variable, and falling back to psutil if installed,
+            otherwise procfs.
+        pid: Process ID to calibrate against in "auto" mode. Defaults to the current process.
+
+    Returns:
+        tuple: A tuple containing the name of the implementation and the
+            calibration timings (None unless calibrated).
+
+    Raises:
+        ValueError: If the implementation is not supported.
+        ImportError: If the implementation (or none in "auto" mode) is available.
+    """
+    if implementation is None:
+        implementation = os.environ.get("RESOURCE_TRACKER_IMPLEMENTATION") or None
+    if implementation is None:
+        implementation = "psutil" if is_psutil_available() else "procfs"
+    if implementation not in (*TRACKER_IMPLEMENTATIONS, "auto"):
+        raise ValueError(f"Unsupported tracker implementation: {implementation}")
+
+    timings = None
+    if implementation == "auto":
+        timings = calibrate_tracker_implementations(pid)
+        if not timings:
+            raise ImportError(
+                "No tracker implementation available - install psutil or use a Linux system with procfs."
+            )
+        implementation = min(timings, key=timings.get)
+    elif not is_tracker_implementation_available(implementation):
+        raise ImportError(
+            f"The {implementation} tracker implementation is not available - "
+            + (
+                "install psutil."
+                if implementation == "psutil"
+                else "use a Linux system with procfs."
+            )
+        )
+    return implementation, timings
+
+
+def get_tracker_implementation(
+    implementation: Optional[str] = None,
+) -> tuple[Callable, Callable]:
     """
     Determine which tracker implementation to use based on available system resources.
 
+    Args:
+        implementation: Name of the implementation ("psutil" or "procfs").
+            Defaults to None, resolved via
+            [resource_tracker.helpers.resolve_tracker_implementation][].
+
     Returns:
         tuple: A tuple containing (get_process_stats, get_system_stats) functions from the appropriate implementation module.
 
     Raises:
         ImportError: If no suitable implementation is available.
     """
-    if is_psutil_available():
+    if implementation not in TRACKER_IMPLEMENTATIONS:
+        implementation, _ = resolve_tracker_implementation(implementation)
+    if implementation == "psutil":
         from .tracker_psutil import get_process_stats, get_system_stats
-    elif is_procfs_available():
-        from .tracker_procfs import get_process_stats, get_system_stats
     else:
-        raise ImportError(
-            "No tracker implementation available - install psutil or use a Linux system with procfs."
-        )
+        from .tracker_procfs import get_process_stats, get_system_stats
     return get_process_stats, get_system_stats
 
 
+class PssSampler:
+    """Decide when to refresh the PSS of processes, and estimate it from RSS in between.
+
+    Reading the PSS (e.g. from `/proc/{pid}/smaps_rollup`) requires the kernel
+    to walk all page tables of the process while holding its memory map lock,
+    which can take tens of milliseconds and stall huge processes. The RSS is
+    cheap to read, so it is read on every sample, and the PSS is only refreshed
+    every `every` samples, or when the RSS changed by more than `threshold`
+    (as a fraction) since the last PSS read. In between, the PSS is estimated
+    by adding the change in RSS to the last known PSS.
+
+    Args:
+        every: Refresh the PSS of a process at least every N samples. Defaults to 10.
+        threshold: Refresh the PSS of a process when its RSS changed by more than
+            this fraction since the last PSS read. Defaults to 0.1 (10%).
+
+    Example:
+
+        >>> sampler = PssSampler(every=3)
+        >>> sampler.get(1, rss=100, read_pss=lambda: 80)
+        (80, True)
+        >>> sampler.get(1, rss=105, read_pss=lambda: 84)
+        (85, False)
+        >>> sampler.get(1, rss=200, read_pss=lambda: 170)
+        (170, True)
+    """
+
+    def __init__(self, every: int = 10, threshold: float = 0.1):
+        self.every = every
+        self.threshold = threshold
+        # pid -> [last PSS, RSS at the time of the last PSS read, samples since]
+        self.processes: Dict[int, List[int]] = {}
+
+    def get(self, pid: int, rss: int, read_pss: Callable[[], int]) -> Tuple[int, bool]:
+        """Get the current (read or estimated) PSS of a process.
+
+        Args:
+            pid: The process ID.
+            rss: The current RSS of the process, in the same unit as the PSS.
+            read_pss: Callable returning the current PSS of the process.
+
+        Returns:
+            A tuple of the PSS and whether it was freshly read (True) or
+            estimated from the RSS (False).
+        """
+        state = self.processes.get(pid)
+        if (
+            state is None
+            or state[2] + 1 >= self.every
+            or abs(rss - state[1]) > state[1] * self.threshold
+        ):
+            pss = read_pss()
+            self.processes[pid] = [pss, rss, 0]
+            return pss, True
+        state[2] += 1
+        return max(0, state[0] + rss - state[1]), False
+
+    def forget_others(self, pids: Set[int]):
+        """Drop the state of processes not in `pids`, e.g. after they exited.
+
+        Args:
+            pids: The process IDs currently tracked.
+        """
+        if len(self.processes) > len(pids):
+            self.processes = {
+                pid: state for pid, state in self.processes.items() if pid in pids
+            }
+
+
+def is_group_due(groups: Optional[Set[str]], group: str) -> bool:
+    """Check if a metric group should be collected.
+
+    Args:
+        groups: The metric groups to collect, or None to collect all.
+        group: The metric group to check.
+
+    Returns:
+        True if the metric group should be collected.
+    """
+    return groups is None or group in groups
+
+
+class MultiRateScheduler:
+    """Schedule groups of metrics to be collected at their own intervals.
+
+    The trackers sample every `interval` seconds, and each metric group is
+    collected at every Nth sample, where N is the group's interval divided by
+    the tracker's interval (rounded, at least 1). The collected stats of the
+    groups skipped in a sample are carried forward from the previous sample.
+    The reported columns of the slower groups are computed over the group's
+    own interval, then carried forward into every row until the group is
+    collected again: current values (e.g. memory usage) are repeated, while
+    amounts (e.g. bytes read, see
+    [resource_tracker.column_maps.COUNTER_COLUMNS][]) are spread over the rows
+    at the rate measured in the group's last interval, so that summing a
+    column still approximates the total.
+
+    Args:
+        interval: The sampling interval of the tracker in seconds.
+        intervals: Mapping of metric groups to their sampling interval in
+            seconds. Groups not listed are collected at every sample.
+        groups: The available metric groups, e.g.
+            [resource_tracker.column_maps.SYSTEM_METRIC_GROUPS][].
+
+    Example:
+
+        >>> from resource_tracker.column_maps import SYSTEM_METRIC_GROUPS
+        >>> scheduler = MultiRateScheduler(0.1, {"disk_space": 60}, SYSTEM_METRIC_GROUPS)
+        >>> scheduler.every["disk_space"]
+        600
+        >>> "disk_space" in scheduler.due(1), "disk_space" in scheduler.due(600)
+        (False, True)
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        intervals: Dict[str, float],
+        groups: Dict[str, Dict[str, Tuple[str, ...]]],
+    ):
+        unknown = set(intervals) - set(groups)
+        if unknown:
+            raise ValueError(
+                f"Unsupported metric group(s): {', '.join(sorted(unknown))}. "
+                f"Supported groups: {', '.join(groups)}."
+            )
+        self.groups = groups
+        self.every = {
+            group: max(1, round(intervals.get(group, interval) / interval))
+            for group in groups
+        }
+        # stats at the last collection of the slower groups
+        self.group_stats: Dict[str, Dict[str, Any]] = {}
+        # reported columns at the last collection of the slower groups, amounts per second
+        self.group_columns: Dict[str, Dict[str, Union[int, float]]] = {}
+
+    def due(self, cycle: int) -> Set[str]:
+        """Get the metric groups to collect in a sample.
+
+        Args:
+            cycle: The number of the sample.
+
+        Returns:
+            The names of the metric groups to collect.
+        """
+        return {group for group, every in self.every.items() if cycle % every == 0}
+
+    def merge(
+        self, stats: Dict[str, Any], last_stats: Dict[str, Any], due: Set[str]
+    ) -> Dict[str, Any]:
+        """Carry forward the stats of the metric groups not collected in a sample.
+
+        Args:
+            stats: The stats collected in the current sample.
+            last_stats: The (merged) stats of the previous sample.
+            due: The metric groups collected in the current sample.
+
+        Returns:
+            The current stats with the skipped groups' stats from the previous sample.
+        """
+        merged = dict(stats)
+        for group, spec in self.groups.items():
+            if group not in due:
+                for key in spec["stats"]:
+                    if key in last_stats:
+                        merged[key] = last_stats[key]
+        return merged
+
+    def update(
+        self,
+        row: Dict[str, Any],
+        stats: Dict[str, Any],
+        last_stats: Dict[str, Any],
+        due: Set[str],
+        diff: Callable[[Dict[str, Any], Dict[str, Any]], Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        """Report the columns of the slower metric groups over their own interval.
+
+        Args:
+            row: The reported columns computed from `stats` and `last_stats`.
+            stats: The (merged) stats of the current sample.
+            last_stats: The (merged) stats of the previous sample.
+            due: The metric groups collected in the current sample.
+            diff: Function computing the reported columns from two stats.
+
+        Returns:
+            The updated row.
+        """
+        row_time_diff = stats["timestamp"] - last_stats["timestamp"]
+        for group, every in self.every.items():
+            if every == 1:
+                continue
+            previous = self.group_stats.setdefault(group, last_stats)
+            if group in due:
+                group_row = diff(stats, previous)
+                time_diff = stats["timestamp"] - previous["timestamp"]
+                self.group_columns[group] = {
+                    column: (
+                        group_row[column] / time_diff
+                        if column in COUNTER_COLUMNS
+                        else group_row[column]
+                    )
+                    for column in self.groups[group]["columns"]
+                    if column in group_row
+                }
+                self.group_stats[group] = stats
+            for column, value in self.group_columns.get(group, {}).items():
+                if column in COUNTER_COLUMNS:
+                    value = value * row_time_diff
+                    value = (
+                        round(value) if column.endswith("_bytes") else round(value, 6)
+                    )
+                row[column] = value
+        return row
+
+
+def split_gpu_device_column(column: str) -> Optional[Tuple[int, str]]:
+    """Split a per-GPU column name into the GPU index and the metric.
+
+    Args:
+        column: The column name, e.g. `gpu0_power_w`.
+
+    Returns:
+        A tuple of the GPU index and the metric (see
+        [resource_tracker.column_maps.GPU_DEVICE_COLUMNS][]), or None if not a
+        per-GPU column.
+
+    Example:
+
+        >>> split_gpu_device_column("gpu3_power_w")
+        (3, 'power_w')
+        >>> split_gpu_device_column("gpu_usage") is None
+        True
+    """
+    parts = match(r"gpu(\d+)_(\w+)$", column)
+    if parts is None or parts.group(2) not in GPU_DEVICE_COLUMNS:
+        return None
+    return int(parts.group(1)), parts.group(2)
+
+
+def get_human_name(column: str) -> str:
+    """Get the human-readable name of a column, including the per-GPU columns.
+
+    Args:
+        column: The column name.
+
+    Returns:
+        The human-readable name, or the column name if not known.
+
+    Example:
+
+        >>> get_human_name("gpu_usage")
+        'GPU usage'
+        >>> get_human_name("gpu1_sm_clock_mhz")
+        'GPU 1 SM clock'
+    """
+    device_column = split_gpu_device_column(column)
+    if device_column is not None:
+        index, metric = device_column
+        return f"GPU {index} {GPU_DEVICE_COLUMNS[metric]}"
+    return HUMAN_NAMES_MAPPING.get(column, column)
+
+
+def exclude_subtrees(parents: Dict[int, int], excluded: Set[int]) -> Set[int]:
+    """Find the processes in the subtrees rooted at the excluded processes.
+
+    Args:
+        parents: Mapping of process IDs to their parent process IDs.
+        excluded: The process IDs to exclude with all their descendants.
+
+    Returns:
+        The process IDs of `parents` that are excluded or have an excluded ancestor.
+
+    Example:
+
+        >>> parents = {2: 1, 3: 2, 4: 3, 5: 1}
+        >>> sorted(exclude_subtrees(parents, {3}))
+        [3, 4]
+    """
+    result = set()
+    for pid in parents:
+        ancestors = []
+        current = pid
+        while current is not None and current not in excluded:
+            if current in result:
+                break
+            ancestors.append(current)
+            current = parents.get(current)
+        if current is not None:
+            # reached an excluded process or one of its known descendants
+            result.update(ancestors)
+            if current in excluded and current in parents:
+                result.add(current)
+    return result
+
+
+def get_byte_factor(column: str) -> Optional[int]:
+    """Get the factor to convert the values of a column to bytes.
+
+    Args:
+        column: The column name.
+
+    Returns:
+        The factor, or None if the column is not converted to bytes.
+    """
+    device_column = split_gpu_device_column(column)
+    if device_column is not None:
+        return GPU_DEVICE_BYTE_MAPPING.get(device_column[1])
+    return BYTE_MAPPING.get(column)
+
+
 def get_zfs_pools_space() -> Dict[str, Dict[str, int]]:
     """
     Get the space of ZFS pools.
@@ -97,6 +558,7 @@ def get_zfs_pools_space() -> Dict[str, Dict[str, int]]:
             ["zpool", "list", "-Hp", "-o", "name,size,allocated,free"],
             stdout=PIPE,
         )
+        HELPER_PIDS.add(zpool_process.pid)
         try:
             stdout, _ = zpool_process.communicate(timeout=0.25)
             if zpool_process.returncode == 0:
@@ -112,6 +574,8 @@ def get_zfs_pools_space() -> Dict[str, Dict[str, int]]:
             zpool_process.kill()
         except Exception:
             pass
+        finally:
+            HELPER_PIDS.discard(zpool_process.pid)
     return disks
 
 
@@ -126,7 +590,7 @@ def cleanup_files(files: List[str]):
             unlink(f)
 
 
-def cleanup_processes(processes: List[Process]):
+def cleanup_processes(processes: List["Process"]):
     """Gracefully, then if needed forcefully terminate and close processes.
 
     Args:
@@ -145,6 +609,223 @@ def cleanup_processes(processes: List[Process]):
             process.close()
 
 
+def cleanup_subprocesses(processes: List[Popen]):
+    """Gracefully, then if needed forcefully terminate subprocesses.
+
+    Args:
+        processes: List of `subprocess.Popen` objects to cleanup.
+    """
+    for process in processes:
+        with suppress(Exception):
+            if process.poll() is None:
+                process.terminate()
+                process.wait(timeout=1.0)
+        with suppress(Exception):
+            if process.poll() is None:
+                process.kill()
+                process.wait(timeout=1.0)
+
+
+def cleanup_threads(threads: List[Thread], stop_event: Event):
+    """Signal threads to stop, and wait for them to finish.
+
+    Args:
+        threads: List of `threading.Thread` objects to cleanup.
+        stop_event: The event the threads are waiting on between samples.
+    """
+    stop_event.set()
+    for thread in threads:
+        with suppress(Exception):
+            thread.join(timeout=1.0)
+
+
+def wait_until(timestamp: float, stop_event: Optional[Event] = None) -> bool:
+    """Sleep until the given time, or until the stop event is set.
+
+    Args:
+        timestamp: The time to sleep until.
+        stop_event: Optional event to stop waiting early, e.g. when the
+            tracker runs in a thread instead of a subprocess that can be
+            terminated.
+
+    Returns:
+        Whether the stop event was set.
+    """
+    if stop_event is None:
+        sleep(max(0, timestamp - time()))
+        return False
+    return stop_event.wait(max(0, timestamp - time()))
+
+
+class SamplingClock:
+    """Schedule the samples of a tracker on a fixed grid of ticks, and measure how late they are.
+
+    The n-th tick is due at `start_time + interval * n`. When the collection
+    takes longer than the interval (e.g. on a busy node), the ticks already
+    passed are skipped, and the next sample is taken at the next tick in the
+    future, instead of collecting a burst of samples to catch up.
+
+    Args:
+        start_time: The time of the 0th tick.
+        interval: The time between the ticks in seconds.
+
+    Example:
+
+        >>> clock = SamplingClock(start_time=100, interval=1)
+        >>> clock.measure(started=101.25, finished=101.5)
+        {'sample_latency_ms': 250.0, 'schedule_lag_ms': 1250.0}
+        >>> clock.advance(now=103.5)
+        104
+        >>> clock.skipped
+        3
+    """
+
+    def __init__(self, start_time: float, interval: float):
+        self.start_time = start_time
+        self.interval = interval
+        self.tick = 0
+        self.skipped = 0
+
+    @property
+    def due(self) -> float:
+        """The time the current tick is due."""
+        return self.start_time + self.interval * self.tick
+
+    def measure(self, started: float, finished: float) -> Dict[str, float]:
+        """Get the timing diagnostics of a sample collected for the current tick.
+
+        Args:
+            started: The time the collection of the sample started.
+            finished: The time the collection of the sample finished.
+
+        Returns:
+            A dictionary with the time spent on collecting the sample
+            (`sample_latency_ms`), and how late the collection started
+            compared to the current tick (`schedule_lag_ms`), in milliseconds.
+        """
+        return {
+            "sample_latency_ms": round((finished - started) * 1000, 3),
+            "schedule_lag_ms": round(max(0, started - self.due) * 1000, 3),
+        }
+
+    def advance(self, now: Optional[float] = None) -> float:
+        """Move to the next tick, skipping the ticks that have already passed.
+
+        Args:
+            now: The current time. Defaults to `time.time()`.
+
+        Returns:
+            The time the new tick is due.
+        """
+        now = time() if now is None else now
+        self.tick += 1
+        passed = int((now - self.start_time) // self.interval)
+        if passed >= self.tick:
+            self.skipped += passed + 1 - self.tick
+            self.tick = passed + 1
+        return self.due
+
+    def wait(self, stop_event: Optional[Event] = None) -> bool:
+        """Sleep until the next tick, or until the stop event is set.
+
+        Args:
+            stop_event: Optional event to stop waiting early, see
+                [resource_tracker.helpers.wait_until][].
+
+        Returns:
+            Whether the stop event was set.
+        """
+        return wait_until(self.advance(), stop_event)
+
+
+class OverheadMeter:
+    """Measure the resource usage of the tracker itself.
+
+    When running in its own (sub)process, the CPU time, memory usage and disk
+    I/O of the current process and its children are collected, which
+    includes the helper subprocesses started by the tracker (e.g. the
+    `nvidia-smi` monitors or the `zpool` queries). When running in a thread of
+    the tracked process, only the CPU time of the thread can be separated
+    from the tracked process, so the memory usage and disk I/O are None.
+
+    The CPU time of the tracker is read via `time.process_time()` instead of
+    the clock ticks reported by the kernel, as the tick resolution (usually
+    10 ms) is too coarse for the short sampling intervals.
+
+    Args:
+        implementation: The collector backend to use, see
+            [resource_tracker.helpers.get_tracker_implementation][]. Defaults
+            to None.
+    """
+
+    def __init__(self, implementation: Optional[str] = None):
+        self.threaded = current_thread() is not main_thread()
+        self.get_process_stats = None
+        if not self.threaded:
+            self.get_process_stats, _ = get_tracker_implementation(implementation)
+        self.last = self.read()
+
+    def read(self) -> Dict[str, Optional[float]]:
+        """Read the cumulative resource usage of the tracker.
+
+        Returns:
+            The current time, the CPU time in seconds, the current memory
+            usage in MiB, and the disk read/write bytes.
+        """
+        if self.threaded:
+            return {
+                "timestamp": time(),
+                "cpu_time": thread_time(),
+                "memory_mib": None,
+                "disk_read_bytes": None,
+                "disk_write_bytes": None,
+            }
+        stats = self.get_process_stats(
+            os.getpid(),
+            children=True,
+            groups={"cpu", "memory", "disk_io"},
+            exclude_helpers=False,
+        )
+        # only the helper subprocesses are counted in clock ticks
+        own = os.times()
+        children_cpu_time = max(
+            0, stats["utime"] + stats["stime"] - own.user - own.system
+        )
+        return {
+            "timestamp": stats["timestamp"],
+            "cpu_time": process_time() + children_cpu_time,
+            "memory_mib": stats["memory_mib"],
+            "disk_read_bytes": stats["disk_read_bytes"],
+            "disk_write_bytes": stats["disk_write_bytes"],
+        }
+
+    def measure(self) -> Dict[str, Optional[float]]:
+        """Measure the resource usage of the tracker since the last call.
+
+        Returns:
+            The `tracker_cpu_usage` (between 0 and number of CPUs),
+            `tracker_memory_mib`, `tracker_disk_read_bytes` and
+            `tracker_disk_write_bytes` columns.
+        """
+        current = self.read()
+        last, self.last = self.last, current
+        elapsed = current["timestamp"] - last["timestamp"]
+        disk_io = {}
+        for column in ("disk_read_bytes", "disk_write_bytes"):
+            disk_io[f"tracker_{column}"] = (
+                None if current[column] is None else current[column] - last[column]
+            )
+        return {
+            "tracker_cpu_usage": round(
+                max(0, current["cpu_time"] - last["cpu_time"]) / elapsed, 4
+            )
+            if elapsed > 0
+            else 0,
+            "tracker_memory_mib": current["memory_mib"],
+            **disk_io,
+        }
+
+
 def aggregate_stats(
     stats: List[Dict[str, Dict[str, Any]]],
 ) -> Dict[str, Dict[str, Any]]:
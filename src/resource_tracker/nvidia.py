@@ -1,14 +1,776 @@
-"""Helpers to monitor NVIDIA GPUs."""
+"""Helpers to monitor NVIDIA GPUs.
+
+The trackers query the GPU stats in-process via the NVIDIA Management Library
+(NVML) when `libnvidia-ml.so` can be loaded, see [resource_tracker.nvidia.Nvml][],
+otherwise from a long-lived `nvidia-smi dmon`/`pmon` subprocess, see
+[resource_tracker.nvidia.NvidiaSmiStream][]. When called without such a
+monitor, the stats functions run `nvidia-smi` in a subprocess on each sample.
+"""
 
 from contextlib import suppress
-from subprocess import PIPE, Popen, TimeoutExpired
-from typing import Dict, Optional, Set, Union
+from ctypes import (
+    CDLL,
+    Structure,
+    byref,
+    c_uint,
+    c_ulonglong,
+    c_void_p,
+)
+from subprocess import (
+    DEVNULL,
+    PIPE,
+    CalledProcessError,
+    Popen,
+    SubprocessError,
+    TimeoutExpired,
+)
+from sys import platform
+from threading import Event, Thread
+from typing import Any, Dict, Iterable, List, Literal, Optional, Set, Tuple, Union
+
+from .helpers import HELPER_PIDS
+
+NVML_SUCCESS = 0
+NVML_CLOCK_SM = 1
+NVML_PCIE_UTIL_TX_BYTES = 0
+NVML_PCIE_UTIL_RX_BYTES = 1
+NVML_ERROR_NOT_FOUND = 6
+NVML_ERROR_INSUFFICIENT_SIZE = 7
+# reported as the used GPU memory of a process when not available (e.g. on Windows)
+NVML_VALUE_NOT_AVAILABLE = 2**64 - 1
+
+
+class NvmlUtilization(Structure):
+    """`nvmlUtilization_t`: GPU and memory utilization in percent."""
+
+    _fields_ = [("gpu", c_uint), ("memory", c_uint)]
+
+
+class NvmlMemory(Structure):
+    """`nvmlMemory_t`: total, free and used GPU memory in bytes."""
+
+    _fields_ = [("total", c_ulonglong), ("free", c_ulonglong), ("used", c_ulonglong)]
+
+
+class NvmlProcessInfo(Structure):
+    """`nvmlProcessInfo_t` (v2): GPU memory used by a process in bytes."""
+
+    _fields_ = [
+        ("pid", c_uint),
+        ("usedGpuMemory", c_ulonglong),
+        ("gpuInstanceId", c_uint),
+        ("computeInstanceId", c_uint),
+    ]
+
+
+class NvmlProcessUtilizationSample(Structure):
+    """`nvmlProcessUtilizationSample_t`: utilization of a process in percent."""
+
+    _fields_ = [
+        ("pid", c_uint),
+        ("timeStamp", c_ulonglong),
+        ("smUtil", c_uint),
+        ("memUtil", c_uint),
+        ("encUtil", c_uint),
+        ("decUtil", c_uint),
+    ]
+
+
+class NvmlError(Exception):
+    """An NVML function returned an error code."""
+
+    def __init__(self, function: str, code: int):
+        super().__init__(f"{function} failed with NVML error code {code}")
+        self.code = code
+
+
+class Nvml:
+    """Query NVIDIA GPUs in-process via NVML loaded with ctypes.
+
+    The library is loaded and initialized once, and the device handles are
+    kept, so that each sample only takes a few library calls instead of
+    starting an `nvidia-smi` subprocess and waiting for it. As NVML handles
+    are not fork-safe, create the object in the process using it.
+
+    Args:
+        library: The loaded NVML library. Defaults to None, loading
+            `libnvidia-ml.so.1` (or `nvml.dll` on Windows) via `ctypes`.
+
+    Raises:
+        OSError: If the library cannot be loaded.
+        AttributeError: If the library lacks a required function (e.g. too old driver).
+        NvmlError: If NVML cannot be initialized or queried.
+    """
+
+    def __init__(self, library: Any = None):
+        if library is None:
+            library = CDLL("nvml.dll" if platform == "win32" else "libnvidia-ml.so.1")
+        self.library = library
+        # both versions fill the same (v2) process info structure
+        self.running_processes = []
+        for kind in ("Compute", "Graphics"):
+            function = f"nvmlDeviceGet{kind}RunningProcesses_v3"
+            if not hasattr(library, function):
+                function = function[:-1] + "2"
+                getattr(library, function)  # raises AttributeError on old drivers
+            self.running_processes.append(function)
+        self.call("nvmlInit_v2")
+        count = c_uint(0)
+        self.call("nvmlDeviceGetCount_v2", byref(count))
+        self.handles: List[c_void_p] = []
+        for index in range(count.value):
+            handle = c_void_p()
+            self.call("nvmlDeviceGetHandleByIndex_v2", c_uint(index), byref(handle))
+            self.handles.append(handle)
+        # timestamp of the last process utilization sample seen on each device
+        self.last_seen = [0] * len(self.handles)
+
+    def call(self, function: str, *args) -> int:
+        """Call an NVML function and check its return code.
+
+        Args:
+            function: The name of the NVML function.
+            *args: The arguments to pass to the function.
+
+        Returns:
+            The return code, which is either success or not found.
+
+        Raises:
+            NvmlError: If the function returned any other error code.
+        """
+        code = getattr(self.library, function)(*args)
+        if code not in (NVML_SUCCESS, NVML_ERROR_NOT_FOUND):
+            raise NvmlError(function, code)
+        return code
+
+    def query_array(self, function: str, structure, args) -> list:
+        """Query a variable-length array from NVML, growing the buffer as needed.
+
+        Args:
+            function: The name of the NVML function.
+            structure: The structure type of the array items.
+            args: Function taking the count (by reference) and the array
+                (or None when querying the count), and returning the
+                arguments of the NVML function.
+
+        Returns:
+            List of the returned structures.
+
+        Raises:
+            NvmlError: If the function returned an unexpected error code.
+        """
+        count = c_uint(0)
+        items = None
+        for _ in range(3):
+            code = getattr(self.library, function)(*args(byref(count), items))
+            if code == NVML_ERROR_NOT_FOUND or (code == NVML_SUCCESS and items is None):
+                return []
+            if code == NVML_SUCCESS:
+                return list(items[: count.value])
+            if code != NVML_ERROR_INSUFFICIENT_SIZE:
+                raise NvmlError(function, code)
+            # leave room for items appearing between the calls
+            count.value += 8
+            items = (structure * count.value)()
+        return []
+
+    def get_gpu_stats(self) -> Dict[str, Union[int, float]]:
+        """Collect the current utilization and memory usage of all GPUs.
+
+        Returns:
+            A dictionary of GPU stats, see [resource_tracker.nvidia.process_nvidia_smi][].
+        """
+        gpu_stats = {"gpu_usage": 0, "gpu_vram_mib": 0, "gpu_utilized": 0}
+        for handle in self.handles:
+            utilization = NvmlUtilization()
+            memory = NvmlMemory()
+            self.query("nvmlDeviceGetUtilizationRates", handle, utilization)
+            self.query("nvmlDeviceGetMemoryInfo", handle, memory)
+            gpu_stats["gpu_usage"] += utilization.gpu / 100
+            gpu_stats["gpu_vram_mib"] += memory.used / 1024**2
+            gpu_stats["gpu_utilized"] += utilization.gpu > 0
+        return gpu_stats
+
+    @property
+    def device_count(self) -> int:
+        """The number of GPUs."""
+        return len(self.handles)
+
+    def query(self, function: str, handle: c_void_p, value, *args) -> bool:
+        """Query a value or structure of a GPU, left as is if not supported.
+
+        Some queries are not supported on all GPUs (e.g. the utilization in
+        MIG mode), so a failing query should not stop the sampling.
+
+        Args:
+            function: The name of the NVML function.
+            handle: The device handle.
+            value: The ctypes value or structure to write the result into.
+            *args: The arguments to pass between the handle and the value.
+
+        Returns:
+            Whether the query succeeded.
+        """
+        try:
+            self.call(function, handle, *args, byref(value))
+        except NvmlError:
+            return False
+        return True
+
+    def query_value(self, function: str, handle: c_void_p, value, *args) -> float:
+        """Query a single value of a GPU, reported as 0 if not supported.
+
+        Args:
+            function: The name of the NVML function.
+            handle: The device handle.
+            value: The ctypes value to write the result into.
+            *args: The arguments to pass between the handle and the value.
+
+        Returns:
+            The queried value.
+        """
+        return value.value if self.query(function, handle, value, *args) else 0
+
+    def is_supported(self) -> bool:
+        """Whether the utilization or memory usage can be queried on any GPU.
+
+        Returns:
+            False if all GPUs fail these queries, in which case the GPU stats
+            should be collected via `nvidia-smi`.
+        """
+        return not self.handles or any(
+            self.query("nvmlDeviceGetUtilizationRates", handle, NvmlUtilization())
+            or self.query("nvmlDeviceGetMemoryInfo", handle, NvmlMemory())
+            for handle in self.handles
+        )
+
+    def get_device_stats(self) -> List[Dict[str, float]]:
+        """Collect the current stats of each GPU.
+
+        Note that NVML measures the PCIe throughput over a 20 ms window.
+
+        Returns:
+            List of the GPU stats in the order of the device indexes, with the
+            keys of [resource_tracker.column_maps.GPU_DEVICE_COLUMNS][].
+        """
+        devices = []
+        for handle in self.handles:
+            utilization = NvmlUtilization()
+            memory = NvmlMemory()
+            self.query("nvmlDeviceGetUtilizationRates", handle, utilization)
+            self.query("nvmlDeviceGetMemoryInfo", handle, memory)
+            power = self.query_value("nvmlDeviceGetPowerUsage", handle, c_uint())
+            pcie_rx, pcie_tx = (
+                self.query_value(
+                    "nvmlDeviceGetPcieThroughput", handle, c_uint(), c_uint(counter)
+                )
+                for counter in (NVML_PCIE_UTIL_RX_BYTES, NVML_PCIE_UTIL_TX_BYTES)
+            )
+            devices.append(
+                {
+                    "usage": utilization.gpu / 100,
+                    "vram_mib": memory.used / 1024**2,
+                    "power_w": power / 1000,
+                    "sm_clock_mhz": self.query_value(
+                        "nvmlDeviceGetClockInfo",
+                        handle,
+                        c_uint(),
+                        c_uint(NVML_CLOCK_SM),
+                    ),
+                    # KB/s
+                    "pcie_rx_mib_s": pcie_rx / 1024,
+                    "pcie_tx_mib_s": pcie_tx / 1024,
+                    "throttle_reasons": self.query_value(
+                        "nvmlDeviceGetCurrentClocksThrottleReasons",
+                        handle,
+                        c_ulonglong(),
+                    ),
+                }
+            )
+        return devices
+
+    def get_process_gpu_stats(
+        self, pids: Optional[Iterable[int]] = None
+    ) -> Dict[str, Union[int, float, Set[int]]]:
+        """Collect the current GPU utilization and memory usage of processes.
+
+        The utilization is taken from the latest sample of each process since
+        the previous call, and the memory usage from the running compute and
+        graphics processes.
+
+        Args:
+            pids: The process IDs to monitor. If None, all processes are monitored.
+
+        Returns:
+            A dictionary of GPU stats, see [resource_tracker.nvidia.process_nvidia_smi_pmon][].
+        """
+        pids = set(pids) if pids is not None else None
+        gpu_stats = {
+            "gpu_usage": 0,
+            "gpu_vram_mib": 0,
+            "gpu_utilized": 0,
+            "gpu_utilized_indexes": set(),
+        }
+        for index, handle in enumerate(self.handles):
+            usage = {}
+            samples = []
+            # not supported e.g. in MIG mode
+            with suppress(NvmlError):
+                samples = self.query_array(
+                    "nvmlDeviceGetProcessUtilization",
+                    NvmlProcessUtilizationSample,
+                    lambda count, items: (
+                        handle,
+                        items,
+                        count,
+                        c_ulonglong(self.last_seen[index]),
+                    ),
+                )
+            # keep the latest sample of each process
+            for sample in sorted(samples, key=lambda sample: sample.timeStamp):
+                usage[sample.pid] = sample.smUtil
+                self.last_seen[index] = max(self.last_seen[index], sample.timeStamp)
+            vram = {}
+            for function in self.running_processes:
+                processes = []
+                with suppress(NvmlError):
+                    processes = self.query_array(
+                        function,
+                        NvmlProcessInfo,
+                        lambda count, items: (handle, count, items),
+                    )
+                for process in processes:
+                    if process.usedGpuMemory != NVML_VALUE_NOT_AVAILABLE:
+                        vram[process.pid] = process.usedGpuMemory
+            for pid in set(usage) | set(vram):
+                if pids is None or pid in pids:
+                    gpu_stats["gpu_usage"] += usage.get(pid, 0) / 100
+                    gpu_stats["gpu_vram_mib"] += vram.get(pid, 0) / 1024**2
+                    if usage.get(pid, 0) > 0:
+                        gpu_stats["gpu_utilized_indexes"].add(index)
+        gpu_stats["gpu_utilized"] = len(gpu_stats["gpu_utilized_indexes"])
+        return gpu_stats
+
+    def close(self):
+        """Shut down NVML."""
+        with suppress(Exception):
+            self.call("nvmlShutdown")
+
+
+class NvidiaSmiStream:
+    """Run `nvidia-smi dmon` or `pmon` continuously, and keep its latest output.
+
+    Instead of starting a new `nvidia-smi` subprocess on each sample and
+    waiting for it, the subprocess is started once with a delay between its
+    samples, and a background thread parses its output line by line. The rows
+    of the latest complete sample (grouped by the time column) are kept, so
+    reading the stats never blocks, but lags behind by up to one `nvidia-smi`
+    delay.
+
+    Args:
+        command: The `nvidia-smi` subcommand to run: "dmon" for device-level
+            or "pmon" for process-level stats.
+        interval: The delay between samples in seconds, rounded to an integer
+            between 1 and 10 (the range supported by `pmon`). Defaults to 1.
+        metrics: The metric groups to monitor, passed as `-s`. Defaults to
+            "um" (utilization and memory).
+
+    Raises:
+        FileNotFoundError: If `nvidia-smi` is not installed.
+    """
+
+    def __init__(
+        self,
+        command: Literal["dmon", "pmon"],
+        interval: float = 1,
+        metrics: str = "um",
+    ):
+        delay = min(10, max(1, round(interval)))
+        self.process = Popen(
+            ["nvidia-smi", command, "-d", str(delay), "-s", metrics, "-o", "T"],
+            stdout=PIPE,
+            stderr=DEVNULL,
+        )
+        HELPER_PIDS.add(self.process.pid)
+        # rows of the latest complete sample, replaced (not updated) by the thread
+        self.latest: List[Dict[str, str]] = []
+        self.thread = Thread(target=self.read, daemon=True)
+        self.thread.start()
+
+    def read(self):
+        """Parse the output of `nvidia-smi` until it exits."""
+        columns = None
+        sample = []
+        for line in self.process.stdout:
+            parts = line.decode(errors="replace").lstrip("#").lower().split()
+            if line.startswith(b"#"):
+                # the header with the column names, followed by another with the units
+                if "gpu" in parts:
+                    columns = parts
+                continue
+            if columns is None or len(parts) < len(columns) - 1:
+                continue
+            row = dict(zip(columns, parts))
+            if sample and row.get("time") != sample[0].get("time"):
+                self.latest = sample
+                sample = []
+            sample.append(row)
+        if sample:
+            self.latest = sample
+
+    def close(self):
+        """Stop the `nvidia-smi` subprocess."""
+        HELPER_PIDS.discard(self.process.pid)
+        with suppress(Exception):
+            self.process.kill()
+            self.process.wait(timeout=1)
+
+
+def parse_value(value: Optional[str]) -> float:
+    """Parse a numeric value from `nvidia-smi dmon`/`pmon`, reported as "-" when not available.
+
+    Args:
+        value: The value to parse.
+
+    Returns:
+        The parsed value, or 0 if not available.
+
+    Example:
+
+        >>> parse_value("42")
+        42.0
+        >>> parse_value("-")
+        0
+    """
+    with suppress(TypeError, ValueError):
+        return float(value)
+    return 0
+
+
+class NvidiaSmiDmon(NvidiaSmiStream):
+    """Stream the device-level GPU stats from `nvidia-smi dmon`.
+
+    Args:
+        interval: The delay between samples in seconds. Defaults to 1.
+        devices: Whether to also monitor the power draw, clocks and PCIe
+            throughput of each GPU for
+            [resource_tracker.nvidia.NvidiaSmiDmon.get_device_stats][].
+            Defaults to False.
+    """
+
+    def __init__(self, interval: float = 1, devices: bool = False):
+        super().__init__("dmon", interval, "pucmt" if devices else "um")
+        self.device_count = get_nvidia_smi_device_count() if devices else 0
+
+    def get_device_stats(self) -> List[Dict[str, float]]:
+        """Get the latest stats of each GPU.
+
+        Note that `nvidia-smi dmon` does not report the throttle reasons, so
+        they are reported as 0.
+
+        Returns:
+            List of the GPU stats in the order of the device indexes, with the
+            keys of [resource_tracker.column_maps.GPU_DEVICE_COLUMNS][].
+        """
+        devices = []
+        for row in sorted(self.latest, key=lambda row: parse_value(row.get("gpu"))):
+            devices.append(
+                {
+                    "usage": parse_value(row.get("sm")) / 100,
+                    "vram_mib": parse_value(row.get("fb")),
+                    "power_w": parse_value(row.get("pwr")),
+                    "sm_clock_mhz": parse_value(row.get("pclk")),
+                    # MB/s
+                    "pcie_rx_mib_s": parse_value(row.get("rxpci")),
+                    "pcie_tx_mib_s": parse_value(row.get("txpci")),
+                    "throttle_reasons": 0,
+                }
+            )
+        return devices
+
+    def get_gpu_stats(self) -> Dict[str, Union[int, float]]:
+        """Get the latest utilization and memory usage of all GPUs.
+
+        Returns:
+            A dictionary of GPU stats, see [resource_tracker.nvidia.process_nvidia_smi][].
+        """
+        gpu_stats = {"gpu_usage": 0, "gpu_vram_mib": 0, "gpu_utilized": 0}
+        for row in self.latest:
+            usage = parse_value(row.get("sm"))
+            gpu_stats["gpu_usage"] += usage / 100
+            gpu_stats["gpu_vram_mib"] += parse_value(row.get("fb"))
+            gpu_stats["gpu_utilized"] += usage > 0
+        return gpu_stats
+
+
+class NvidiaSmiPmon(NvidiaSmiStream):
+    """Stream the process-level GPU stats from `nvidia-smi pmon`.
+
+    Note that `nvidia-smi pmon` is limited to monitoring max. 4 GPUs, see
+    [resource_tracker.nvidia.NvidiaSmiComputeApps][] for more GPUs.
+
+    Args:
+        interval: The delay between samples in seconds. Defaults to 1.
+    """
+
+    def __init__(self, interval: float = 1):
+        super().__init__("pmon", interval)
+
+    def get_process_gpu_stats(
+        self, pids: Optional[Iterable[int]] = None
+    ) -> Dict[str, Union[int, float, Set[int]]]:
+        """Get the latest GPU utilization and memory usage of processes.
+
+        Args:
+            pids: The process IDs to monitor. If None, all processes are monitored.
+
+        Returns:
+            A dictionary of GPU stats, see [resource_tracker.nvidia.process_nvidia_smi_pmon][].
+        """
+        pids = set(pids) if pids is not None else None
+        gpu_stats = {
+            "gpu_usage": 0,
+            "gpu_vram_mib": 0,
+            "gpu_utilized": 0,
+            "gpu_utilized_indexes": set(),
+        }
+        for row in self.latest:
+            # GPUs without processes are reported with a "-" PID
+            if not row.get("pid", "-").isdigit():
+                continue
+            if pids is None or int(row["pid"]) in pids:
+                usage = parse_value(row.get("sm"))
+                gpu_stats["gpu_usage"] += usage / 100
+                gpu_stats["gpu_vram_mib"] += parse_value(row.get("fb"))
+                if usage > 0:
+                    gpu_stats["gpu_utilized_indexes"].add(int(row["gpu"]))
+        gpu_stats["gpu_utilized"] = len(gpu_stats["gpu_utilized_indexes"])
+        return gpu_stats
+
+
+class NvidiaSmiComputeApps:
+    """Poll the GPU memory of processes and the utilization of each GPU from `nvidia-smi`.
+
+    Unlike `nvidia-smi pmon`, `--query-compute-apps` reports the processes
+    using any number of GPUs, but without their utilization. So the
+    utilization of each GPU is attributed to the monitored processes in
+    proportion to their share of the GPU memory used by all compute processes
+    on that GPU (or of the number of processes when the memory usage is not
+    available, e.g. on Windows).
+
+    The queries are run once at startup, then repeated in a background thread
+    with a delay between them, so reading the stats never blocks.
+
+    Args:
+        interval: The delay between queries in seconds, rounded to an integer
+            between 1 and 10. Defaults to 1.
+
+    Raises:
+        FileNotFoundError: If `nvidia-smi` is not installed.
+        subprocess.SubprocessError: If the first queries fail or time out.
+    """
+
+    def __init__(self, interval: float = 1):
+        self.delay = min(10, max(1, round(interval)))
+        # the latest utilization (by UUID) and compute processes of the GPUs
+        self.latest = self.query()
+        self.stopped = Event()
+        self.thread = Thread(target=self.poll, daemon=True)
+        self.thread.start()
+
+    @staticmethod
+    def query() -> Tuple[Dict[str, Tuple[int, float]], List[Tuple[int, float, str]]]:
+        """Query the utilization of the GPUs and their compute processes.
+
+        Returns:
+            A tuple of the GPU index and utilization (percent) by GPU UUID, and
+            the list of the PID, used GPU memory (MiB) and GPU UUID of the
+            compute processes.
+        """
+        devices = {}
+        for line in query_nvidia_smi("--query-gpu=uuid,index,utilization.gpu"):
+            uuid, index, usage = line
+            devices[uuid] = (int(index), parse_value(usage))
+        apps = [
+            (int(pid), parse_value(memory), uuid)
+            for pid, memory, uuid in query_nvidia_smi(
+                "--query-compute-apps=pid,used_memory,gpu_uuid"
+            )
+        ]
+        return devices, apps
+
+    def poll(self):
+        """Repeat the queries until closed."""
+        while not self.stopped.wait(self.delay):
+            with suppress(Exception):
+                self.latest = self.query()
+
+    def get_process_gpu_stats(
+        self, pids: Optional[Iterable[int]] = None
+    ) -> Dict[str, Union[int, float, Set[int]]]:
+        """Get the latest GPU utilization and memory usage of processes.
+
+        Args:
+            pids: The process IDs to monitor. If None, all processes are monitored.
+
+        Returns:
+            A dictionary of GPU stats, see [resource_tracker.nvidia.process_nvidia_smi_pmon][].
+        """
+        pids = set(pids) if pids is not None else None
+        devices, apps = self.latest
+        gpu_stats = {
+            "gpu_usage": 0,
+            "gpu_vram_mib": 0,
+            "gpu_utilized": 0,
+            "gpu_utilized_indexes": set(),
+        }
+        for uuid, (index, usage) in devices.items():
+            memory = [(pid, vram) for pid, vram, app_uuid in apps if app_uuid == uuid]
+            tracked = [vram for pid, vram in memory if pids is None or pid in pids]
+            if not tracked:
+                continue
+            total_vram = sum(vram for _, vram in memory)
+            if total_vram > 0:
+                share = sum(tracked) / total_vram
+            else:
+                share = len(tracked) / len(memory)
+            gpu_stats["gpu_usage"] += usage / 100 * share
+            gpu_stats["gpu_vram_mib"] += sum(tracked)
+            if usage > 0:
+                gpu_stats["gpu_utilized_indexes"].add(index)
+        gpu_stats["gpu_utilized"] = len(gpu_stats["gpu_utilized_indexes"])
+        return gpu_stats
+
+    def close(self):
+        """Stop the background queries."""
+        self.stopped.set()
+
+
+SystemGpuMonitor = Union[Nvml, NvidiaSmiDmon]
+ProcessGpuMonitor = Union[Nvml, NvidiaSmiPmon, NvidiaSmiComputeApps]
+
+# the max. number of GPUs monitored by `nvidia-smi pmon`
+NVIDIA_SMI_PMON_MAX_DEVICES = 4
+
+
+def run_nvidia_smi(*args: str, timeout: float = 5) -> str:
+    """Run `nvidia-smi` and wait for its output.
+
+    The subprocess is registered in [resource_tracker.helpers.HELPER_PIDS][]
+    while running, so that it is excluded from the process-level metrics.
+
+    Args:
+        *args: The arguments of `nvidia-smi`.
+        timeout: The max. number of seconds to wait for `nvidia-smi` to finish,
+            after which it is killed. Defaults to 5.
+
+    Returns:
+        The standard output of `nvidia-smi`.
+
+    Raises:
+        FileNotFoundError: If `nvidia-smi` is not installed.
+        subprocess.TimeoutExpired: If `nvidia-smi` did not finish in time.
+        subprocess.CalledProcessError: If `nvidia-smi` failed.
+    """
+    process = Popen(["nvidia-smi", *args], stdout=PIPE, stderr=DEVNULL, text=True)
+    HELPER_PIDS.add(process.pid)
+    try:
+        stdout, _ = process.communicate(timeout=timeout)
+    except TimeoutExpired:
+        process.kill()
+        process.wait()
+        raise
+    finally:
+        HELPER_PIDS.discard(process.pid)
+    if process.returncode != 0:
+        raise CalledProcessError(process.returncode, process.args, stdout)
+    return stdout
+
+
+def query_nvidia_smi(query: str) -> List[List[str]]:
+    """Run an `nvidia-smi` query and split its CSV output.
+
+    Args:
+        query: The query argument, e.g. `--query-gpu=uuid,utilization.gpu`.
+
+    Returns:
+        The values of each returned row, without the header and units.
+    """
+    stdout = run_nvidia_smi(query, "--format=csv,noheader,nounits")
+    return [line.split(", ") for line in stdout.splitlines() if line.strip()]
+
+
+def get_nvidia_smi_device_count() -> int:
+    """Get the number of GPUs listed by `nvidia-smi -L`.
+
+    Returns:
+        The number of GPUs, or 0 if `nvidia-smi` is not available.
+    """
+    with suppress(Exception):
+        stdout = run_nvidia_smi("-L")
+        return sum(line.startswith("GPU ") for line in stdout.splitlines())
+    return 0
+
+
+def load_nvml() -> Optional[Nvml]:
+    """Load and initialize NVML if available.
+
+    Returns:
+        The [resource_tracker.nvidia.Nvml][] object, or None if NVML is not
+        available (e.g. no NVIDIA driver installed) or cannot query the GPUs,
+        in which case the GPU stats should be collected via `nvidia-smi`.
+    """
+    with suppress(OSError, AttributeError, NvmlError):
+        nvml = Nvml()
+        if nvml.is_supported():
+            return nvml
+        nvml.close()
+    return None
+
+
+def start_gpu_monitor(
+    level: Literal["system", "process"], interval: float = 1, devices: bool = False
+) -> Optional[Union[SystemGpuMonitor, ProcessGpuMonitor]]:
+    """Start a long-lived GPU monitor to be reused between samples.
+
+    Args:
+        level: Whether to monitor the device-level ("system") or the
+            process-level ("process") GPU stats.
+        interval: The sampling interval in seconds.
+        devices: Whether to also monitor the per-GPU stats at the device level.
+            Defaults to False.
+
+    Returns:
+        [resource_tracker.nvidia.Nvml][] if available, otherwise a
+        [resource_tracker.nvidia.NvidiaSmiDmon][] or
+        [resource_tracker.nvidia.NvidiaSmiPmon][] streaming from `nvidia-smi`
+        (or [resource_tracker.nvidia.NvidiaSmiComputeApps][] when there are
+        more GPUs than `pmon` can monitor), or None if `nvidia-smi` is not
+        installed either or cannot be started.
+    """
+    nvml = load_nvml()
+    if nvml is not None:
+        return nvml
+    if (
+        level == "process"
+        and get_nvidia_smi_device_count() > NVIDIA_SMI_PMON_MAX_DEVICES
+    ):
+        # fall back to pmon (monitoring only the first GPUs) if the queries fail
+        with suppress(OSError, SubprocessError, ValueError):
+            return NvidiaSmiComputeApps(interval)
+    with suppress(OSError, SubprocessError):
+        if level == "system":
+            return NvidiaSmiDmon(interval, devices)
+        return NvidiaSmiPmon(interval)
+    return None
 
 
 def start_nvidia_smi_pmon() -> Optional[Popen]:
     """Start a subprocess to monitor NVIDIA GPUs at the process level using `nvidia-smi pmon`.
 
-    Note that `nvidia-smi pmon` is limited to monitoring max. 4 GPUs.
+    Note that `nvidia-smi pmon` is limited to monitoring max. 4 GPUs, so the
+    trackers use [resource_tracker.nvidia.NvidiaSmiComputeApps][] instead on
+    machines with more GPUs, see [resource_tracker.nvidia.start_gpu_monitor][].
 
     Returns:
         The subprocess object or None if nvidia-smi is not installed.
@@ -0,0 +1,131 @@
+"""
+Discover process trees via a PPID-indexed table of all processes.
+
+The `/proc/{pid}/task/{pid}/children` files used by
+[resource_tracker.tracker_procfs.get_process_children][] require a kernel
+built with `CONFIG_PROC_CHILDREN`, only list the children of the main thread,
+and lose track of grandchildren that get re-parented when their parent exits.
+[resource_tracker.process_table.ProcessTable][] instead reads the parent
+process ID of all processes from `/proc/{pid}/stat`, and updates the index
+incrementally on each refresh by only reading the `stat` file of new
+processes. The start time of the processes is also recorded to recognize
+reused process IDs.
+
+Note that this relies on `procfs`, so it's specific to Linux.
+"""
+
+from contextlib import suppress
+from os import listdir
+from typing import Dict, Optional, Set, Tuple
+
+from .helpers import is_procfs_available
+
+
+def get_process_ppid(pid: int) -> Optional[Tuple[int, int]]:
+    """Get the parent process ID and the start time of a process from `/proc/{pid}/stat`.
+
+    Args:
+        pid: The process ID to get the parent process ID for.
+
+    Returns:
+        The parent process ID and the start time of the process in clock ticks
+        since boot, or None if the process does not exist (anymore).
+    """
+    with suppress(ProcessLookupError, FileNotFoundError):
+        with open(f"/proc/{pid}/stat", "r") as f:
+            # process name might include spaces or parentheses
+            fields = f.read().rpartition(")")[2].split()
+            return int(fields[1]), int(fields[19])
+    return None
+
+
+class ProcessTable:
+    """Index of parent-child relationships of all processes of the system.
+
+    The first [resource_tracker.process_table.ProcessTable.refresh][] reads the
+    `stat` file of all processes, then only the new processes are read, and the
+    exited ones are dropped from the index. When a process exits, its children
+    are attached to its own parent in the index, so that descendants of a
+    tracked process remain tracked even after the kernel re-parents them.
+    The start time of the descendants is checked on each lookup, and a process
+    ID reused by a new process since the last refresh is indexed again under
+    its actual parent.
+
+    Example:
+
+        >>> from os import getpid, getppid
+        >>> table = ProcessTable()
+        >>> table.refresh()
+        >>> getpid() in table.descendants(getppid())
+        True
+    """
+
+    def __init__(self):
+        if not is_procfs_available():
+            raise RuntimeError("The process table requires procfs (Linux).")
+        self.parents: Dict[int, int] = {}
+        self.children: Dict[int, Set[int]] = {}
+        self.start_times: Dict[int, int] = {}
+
+    def _add(self, pid: int, ppid: int, start_time: Optional[int] = None):
+        self.parents[pid] = ppid
+        self.children.setdefault(ppid, set()).add(pid)
+        if start_time is not None:
+            self.start_times[pid] = start_time
+
+    def _remove(self, pid: int):
+        ppid = self.parents.pop(pid)
+        self.start_times.pop(pid, None)
+        siblings = self.children.get(ppid)
+        if siblings is not None:
+            siblings.discard(pid)
+        # keep the lineage of orphans by attaching them to the grandparent
+        for orphan in self.children.pop(pid, ()):
+            self._add(orphan, ppid)
+
+    def refresh(self):
+        """Update the index with the processes started and exited since the last refresh."""
+        pids = {int(name) for name in listdir("/proc") if name.isdigit()}
+        for pid in self.parents.keys() - pids:
+            self._remove(pid)
+        for pid in pids - self.parents.keys():
+            ids = get_process_ppid(pid)
+            if ids is not None:
+                self._add(pid, *ids)
+
+    def _is_current(self, pid: int) -> bool:
+        """Check if an indexed process is still running, and reindex it if its ID was reused."""
+        ids = get_process_ppid(pid)
+        if ids is not None and ids[1] == self.start_times.get(pid):
+            return True
+        self._remove(pid)
+        if ids is not None:
+            self._add(pid, *ids)
+        return False
+
+    def descendants(self, pid: int, exclude: Optional[Set[int]] = None) -> Set[int]:
+        """Get all descendant processes of a process as seen at the last refresh.
+
+        Args:
+            pid: The process ID to get descendant processes for.
+            exclude: Optional process IDs to skip along with their descendants.
+
+        Returns:
+            All descendant process ids.
+        """
+        exclude = exclude or set()
+        descendants = set()
+        queue = [pid]
+        while queue:
+            parent = queue.pop()
+            # copied, as exited or reused process IDs are moved in the index
+            for child in list(self.children.get(parent, ())):
+                if child in descendants or child in exclude:
+                    continue
+                if self._is_current(child):
+                    descendants.add(child)
+                    queue.append(child)
+                else:
+                    # look again for the orphans attached to the parent
+                    queue.append(parent)
+        return descendants
@@ -0,0 +1,175 @@
+"""
+Byte-level parsers for the system-wide procfs files read on every sample.
+
+Instead of decoding the files into strings, splitting them into lines and
+fields and building intermediate lists and dictionaries, these parsers find
+the fields by their byte offsets in the (reused) read buffer, and write the
+values into the fixed slots of a reused
+[resource_tracker.procfs_parsers.SystemRecord][]. This keeps the number of
+allocations per sample low, reducing allocator churn and garbage collection
+in the sampler process.
+
+The fields are located with precompiled regular expressions and `find` calls
+on the raw bytes, so the scanning happens in C without creating intermediate
+objects for the fields that are not needed. The parsers take the buffer and
+the number of valid bytes in it, so they work
+both with a `bytearray` reused via
+[resource_tracker.tracker_procfs.ProcFile.readinto][] and with `bytes`.
+"""
+
+from re import MULTILINE
+from re import compile as re_compile
+from typing import Optional, Tuple, Union
+
+Buffer = Union[bytes, bytearray]
+
+INTEGER = re_compile(rb"\d+")
+# aggregated user, nice and system CPU times
+STAT_CPU = re_compile(rb"^cpu +(\d+) +(\d+) +(\d+)", MULTILINE)
+# number of runnable and total tasks, e.g. "0.20 0.18 0.12 1/80 11206"
+LOADAVG_TASKS = re_compile(rb" (\d+)/(\d+) ")
+# interface name, received bytes and (after 7 other receive counters) sent bytes
+NET_DEV_INTERFACE = re_compile(rb"^ *([^\s:]+): *(\d+)(?: +\d+){7} +(\d+)", MULTILINE)
+
+# fields of interest in /proc/meminfo, searched with a leading newline to match
+# the full key (e.g. "Cached:" should not match "SwapCached:")
+MEMINFO_FIELDS: Tuple[Tuple[str, bytes], ...] = (
+    ("mem_total", b"\nMemTotal:"),
+    ("mem_free", b"\nMemFree:"),
+    ("mem_available", b"\nMemAvailable:"),
+    ("buffers", b"\nBuffers:"),
+    ("cached", b"\nCached:"),
+    ("sreclaimable", b"\nSReclaimable:"),
+    ("active", b"\nActive:"),
+    ("inactive", b"\nInactive:"),
+)
+
+
+class SystemRecord:
+    """Fixed-slot record of the system-wide counters parsed from procfs.
+
+    CPU times are in clock ticks, memory in KiB, and network traffic in bytes.
+    Memory fields not found in `/proc/meminfo` are set to None.
+    """
+
+    __slots__ = (
+        "cpu_user",
+        "cpu_nice",
+        "cpu_system",
+        "procs_running",
+        "procs_blocked",
+        "tasks_total",
+        *(name for name, _ in MEMINFO_FIELDS),
+        "net_recv_bytes",
+        "net_sent_bytes",
+    )
+
+    def __init__(self):
+        for name in self.__slots__:
+            setattr(self, name, 0)
+
+
+def parse_int(buffer: Buffer, pos: int, end: int) -> Tuple[int, int]:
+    """Parse the next integer in a buffer.
+
+    Args:
+        buffer: The buffer to parse.
+        pos: The position to start looking for the integer.
+        end: The position to stop looking for the integer.
+
+    Returns:
+        A tuple of the parsed integer and the position right after it.
+
+    Example:
+
+        >>> parse_int(b"cpu  123 45", 3, 11)
+        (123, 8)
+    """
+    match = INTEGER.search(buffer, pos, end)
+    return int(match.group()), match.end()
+
+
+def find_field(buffer: Buffer, size: int, key: bytes) -> Optional[int]:
+    """Find the position right after a key that starts a line.
+
+    Args:
+        buffer: The buffer to search in.
+        size: The number of valid bytes in the buffer.
+        key: The key to look for, starting with a newline.
+
+    Returns:
+        The position right after the key, or None if not found.
+    """
+    if buffer.startswith(key[1:]):
+        return len(key) - 1
+    pos = buffer.find(key, 0, size)
+    if pos < 0:
+        return None
+    return pos + len(key)
+
+
+def parse_stat(buffer: Buffer, size: int, record: SystemRecord):
+    """Parse the aggregated CPU times and the runnable/blocked task counts from `/proc/stat`.
+
+    Args:
+        buffer: The buffer holding the content of `/proc/stat`.
+        size: The number of valid bytes in the buffer.
+        record: The record to write the values into.
+    """
+    match = STAT_CPU.search(buffer, 0, size)
+    if match is not None:
+        record.cpu_user = int(match.group(1))
+        record.cpu_nice = int(match.group(2))
+        record.cpu_system = int(match.group(3))
+    for name, key in (
+        ("procs_running", b"\nprocs_running "),
+        ("procs_blocked", b"\nprocs_blocked "),
+    ):
+        pos = find_field(buffer, size, key)
+        setattr(record, name, 0 if pos is None else parse_int(buffer, pos, size)[0])
+
+
+def parse_loadavg(buffer: Buffer, size: int, record: SystemRecord):
+    """Parse the total number of tasks (processes and threads) from `/proc/loadavg`.
+
+    Args:
+        buffer: The buffer holding the content of `/proc/loadavg`.
+        size: The number of valid bytes in the buffer.
+        record: The record to write the values into.
+    """
+    match = LOADAVG_TASKS.search(buffer, 0, size)
+    if match is not None:
+        record.tasks_total = int(match.group(2))
+
+
+def parse_meminfo(buffer: Buffer, size: int, record: SystemRecord):
+    """Parse the memory stats from `/proc/meminfo`.
+
+    Args:
+        buffer: The buffer holding the content of `/proc/meminfo`.
+        size: The number of valid bytes in the buffer.
+        record: The record to write the values into.
+    """
+    for name, key in MEMINFO_FIELDS:
+        pos = find_field(buffer, size, key)
+        if pos is None:
+            setattr(record, name, None)
+        else:
+            setattr(record, name, parse_int(buffer, pos, size)[0])
+
+
+def parse_net_dev(buffer: Buffer, size: int, record: SystemRecord):
+    """Parse the total network traffic of all interfaces except loopback from `/proc/net/dev`.
+
+    Args:
+        buffer: The buffer holding the content of `/proc/net/dev`.
+        size: The number of valid bytes in the buffer.
+        record: The record to write the values into.
+    """
+    recv_bytes = sent_bytes = 0
+    for match in NET_DEV_INTERFACE.finditer(buffer, 0, size):
+        if match.group(1) != b"lo":
+            recv_bytes += int(match.group(2))
+            sent_bytes += int(match.group(3))
+    record.net_recv_bytes = recv_bytes
+    record.net_sent_bytes = sent_bytes
@@ -0,0 +1,387 @@
+"""
+Bounded-memory retention of the collected metrics with multi-resolution rollups.
+
+When tracking jobs running for days, keeping all samples in memory (and
+processing all of them on each access) becomes expensive. The
+[resource_tracker.retention.MetricsRetention][] keeps only the most recent raw
+samples, plus progressively coarser rollups (e.g. per minute and per 15
+minutes) holding the min, mean and max of each column in each period, updated
+incrementally as the samples arrive. The running totals of all samples are also
+kept, so that the mean, min, max and sum of the columns remain exact.
+
+Used by [resource_tracker.ResourceTracker][] with the `retention` option.
+"""
+
+from collections import deque
+from logging import getLogger
+from statistics import mean
+from threading import Event, Lock
+from typing import Callable, Deque, Dict, List, Optional, Sequence, Tuple, Union
+
+from .tiny_data_frame import StatSpec, TinyDataFrame
+
+logger = getLogger(__name__)
+
+EXACT_AGGREGATES = (mean, min, max, sum)
+"""Aggregation functions computed from the running totals of all samples."""
+
+Aggregates = List[list]
+"""The count, sum, min and max of the numeric values of each column."""
+
+
+def aggregate(values: Sequence) -> Aggregates:
+    """Get the aggregates of a single row.
+
+    Missing (None or empty string) and non-numeric values are skipped.
+
+    Example:
+
+        >>> aggregate([1, 2.5, None])
+        [[1, 1, 1, 1], [1, 2.5, 2.5, 2.5], [0, 0, None, None]]
+    """
+    return [
+        [1, value, value, value]
+        if isinstance(value, (int, float)) and not isinstance(value, bool)
+        else [0, 0, None, None]
+        for value in values
+    ]
+
+
+def merge_aggregates(target: Aggregates, source: Aggregates) -> None:
+    """Merge the aggregates of a row or period into another in place.
+
+    Example:
+
+        >>> target = aggregate([1, None])
+        >>> merge_aggregates(target, aggregate([3, 2]))
+        >>> target
+        [[2, 4, 1, 3], [1, 2, 2, 2]]
+    """
+    for column, other in zip(target, source):
+        if other[0]:
+            column[0] += other[0]
+            column[1] += other[1]
+            column[2] = other[2] if column[2] is None else min(column[2], other[2])
+            column[3] = other[3] if column[3] is None else max(column[3], other[3])
+
+
+class Rollup:
+    """Aggregates of the samples in consecutive periods of a fixed length.
+
+    The periods are aligned to multiples of the resolution since the epoch, so
+    the rollups of different resolutions line up.
+
+    Args:
+        resolution: The length of the periods in seconds.
+        capacity: The max. number of closed periods kept.
+    """
+
+    def __init__(self, resolution: float, capacity: int):
+        self.resolution = resolution
+        self.periods: Deque[Tuple[float, Aggregates]] = deque(maxlen=capacity)
+        """The closed periods as tuples of the start time and the aggregates."""
+        self.dropped: Optional[float] = None
+        """The start time of the last closed period dropped due to the capacity."""
+        self._start: Optional[float] = None
+        self._current: Optional[Aggregates] = None
+
+    def get_start(self, timestamp: float) -> float:
+        """Get the start time of the period including the timestamp."""
+        return timestamp // self.resolution * self.resolution
+
+    def add(
+        self, timestamp: float, aggregates: Aggregates
+    ) -> Optional[Tuple[float, Aggregates]]:
+        """Add the aggregates of a sample or a finer period.
+
+        Args:
+            timestamp: The time of the sample, or the start time of the finer period.
+            aggregates: The aggregates of the sample or the finer period.
+
+        Returns:
+            The start time and aggregates of the previous period if the
+            timestamp started a new one, otherwise None.
+        """
+        start = self.get_start(timestamp)
+        closed = None
+        if start != self._start:
+            if self._current is not None:
+                if len(self.periods) == self.periods.maxlen:
+                    self.dropped = self.periods[0][0]
+                closed = (self._start, self._current)
+                self.periods.append(closed)
+            self._start = start
+            self._current = [[0, 0, None, None] for _ in aggregates]
+        merge_aggregates(self._current, aggregates)
+        return closed
+
+
+class MetricsRetention:
+    """Keep the most recent samples and multi-resolution rollups of the older ones.
+
+    Each sample is added to the finest rollup, and each closed period to the
+    next coarser one, so updating the rollups takes constant time per sample,
+    and the memory usage is bounded by `raw_samples` rows per resolution.
+
+    Args:
+        sources: Mapping of column prefixes to functions returning the rows
+            collected by a tracker since the previous call, e.g. the `read`
+            method of a [resource_tracker.tiny_data_frame.IncrementalCsvReader][]
+            or a [resource_tracker.ring_buffer.RingBufferReader][] with
+            `keep=False`. The rows of the sources are paired in order, and
+            added as one sample with the timestamp of the first source, and the
+            other columns prefixed. Max. `raw_samples` rows are kept waiting
+            for the other sources, e.g. when a tracker has stopped. Defaults to
+            None, only adding samples via `add`.
+        raw_samples: The number of most recent samples kept as-is, and the max.
+            number of periods kept in each rollup. Defaults to 3600.
+        resolutions: The length of the rollup periods in seconds, from the
+            finest to the coarsest, each being a multiple of the previous one.
+            Defaults to 1 and 15 minutes.
+
+    Example:
+
+        >>> retention = MetricsRetention(raw_samples=3, resolutions=(2, 4))
+        >>> for i in range(10):
+        ...     retention.add({"timestamp": i, "cpu_usage": i % 3})
+        >>> retention.raw["timestamp"]
+        [7, 8, 9]
+        >>> retention.rollup(2)["cpu_usage_max"]
+        [2, 2, 1]
+        >>> history = retention.history()
+        >>> history["timestamp"]
+        [0, 4, 6, 8, 9]
+        >>> history["cpu_usage"]
+        [0.75, 1.5, 0.5, 2, 0]
+        >>> retention.stats([StatSpec("cpu_usage", mean), StatSpec("cpu_usage", max)])
+        {'cpu_usage': {'mean': 0.9, 'max': 2}}
+    """
+
+    def __init__(
+        self,
+        sources: Optional[Dict[str, Callable[[], Union[TinyDataFrame, dict]]]] = None,
+        raw_samples: int = 3600,
+        resolutions: Sequence[float] = (60, 900),
+    ):
+        self.sources = sources or {}
+        self.raw_samples = raw_samples
+        self.samples = 0
+        """The number of samples added so far."""
+        self.columns: List[str] = []
+        self.rows: Deque[tuple] = deque(maxlen=raw_samples)
+        self.dropped: Optional[float] = None
+        """The timestamp of the last sample dropped from the raw samples."""
+        self.rollups = [Rollup(resolution, raw_samples) for resolution in resolutions]
+        self.totals: Aggregates = []
+        """The aggregates of all samples added so far."""
+        self._pending = {prefix: deque() for prefix in self.sources}
+        self._lock = Lock()
+
+    def update(self) -> None:
+        """Read the new rows from the sources, and add the ones available from all sources."""
+        with self._lock:
+            for prefix, source in self.sources.items():
+                rows = source()
+                if isinstance(rows, dict):
+                    rows = TinyDataFrame(data=rows)
+                pending = self._pending[prefix]
+                pending.extend(rows)
+                overflow = len(pending) - self.raw_samples
+                if overflow > 0:
+                    for _ in range(overflow):
+                        pending.popleft()
+                    logger.warning(
+                        f"Dropped {overflow} rows waiting for the other sources."
+                    )
+            while self._pending and all(self._pending.values()):
+                sample = {}
+                for prefix, pending in self._pending.items():
+                    for column, value in pending.popleft().items():
+                        if column == "timestamp":
+                            sample.setdefault(column, value)
+                        else:
+                            sample[prefix + column] = value
+                self._add(sample)
+
+    def add(self, sample: dict) -> None:
+        """Add a sample, and update the rollups.
+
+        Args:
+            sample: Mapping of column names to values, including a `timestamp`.
+                The columns are fixed by the first sample.
+        """
+        with self._lock:
+            self._add(sample)
+
+    def _add(self, sample: dict) -> None:
+        if not self.columns:
+            self.columns = list(sample.keys())
+            self.totals = [[0, 0, None, None] for _ in self.columns]
+        values = tuple(sample.get(column) for column in self.columns)
+        if len(self.rows) == self.rows.maxlen:
+            self.dropped = self.rows[0][self.columns.index("timestamp")]
+        self.rows.append(values)
+        self.samples += 1
+        aggregates = aggregate(values)
+        merge_aggregates(self.totals, aggregates)
+        period = (sample["timestamp"], aggregates)
+        for rollup in self.rollups:
+            period = rollup.add(*period)
+            if period is None:
+                break
+
+    def _to_data_frame(self, rows: List[tuple]) -> TinyDataFrame:
+        return TinyDataFrame(
+            data={
+                column: [row[index] for row in rows]
+                for index, column in enumerate(self.columns)
+            }
+        )
+
+    def _summarize(self, aggregates: Aggregates) -> tuple:
+        """The timestamp of the first sample and the mean of the other columns."""
+        return tuple(
+            column[2]
+            if name == "timestamp"
+            else (column[1] / column[0] if column[0] else None)
+            for name, column in zip(self.columns, aggregates)
+        )
+
+    @property
+    def raw(self) -> TinyDataFrame:
+        """The most recent samples."""
+        with self._lock:
+            return self._to_data_frame(list(self.rows))
+
+    def since(self, offset: int) -> Tuple[TinyDataFrame, int]:
+        """Get the samples added after the first `offset` samples.
+
+        Args:
+            offset: The number of samples already processed.
+
+        Returns:
+            The most recent samples not processed yet (skipping the ones
+            already dropped), and the number of samples added so far.
+        """
+        with self._lock:
+            skip = offset - (self.samples - len(self.rows))
+            if skip < 0:
+                logger.warning(f"Skipped {-skip} samples no longer retained.")
+            rows = list(self.rows)[max(0, skip) :]
+            return self._to_data_frame(rows), self.samples
+
+    def rollup(self, resolution: float) -> TinyDataFrame:
+        """Get the closed periods of a rollup.
+
+        Args:
+            resolution: The length of the periods in seconds.
+
+        Returns:
+            The timestamp of the first sample and the number of samples in
+            each period, and the min, mean and max of each other column with
+            the `_min`, `_mean` and `_max` suffixes.
+
+        Raises:
+            ValueError: If there is no rollup with the given resolution.
+        """
+        with self._lock:
+            rollup = next((r for r in self.rollups if r.resolution == resolution), None)
+            if rollup is None:
+                raise ValueError(f"No rollup with resolution: {resolution}")
+            data = {"timestamp": [], "samples": []}
+            for column in self.columns:
+                if column != "timestamp":
+                    for suffix in ("_min", "_mean", "_max"):
+                        data[column + suffix] = []
+            for _, aggregates in rollup.periods:
+                for column, (count, total, low, high) in zip(self.columns, aggregates):
+                    if column == "timestamp":
+                        data["timestamp"].append(low)
+                        data["samples"].append(count)
+                    else:
+                        data[column + "_min"].append(low)
+                        data[column + "_mean"].append(total / count if count else None)
+                        data[column + "_max"].append(high)
+            return TinyDataFrame(data=data)
+
+    def history(self) -> TinyDataFrame:
+        """Get the most recent samples preceded by the means of the older periods.
+
+        Each part of the history is covered by the finest resolution still
+        available: the raw samples since the end of the period of the finest
+        rollup including the last dropped sample, preceded by the periods of
+        the finest rollup since the end of the period of the next rollup
+        including the last dropped period etc. So the raw samples should cover
+        at least a period of the finest rollup, and each rollup a period of
+        the next one, otherwise there might be gaps in the history.
+
+        Returns:
+            The samples and periods with the same columns as the samples. The
+            periods have the timestamp of their first sample, and the mean of
+            the other columns.
+        """
+        with self._lock:
+            rows = list(self.rows)
+            ts = self.columns.index("timestamp") if self.columns else 0
+            # samples were dropped, so the older ones come from the rollups
+            cut = None
+            if self.rollups and self.dropped is not None:
+                first = self.rollups[0]
+                cut = first.get_start(self.dropped) + first.resolution
+                rows = [row for row in rows if row[ts] >= cut]
+            for index, rollup in enumerate(self.rollups):
+                if cut is None:
+                    break
+                periods = [period for period in rollup.periods if period[0] < cut]
+                cut = None
+                if rollup.dropped is not None and index + 1 < len(self.rollups):
+                    coarser = self.rollups[index + 1]
+                    cut = coarser.get_start(rollup.dropped) + coarser.resolution
+                    periods = [period for period in periods if period[0] >= cut]
+                rows = [self._summarize(aggregates) for _, aggregates in periods] + rows
+            return self._to_data_frame(rows)
+
+    def stats(self, specs: List[StatSpec]) -> dict:
+        """Compute the statistics of all samples from the running totals.
+
+        Args:
+            specs: A list of [resource_tracker.tiny_data_frame.StatSpec][]
+                objects. Only the specs aggregating a column with `mean`,
+                `min`, `max` or `sum` can be computed, others are skipped.
+
+        Returns:
+            A dictionary containing the computed statistics.
+        """
+        stats = {}
+        with self._lock:
+            for spec in specs:
+                if spec.agg not in EXACT_AGGREGATES or spec.column not in self.columns:
+                    continue
+                count, total, low, high = self.totals[self.columns.index(spec.column)]
+                if not count:
+                    continue
+                value = {mean: total / count, min: low, max: high, sum: total}[spec.agg]
+                if spec.round is not None:
+                    value = round(value, spec.round)
+                agg_name = spec.agg_name or spec.agg.__name__
+                stats.setdefault(spec.column, {})[agg_name] = value
+        return stats
+
+
+def update_retention(retention: MetricsRetention, interval: float, stop_event: Event):
+    """Read the new rows into the retained metrics periodically until stopped.
+
+    To be run in a background thread, so that the rows are not accumulating
+    in the sources (e.g. a ring buffer) when the metrics are not accessed for
+    a long time.
+
+    Args:
+        retention: The retained metrics to update.
+        interval: Time to wait between updates in seconds.
+        stop_event: Event to stop updating when set.
+    """
+    while not stop_event.wait(interval):
+        try:
+            retention.update()
+        except Exception as e:
+            logger.warning(f"Failed to update the retained metrics: {e}")
@@ -0,0 +1,291 @@
+"""
+Shared-memory ring buffer to pass the collected metrics from the trackers to the parent process.
+
+The [resource_tracker.ResourceTracker][] creates a
+[resource_tracker.ring_buffer.RingBufferReader][] for each tracker with
+`transport="shared_memory"`, and the tracker (running in a subprocess, thread or
+agent) attaches to it by name with a
+[resource_tracker.ring_buffer.RingBufferWriter][]. The rows are stored as fixed
+width float64 records, so reading new rows requires neither a CSV file nor
+parsing text.
+
+Layout of the shared memory block:
+
+- 4 int64 header fields: the sequence counter (number of rows written so far),
+  the number of columns (0 until the first row is written), the capacity (number
+  of row slots) and the max. number of columns.
+- The column names as a null-padded JSON array (max. 4 KiB).
+- `capacity` rows of `max_columns` float64 values, written in a circle. Missing
+  values (None) are stored as NaN.
+
+The writer updates the sequence counter only after writing a row, so the reader
+never sees a partially written row. Rows overwritten before being read are
+counted as lost.
+"""
+
+from json import dumps, loads
+from logging import getLogger
+from math import isnan, nan
+from multiprocessing.shared_memory import SharedMemory
+from struct import calcsize, pack_into, unpack_from
+from threading import Event, Lock
+from typing import Dict, List, Optional, Union
+
+logger = getLogger(__name__)
+
+HEADER_FORMAT = "4q"
+COLUMNS_SIZE = 4096
+DATA_OFFSET = calcsize(HEADER_FORMAT) + COLUMNS_SIZE
+
+
+def get_ring_buffer_size(capacity: int, max_columns: int) -> int:
+    """Get the size of the shared memory block of a ring buffer in bytes.
+
+    Args:
+        capacity: The number of rows kept in the ring buffer.
+        max_columns: The max. number of columns of a row.
+
+    Returns:
+        The size in bytes.
+
+    Example:
+
+        >>> get_ring_buffer_size(10, 4)
+        4448
+    """
+    return DATA_OFFSET + capacity * max_columns * 8
+
+
+def attach_shared_memory(name: str) -> SharedMemory:
+    """Attach to an existing shared memory block without taking over its cleanup.
+
+    The process creating the block is responsible for unlinking it, but
+    before Python 3.13, `multiprocessing` would also unlink it when a process
+    with its own resource tracker (e.g. started via
+    [resource_tracker.agent][]) exits, so the block is unregistered there.
+    Threads and forked or spawned subprocesses share the resource tracker of
+    the creating process, so their registration is left as-is.
+
+    Args:
+        name: The name of the shared memory block.
+
+    Returns:
+        The attached shared memory block.
+    """
+    try:
+        return SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13
+        from multiprocessing import resource_tracker
+
+        own_tracker = getattr(resource_tracker._resource_tracker, "_fd", None) is None
+        shared_memory = SharedMemory(name=name)
+        if own_tracker:
+            resource_tracker.unregister(shared_memory._name, "shared_memory")
+        return shared_memory
+
+
+class RingBufferWriter:
+    """Write rows of metrics into a shared-memory ring buffer.
+
+    The column names are fixed by the first written row.
+
+    Args:
+        name: The name of the shared memory block created by
+            [resource_tracker.ring_buffer.RingBufferReader][].
+    """
+
+    def __init__(self, name: str):
+        self.shared_memory = attach_shared_memory(name)
+        self.buffer = self.shared_memory.buf
+        sequence, _, self.capacity, self.max_columns = unpack_from(
+            HEADER_FORMAT, self.buffer
+        )
+        self.sequence = sequence
+        self.columns = None
+
+    def write(self, row: Dict[str, Optional[Union[int, float]]]):
+        """Write a row into the next slot of the ring buffer.
+
+        Args:
+            row: Mapping of column names to numeric values (or None).
+
+        Raises:
+            ValueError: If the row has too many columns for the ring buffer.
+        """
+        if self.columns is None:
+            columns = dumps(list(row.keys())).encode()
+            if len(row) > self.max_columns or len(columns) > COLUMNS_SIZE:
+                raise ValueError(
+                    f"Too many columns ({len(row)}) for the shared memory ring buffer."
+                )
+            self.columns = list(row.keys())
+            self.buffer[calcsize(HEADER_FORMAT) : DATA_OFFSET] = columns.ljust(
+                COLUMNS_SIZE, b"\0"
+            )
+            pack_into("q", self.buffer, 8, len(self.columns))
+        values = [nan if value is None else value for value in row.values()]
+        slot = self.sequence % self.capacity
+        pack_into(
+            f"{len(values)}d",
+            self.buffer,
+            DATA_OFFSET + slot * self.max_columns * 8,
+            *values,
+        )
+        # publish the row only after it was written
+        self.sequence += 1
+        pack_into("q", self.buffer, 0, self.sequence)
+
+    def close(self):
+        """Detach from the shared memory block."""
+        self.buffer = None
+        self.shared_memory.close()
+
+
+class RingBufferReader:
+    """Create a shared-memory ring buffer, and read the rows written into it.
+
+    The rows read are accumulated in memory, so make sure to read more often
+    than every `capacity - 1` samples (e.g. via
+    [resource_tracker.ring_buffer.drain_ring_buffers][] in a background thread),
+    otherwise the overwritten rows are lost. Reading is thread-safe.
+
+    Args:
+        capacity: The number of rows kept in the ring buffer. Defaults to 1024.
+        max_columns: The max. number of columns of a row. Defaults to 256.
+        keep: Whether to keep all rows read so far in memory. Defaults to True.
+            If False, `read` returns only the rows not returned before, e.g.
+            when passing them on to [resource_tracker.retention.MetricsRetention][].
+    """
+
+    def __init__(self, capacity: int = 1024, max_columns: int = 256, keep: bool = True):
+        self.shared_memory = SharedMemory(
+            create=True, size=get_ring_buffer_size(capacity, max_columns)
+        )
+        self.name = self.shared_memory.name
+        pack_into(HEADER_FORMAT, self.shared_memory.buf, 0, 0, 0, capacity, max_columns)
+        self.capacity = capacity
+        self.max_columns = max_columns
+        self.keep = keep
+        self.sequence = 0
+        self.lost = 0
+        self.columns: List[str] = []
+        # the rows returned so far with keep=True, and the ones not returned yet
+        self.data: List[List[Optional[Union[int, float]]]] = []
+        self.pending: List[List[Optional[Union[int, float]]]] = []
+        self.lock = Lock()
+
+    def read(self) -> Dict[str, List[Optional[Union[int, float]]]]:
+        """Read the rows written since the last call.
+
+        Returns:
+            All rows read so far (or only the rows not returned before with
+            `keep=False`) as a dictionary of column vectors. Integral values
+            are returned as `int`, and NaN as None, like when parsing the CSV
+            files written by the trackers. With `keep=True`, the column vectors
+            are not copied, so reading takes time proportional to the number of
+            new rows only: they must not be modified, and they are extended in
+            place with the new rows on later calls.
+        """
+        with self.lock:
+            self._poll()
+            pending, self.pending = self.pending, [[] for _ in self.columns]
+            if not self.keep:
+                return dict(zip(self.columns, pending))
+            # extended from the last column, so that the first column (used for
+            # the number of rows) is never longer than the others while the
+            # previously returned columns are being read
+            for column, values in reversed(list(zip(self.data, pending))):
+                column.extend(values)
+            return dict(zip(self.columns, self.data))
+
+    def poll(self):
+        """Move the rows written since the last call into memory without returning them."""
+        with self.lock:
+            self._poll()
+
+    def _poll(self):
+        buffer = self.shared_memory.buf
+        if buffer is None:
+            # already closed
+            return
+        sequence, n_columns = unpack_from("2q", buffer)
+        if n_columns and not self.columns:
+            columns = bytes(buffer[calcsize(HEADER_FORMAT) : DATA_OFFSET])
+            self.columns = loads(columns.rstrip(b"\0"))
+            self.data = [[] for _ in self.columns]
+            self.pending = [[] for _ in self.columns]
+        start = max(self.sequence, sequence - self.capacity)
+        rows = [
+            unpack_from(
+                f"{n_columns}d",
+                buffer,
+                DATA_OFFSET + (index % self.capacity) * self.max_columns * 8,
+            )
+            for index in range(start, sequence)
+        ]
+        # drop the rows that might have been overwritten while reading them,
+        # including the slot of the row being written after the last published one
+        overwritten = min(
+            len(rows),
+            max(0, unpack_from("q", buffer)[0] - self.capacity + 1 - start),
+        )
+        rows = rows[overwritten:]
+        lost = start + overwritten - self.sequence
+        if lost > 0:
+            self.lost += lost
+            logger.warning(
+                f"Lost {lost} rows overwritten in the shared memory ring buffer."
+            )
+        for row in rows:
+            for column, value in zip(self.pending, row):
+                if isnan(value):
+                    column.append(None)
+                elif value.is_integer():
+                    column.append(int(value))
+                else:
+                    column.append(value)
+        self.sequence = sequence
+
+    def close(self):
+        """Release and remove the shared memory block.
+
+        The rows read so far remain available via `read`.
+        """
+        with self.lock:
+            if self.shared_memory.buf is None:
+                return
+            self.shared_memory.close()
+            self.shared_memory.unlink()
+
+
+def drain_ring_buffers(
+    readers: List[RingBufferReader], interval: float, stop_event: Event
+):
+    """Read the new rows of the ring buffers periodically until stopped.
+
+    To be run in a background thread, so that no rows are lost when the
+    collected metrics are not accessed for a long time.
+
+    Args:
+        readers: The ring buffers to read.
+        interval: Time to wait between reads in seconds.
+        stop_event: Event to stop reading when set.
+    """
+    while not stop_event.wait(interval):
+        for reader in readers:
+            reader.poll()
+
+
+def close_ring_buffers(readers: List[RingBufferReader], stop_event: Event):
+    """Stop draining, read the remaining rows and remove the ring buffers.
+
+    Args:
+        readers: The ring buffers to close.
+        stop_event: Event stopping [resource_tracker.ring_buffer.drain_ring_buffers][].
+    """
+    stop_event.set()
+    for reader in readers:
+        # keep the rows not read yet
+        reader.poll()
+        reader.close()
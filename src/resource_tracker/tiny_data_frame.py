@@ -6,10 +6,11 @@ a list of lists (column vectors) and do whatever you want with it.
 """
 
 from collections import defaultdict
-from csv import QUOTE_MINIMAL, QUOTE_NONNUMERIC, DictReader
+from csv import QUOTE_MINIMAL, QUOTE_NONNUMERIC, DictReader, reader
 from csv import writer as csv_writer
 from io import StringIO
 from logging import getLogger
+from threading import Lock
 from time import sleep
 from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Union
 from urllib.parse import urlparse
@@ -31,6 +32,25 @@ class StatSpec(NamedTuple):
     """The number of decimal places to round the statistic to. Defaults to None, which means no rounding."""
 
 
+def parse_csv_value(value: Optional[str]) -> Union[str, int, float, None]:
+    """Convert a numeric string to int/float as appropriate, keep as-is otherwise.
+
+    Example:
+
+        >>> [parse_csv_value(value) for value in ["42", "4.2", "foo", ""]]
+        [42, 4.2, 'foo', '']
+    """
+    if isinstance(value, str):
+        try:
+            return int(value)
+        except ValueError:
+            try:
+                return float(value)
+            except ValueError:
+                pass
+    return value
+
+
 class TinyDataFrame:
     """A very inefficient data-frame implementation with a few features.
 
@@ -166,16 +186,8 @@ class TinyDataFrame:
                 for record in records:
                     if None in record.keys():
                         raise ValueError("Corrupt CSV file with unknown column names.")
-                    # convert numeric strings to int/float as appropriate, keep string otherwise
                     for key, value in record.items():
-                        if isinstance(value, str):
-                            try:
-                                record[key] = int(value)
-                            except ValueError:
-                                try:
-                                    record[key] = float(value)
-                                except ValueError:
-                                    pass
+                        record[key] = parse_csv_value(value)
                 return records
             except Exception as e:
                 last_error = e
@@ -398,3 +410,93 @@ class TinyDataFrame:
                     f"Error collecting statistic on {spec.column} with {spec.agg_name}: {e}"
                 )
         return stats
+
+
+class IncrementalCsvReader:
+    """Read a local CSV file being appended to, parsing only the new lines on each read.
+
+    Keeps the byte offset of the last complete line parsed and the column
+    vectors parsed so far, so reading a file with `n` new rows takes `O(n)`
+    time instead of re-parsing the whole file. Incomplete lines (still being
+    written) are left for the next read. If the file was truncated or
+    replaced with a smaller one, it's parsed again from the beginning.
+
+    Reading is thread-safe.
+
+    Args:
+        csv_file_path: Path to a properly quoted CSV file with a header, and
+            the same columns used on all lines (e.g. written by the trackers).
+        keep: Whether to keep all rows parsed so far in memory. Defaults to
+            True. If False, `read` returns only the rows appended since the
+            last read.
+    """
+
+    def __init__(self, csv_file_path: str, keep: bool = True):
+        self.csv_file_path = csv_file_path
+        self.keep = keep
+        self.offset = 0
+        self.columns: List[str] = []
+        self._data: List[List[Union[str, int, float, None]]] = []
+        self._lock = Lock()
+
+    def read(self, retries: int = 0, retry_delay: float = 0.1) -> TinyDataFrame:
+        """Parse the lines appended since the last read.
+
+        Args:
+            retries: Number of retry attempts if the file cannot be opened,
+                e.g. because it is being locked for writing by another process.
+                Defaults to 0.
+            retry_delay: Initial delay between retries in seconds. Doubles after each retry. Defaults to 0.1.
+
+        Returns:
+            A [resource_tracker.tiny_data_frame.TinyDataFrame][] with all rows
+            parsed so far (or only the new rows with `keep=False`).
+
+        Raises:
+            OSError: If the file cannot be opened after all retry attempts.
+            ValueError: If a line has a different number of fields than the header.
+        """
+        with self._lock:
+            for attempt in range(retries + 1):
+                try:
+                    with open(self.csv_file_path, "rb") as f:
+                        f.seek(0, 2)
+                        if f.tell() < self.offset:
+                            logger.debug(
+                                f"CSV file truncated, re-reading: {self.csv_file_path}"
+                            )
+                            self.offset = 0
+                            self.columns = []
+                            self._data = []
+                        f.seek(self.offset)
+                        content = f.read()
+                    break
+                except OSError:
+                    if attempt == retries:
+                        raise
+                    sleep(retry_delay)
+                    retry_delay *= 2
+            # parse only complete lines
+            content = content[: content.rfind(b"\n") + 1]
+            lines = content.decode("utf-8").splitlines()
+            columns = self.columns
+            if lines and not columns:
+                columns = next(reader(lines[:1]))
+                lines = lines[1:]
+            rows = list(reader(lines))
+            for row in rows:
+                if len(row) != len(columns):
+                    raise ValueError("Corrupt CSV file with unknown column names.")
+            if (columns and not self.columns) or not self.keep:
+                self.columns = columns
+                self._data = [[] for _ in columns]
+            for row in rows:
+                for column, value in zip(self._data, row):
+                    column.append(parse_csv_value(value))
+            self.offset += len(content)
+            return TinyDataFrame(
+                data={
+                    column: list(values)
+                    for column, values in zip(self.columns, self._data)
+                }
+            )
@@ -16,6 +16,7 @@ thread/process yourself.
 from contextlib import suppress
 from csv import QUOTE_NONNUMERIC
 from csv import writer as csv_writer
+from functools import partial
 from gzip import open as gzip_open
 from io import StringIO
 from json import dumps as json_dumps
@@ -23,390 +24,201 @@ from json import loads as json_loads
 from logging import getLogger
 from math import ceil
 from multiprocessing import get_context
-from os import environ, getpid, path
+from os import environ, getpid, path, pathsep
+from queue import SimpleQueue
 from signal import SIGINT, SIGTERM, signal
 from statistics import mean
-from sys import platform, stdout
+from subprocess import DEVNULL, Popen
+from sys import executable, platform
+from sys import path as sys_path
 from tempfile import NamedTemporaryFile
-from threading import Thread
+from threading import Event, Thread, current_thread, main_thread
 from time import sleep, time
-from typing import List, Literal, Optional
-from warnings import warn
+from typing import Callable, Dict, List, Literal, Optional, Sequence
 from weakref import finalize
 
 from ._version import __version__
 from .cloud_info import get_cloud_info
 from .column_maps import (
-    BYTE_MAPPING,
-    HUMAN_NAMES_MAPPING,
+    OVERHEAD_COLUMNS,
+    PROCESS_METRIC_GROUPS,
     REPORT_CSV_MAPPING,
+    REPORT_GPU_DEVICE_MAPPING,
+    SAMPLING_COLUMNS,
     SERVER_ALLOCATION_CHECKS,
+    SYSTEM_METRIC_GROUPS,
 )
 from .helpers import (
+    TRACKER_IMPLEMENTATIONS,
     aggregate_stats,
     cleanup_files,
     cleanup_processes,
-    get_tracker_implementation,
+    cleanup_subprocesses,
+    cleanup_threads,
+    get_byte_factor,
+    get_human_name,
     is_psutil_available,
-    render_csv_row,
+    resolve_tracker_implementation,
+    split_gpu_device_column,
 )
 from .keeper import get_instance_price, get_recommended_cloud_servers
 from .report import Report, _read_report_template_files, round_memory
 from .sentinel_api import RunStatus
 from .server_info import get_server_info
 from .tiny_bars import render_template
-from .tiny_data_frame import StatSpec, TinyDataFrame
+from .tiny_data_frame import IncrementalCsvReader, StatSpec, TinyDataFrame
+
+# re-exported for backward compatibility
+from .trackers import (  # noqa: F401
+    CombinedTracker,
+    PidTracker,
+    ProcessTracker,
+    SystemTracker,
+)
 
 logger = getLogger(__name__)
 
 
-class ProcessTracker:
-    """Track resource usage of a process and optionally its children.
-
-    This class monitors system resources like CPU times and usage, memory usage,
-    GPU and VRAM utilization, I/O operations for a given process ID and
-    optionally its child processes.
-
-    Data is collected every `interval` seconds and written to the stdout or
-    `output_file` (if provided) as CSV. Currently, the following columns are
-    tracked:
-
-    - timestamp (float): The current timestamp.
-    - pid (int): The monitored process ID.
-    - children (int | None): The current number of child processes.
-    - utime (int): The total user+nice mode CPU time in seconds.
-    - stime (int): The total system mode CPU time in seconds.
-    - cpu_usage (float): The current CPU usage between 0 and number of CPUs.
-    - memory_mib (float): The current memory usage in MiB. Implementation depends on the
-      operating system, and it is preferably PSS (Proportional Set Size) on Linux,
-      USS (Unique Set Size) on macOS and Windows, and RSS (Resident Set Size) on
-      Windows.
-    - disk_read_bytes (int): The total number of bytes read from disk.
-    - disk_write_bytes (int): The total number of bytes written to disk.
-    - gpu_usage (float): The current GPU utilization between 0 and GPU count.
-    - gpu_vram_mib (float): The current GPU memory used in MiB.
-    - gpu_utilized (int): The number of GPUs with utilization > 0.
+def split_combined_metrics(metrics: TinyDataFrame, prefix: str) -> TinyDataFrame:
+    """Select the process- or system-level metrics from the combined metrics.
 
     Args:
-        pid (int, optional): Process ID to track. Defaults to current process ID.
-        start_time: Time when to start tracking. Defaults to current time.
-        interval (float, optional): Sampling interval in seconds. Defaults to 1.
-        children (bool, optional): Whether to track child processes. Defaults to True.
-        autostart (bool, optional): Whether to start tracking immediately. Defaults to True.
-        output_file (str, optional): File to write the output to. Defaults to None, print to stdout.
-    """
-
-    def __init__(
-        self,
-        pid: int = getpid(),
-        start_time: float = time(),
-        interval: float = 1,
-        children: bool = True,
-        autostart: bool = True,
-        output_file: str = None,
-    ):
-        self.get_process_stats, _ = get_tracker_implementation()
-
-        self.pid = pid
-        self.status = "running"
-        self.interval = interval
-        self.cycle = 0
-        self.children = children
-        self.start_time = start_time
-
-        # initial data collection so that we can use that as a baseline when diffing after the first interval
-        self.stats = self.get_process_stats(pid, children)
+        metrics: The metrics collected by [resource_tracker.CombinedTracker][].
+        prefix: The prefix of the columns to select, e.g. "process_".
 
-        if autostart:
-            # wait for the start time to be reached
-            if start_time > time():
-                sleep(start_time - time())
-            # we can now start. 1st interval used to collect baseline
-            self.start_tracking(output_file)
-
-    def __call__(self):
-        """Dummy method to make this class callable."""
-        pass
-
-    def diff_stats(self):
-        """Calculate stats since last call."""
-        last_stats = self.stats
-        self.stats = self.get_process_stats(self.pid, self.children)
-        self.cycle += 1
-
-        return {
-            "timestamp": round(self.stats["timestamp"], 3),
-            "pid": self.pid,
-            "children": (
-                self.stats["children"] if self.stats.get("children") else None
-            ),
-            "utime": max(0, round(self.stats["utime"] - last_stats["utime"], 6)),
-            "stime": max(0, round(self.stats["stime"] - last_stats["stime"], 6)),
-            "cpu_usage": round(
-                max(
-                    0,
-                    (
-                        (self.stats["utime"] + self.stats["stime"])
-                        - (last_stats["utime"] + last_stats["stime"])
-                    )
-                    / (self.stats["timestamp"] - last_stats["timestamp"]),
-                ),
-                4,
-            ),
-            "memory_mib": round(self.stats["memory_mib"], 4),
-            "disk_read_bytes": max(
-                0, self.stats["disk_read_bytes"] - last_stats["disk_read_bytes"]
-            ),
-            "disk_write_bytes": max(
-                0, self.stats["disk_write_bytes"] - last_stats["disk_write_bytes"]
-            ),
-            "gpu_usage": round(self.stats["gpu_usage"], 4),
-            "gpu_vram_mib": round(self.stats["gpu_vram_mib"], 4),
-            "gpu_utilized": self.stats["gpu_utilized"],
+    Returns:
+        The timestamp, the sampling diagnostics (see
+        [resource_tracker.column_maps.SAMPLING_COLUMNS][]) shared by both, and
+        the selected columns without the prefix.
+    """
+    if not metrics.columns:
+        return metrics
+    return TinyDataFrame(
+        {
+            "timestamp": metrics["timestamp"],
+            **{
+                column: metrics[column]
+                for column in SAMPLING_COLUMNS
+                if column in metrics.columns
+            },
+            **{
+                column[len(prefix) :]: metrics[column]
+                for column in metrics.columns
+                if column.startswith(prefix)
+            },
         }
+    )
 
-    def start_tracking(
-        self, output_file: Optional[str] = None, print_header: bool = True
-    ):
-        """Start an infinite loop tracking resource usage of the process until it exits.
 
-        A CSV line is written every `interval` seconds.
+def summarize_sampling(metrics: TinyDataFrame, interval: float) -> Optional[dict]:
+    """Summarize the sampling diagnostics of a tracker.
 
-        Args:
-            output_file: File to write the output to. Defaults to None, printing to stdout.
-            print_header: Whether to print the header of the CSV. Defaults to True.
-        """
-        file_handle = open(output_file, "wb") if output_file else stdout.buffer
-        try:
-            while True:
-                current_stats = self.diff_stats()
-                if current_stats["memory_mib"] == 0:
-                    # the process has exited
-                    self.status = "exited"
-                    break
-                # don't print values yet, we collect data for the 1st baseline
-                if self.cycle == 1:
-                    if print_header:
-                        file_handle.write(
-                            render_csv_row(
-                                current_stats.keys(), quoting=QUOTE_NONNUMERIC
-                            )
-                        )
-                else:
-                    file_handle.write(
-                        render_csv_row(current_stats.values(), quoting=QUOTE_NONNUMERIC)
-                    )
-                if output_file:
-                    file_handle.flush()
-                # sleep until the next interval
-                sleep(max(0, self.start_time + self.interval * self.cycle - time()))
-        finally:
-            if output_file and not file_handle.closed:
-                file_handle.close()
+    Args:
+        metrics: The metrics collected by a tracker, including the
+            [resource_tracker.column_maps.SAMPLING_COLUMNS][].
+        interval: The sampling interval of the tracker in seconds.
 
+    Returns:
+        The mean and max of the sampling latency and schedule lag in
+        milliseconds, and the number of ticks skipped as the tracker fell
+        behind (estimated from the gaps between the scheduled times of the
+        samples), or None if no diagnostics were collected.
 
-class PidTracker(ProcessTracker):
-    """Old name for [resource_tracker.ProcessTracker][].
+    Example:
 
-    This class is deprecated and will be removed in the future.
+        >>> metrics = TinyDataFrame(
+        ...     {
+        ...         "timestamp": [1.01, 2.02, 5.5],
+        ...         "sample_latency_ms": [2, 4, 900],
+        ...         "schedule_lag_ms": [10, 20, 500],
+        ...     }
+        ... )
+        >>> summarize_sampling(metrics, interval=1)
+        {'sample_latency_ms': {'mean': 302, 'max': 900}, 'schedule_lag_ms': {'mean': 176.667, 'max': 500}, 'skipped_ticks': 2}
     """
-
-    def __init__(self, *args, **kwargs):
-        warn(
-            "PidTracker is deprecated and will be removed in a future release. "
-            "Please use ProcessTracker instead.",
-            DeprecationWarning,
-            stacklevel=2,
-        )
-        super().__init__(*args, **kwargs)
-
-
-class SystemTracker:
-    """Track system-wide resource usage.
-
-    This class monitors system resources like CPU times and usage, memory usage,
-    GPU and VRAM utilization, disk I/O, and network traffic for the entire system.
-
-    Data is collected every `interval` seconds and written to the stdout or
-    `output_file` (if provided) as CSV. Currently, the following columns are
-    tracked:
-
-    - timestamp (float): The current timestamp.
-    - processes (int): The number of running processes.
-    - utime (int): The total user+nice mode CPU time in seconds.
-    - stime (int): The total system mode CPU time in seconds.
-    - cpu_usage (float): The current CPU usage between 0 and number of CPUs.
-    - memory_free_mib (float): The amount of free memory in MiB.
-    - memory_used_mib (float): The amount of used memory in MiB.
-    - memory_buffers_mib (float): The amount of memory used for buffers in MiB.
-    - memory_cached_mib (float): The amount of memory used for caching in MiB.
-    - memory_active_mib (float): The amount of memory used for active pages in MiB.
-    - memory_inactive_mib (float): The amount of memory used for inactive pages in MiB.
-    - disk_read_bytes (int): The total number of bytes read from disk.
-    - disk_write_bytes (int): The total number of bytes written to disk.
-    - disk_space_total_gb (float): The total disk space in GB.
-    - disk_space_used_gb (float): The used disk space in GB.
-    - disk_space_free_gb (float): The free disk space in GB.
-    - net_recv_bytes (int): The total number of bytes received over network.
-    - net_sent_bytes (int): The total number of bytes sent over network.
-    - gpu_usage (float): The current GPU utilization between 0 and GPU count.
-    - gpu_vram_mib (float): The current GPU memory used in MiB.
-    - gpu_utilized (int): The number of GPUs with utilization > 0.
+    if len(metrics) == 0 or not all(c in metrics.columns for c in SAMPLING_COLUMNS):
+        return None
+    summary = {
+        column: {
+            "mean": round(mean(metrics[column]), 3),
+            "max": max(metrics[column]),
+        }
+        for column in SAMPLING_COLUMNS
+    }
+    scheduled = [
+        timestamp - lag / 1000
+        for timestamp, lag in zip(metrics["timestamp"], metrics["schedule_lag_ms"])
+    ]
+    summary["skipped_ticks"] = sum(
+        max(0, round((current - previous) / interval) - 1)
+        for previous, current in zip(scheduled, scheduled[1:])
+    )
+    return summary
+
+
+def add_tracker_overhead(metrics: TinyDataFrame) -> None:
+    """Add the total resource usage of all trackers to the combined metrics.
+
+    Sums the `process_tracker_*` and `system_tracker_*` columns reported by the
+    trackers into `tracker_*` columns in place. Columns without any reported
+    value (e.g. the memory usage when running in threads) are skipped.
 
     Args:
-        start_time: Time when to start tracking. Defaults to current time.
-        interval: Sampling interval in seconds. Defaults to 1.
-        autostart: Whether to start tracking immediately. Defaults to True.
-        output_file: File to write the output to. Defaults to None, print to stdout.
+        metrics: The combined metrics, see
+            [resource_tracker.ResourceTracker.get_combined_metrics][].
     """
+    for column in OVERHEAD_COLUMNS:
+        parts = [
+            metrics[prefix + column]
+            for prefix in ("process_", "system_")
+            if prefix + column in metrics.columns
+        ]
+        # missing values are parsed from the CSV files as empty strings
+        if any(value not in (None, "") for values in parts for value in values):
+            metrics[column] = [
+                sum(value or 0 for value in values) for values in zip(*parts)
+            ]
 
-    def __init__(
-        self,
-        start_time: float = time(),
-        interval: float = 1,
-        autostart: bool = True,
-        output_file: str = None,
-    ):
-        _, self.get_system_stats = get_tracker_implementation()
-
-        self.status = "running"
-        self.interval = interval
-        self.cycle = 0
-        self.start_time = start_time
-
-        # dummy data collection so that diffing on the first time does not fail
-        self.stats = self.get_system_stats()
-
-        if autostart:
-            # wait for the start time to be reached
-            if start_time > time():
-                sleep(start_time - time())
-            # we can now start. 1st interval used to collect baseline
-            self.start_tracking(output_file)
-
-    def __call__(self):
-        """Dummy method to make this class callable."""
-        pass
-
-    def diff_stats(self):
-        """Calculate stats since last call."""
-        last_stats = self.stats
-        self.stats = self.get_system_stats()
-        self.cycle += 1
-
-        time_diff = self.stats["timestamp"] - last_stats["timestamp"]
-
-        total_read_bytes = 0
-        total_write_bytes = 0
-        for disk_name in set(self.stats["disk_stats"]) & set(last_stats["disk_stats"]):
-            read_bytes = max(
-                0,
-                self.stats["disk_stats"][disk_name]["read_bytes"]
-                - last_stats["disk_stats"][disk_name]["read_bytes"],
-            )
-            write_bytes = max(
-                0,
-                self.stats["disk_stats"][disk_name]["write_bytes"]
-                - last_stats["disk_stats"][disk_name]["write_bytes"],
-            )
-            total_read_bytes += read_bytes
-            total_write_bytes += write_bytes
-
-        disk_space_total = 0
-        disk_space_used = 0
-        disk_space_free = 0
-        for disk_space in self.stats["disk_spaces"].values():
-            disk_space_total += disk_space["total"]
-            disk_space_used += disk_space["used"]
-            disk_space_free += disk_space["free"]
 
-        return {
-            "timestamp": round(self.stats["timestamp"], 3),
-            "processes": self.stats["processes"],
-            "utime": max(0, round(self.stats["utime"] - last_stats["utime"], 6)),
-            "stime": max(0, round(self.stats["stime"] - last_stats["stime"], 6)),
-            "cpu_usage": round(
-                max(
-                    0,
-                    (
-                        (self.stats["utime"] + self.stats["stime"])
-                        - (last_stats["utime"] + last_stats["stime"])
-                    )
-                    / time_diff,
-                ),
-                4,
-            ),
-            "memory_free_mib": round(self.stats["memory_free_mib"], 4),
-            "memory_used_mib": round(self.stats["memory_used_mib"], 4),
-            "memory_buffers_mib": round(self.stats["memory_buffers_mib"], 4),
-            "memory_cached_mib": round(self.stats["memory_cached_mib"], 4),
-            "memory_active_mib": round(self.stats["memory_active_mib"], 4),
-            "memory_inactive_mib": round(self.stats["memory_inactive_mib"], 4),
-            "disk_read_bytes": total_read_bytes,
-            "disk_write_bytes": total_write_bytes,
-            "disk_space_total_gb": round(disk_space_total / 1000_000_000, 2),
-            "disk_space_used_gb": round(disk_space_used / 1000_000_000, 2),
-            "disk_space_free_gb": round(disk_space_free / 1000_000_000, 2),
-            "net_recv_bytes": max(
-                0, self.stats["net_recv_bytes"] - last_stats["net_recv_bytes"]
-            ),
-            "net_sent_bytes": max(
-                0, self.stats["net_sent_bytes"] - last_stats["net_sent_bytes"]
-            ),
-            "gpu_usage": round(self.stats["gpu_usage"], 4),
-            "gpu_vram_mib": round(self.stats["gpu_vram_mib"], 4),
-            "gpu_utilized": self.stats["gpu_utilized"],
-        }
+def start_agent(tracker_type: str, kwargs: dict) -> Popen:
+    """Start a tracker in a new Python process via the [resource_tracker.agent][] entry point.
 
-    def start_tracking(
-        self, output_file: Optional[str] = None, print_header: bool = True
-    ):
-        """Start an infinite loop tracking system resource usage.
+    Unlike forking or spawning via `multiprocessing`, the new process neither
+    copies the memory of the current process, nor imports its modules (e.g.
+    the main module or the reporting features of this package).
 
-        A CSV line is written every `interval` seconds.
+    Args:
+        tracker_type: The type of the tracker: "process", "system" or "combined".
+        kwargs: The JSON-serializable keyword arguments passed to the tracker class.
 
-        Args:
-            output_file: File to write the output to. Defaults to None, printing to stdout.
-            print_header: Whether to print the header of the CSV. Defaults to True.
-        """
-        file_handle = open(output_file, "wb") if output_file else stdout.buffer
-        try:
-            while True:
-                current_stats = self.diff_stats()
-                # don't print values yet, we collect data for the 1st baseline
-                if self.cycle == 1:
-                    if print_header:
-                        file_handle.write(
-                            render_csv_row(
-                                current_stats.keys(), quoting=QUOTE_NONNUMERIC
-                            )
-                        )
-                else:
-                    file_handle.write(
-                        render_csv_row(current_stats.values(), quoting=QUOTE_NONNUMERIC)
-                    )
-                if output_file:
-                    file_handle.flush()
-                # sleep until the next interval
-                sleep(max(0, self.start_time + self.interval * self.cycle - time()))
-        finally:
-            if output_file and not file_handle.closed:
-                file_handle.close()
+    Returns:
+        The started subprocess.
+    """
+    return Popen(
+        [executable, "-m", f"{__package__}.agent", tracker_type, json_dumps(kwargs)],
+        # the package might be only importable via the current sys.path, e.g. in Metaflow
+        env={**environ, "PYTHONPATH": pathsep.join(p for p in sys_path if p)},
+        stdin=DEVNULL,
+        stdout=DEVNULL,
+    )
 
 
 def _run_tracker(tracker_type, error_queue, **kwargs):
     """Run either ProcessTracker or SystemTracker with dynamic import resolution and error handling.
 
     This functions is standalone so that it can be pickled by multiprocessing,
-    and tries to clean up resources before exiting.
+    and tries to clean up resources before exiting. Also used as the target of
+    the thread when running with `method="thread"`.
     """
     from importlib import import_module
 
     def signal_handler(signum, frame):
         exit(0)
 
-    signal(SIGTERM, signal_handler)
-    signal(SIGINT, signal_handler)
+    # signal handlers can only be set in the main thread of a subprocess
+    if current_thread() is main_thread():
+        signal(SIGTERM, signal_handler)
+        signal(SIGINT, signal_handler)
 
     def resolve_class(tracker_type):
         # the trackers might be coming from the resource-tracker package,
@@ -423,6 +235,7 @@ def _run_tracker(tracker_type, error_queue, **kwargs):
         class_names = {
             "process": "ProcessTracker",
             "system": "SystemTracker",
+            "combined": "CombinedTracker",
         }
 
         for module_path in candidates:
@@ -466,10 +279,19 @@ class ResourceTracker:
 
     Args:
         pid: Process ID to track. Defaults to current process ID.
-        children: Whether to track child processes. Defaults to True.
+        children: Whether to track child processes. Defaults to True. The
+            tracker processes (and their helpers) are not counted as children.
         interval: Sampling interval in seconds. Defaults to 1.
         method: Multiprocessing method. Defaults to None, which tries to fork on
-            Linux and macOS, and spawn on Windows.
+            Linux and macOS, and spawn on Windows. "thread" runs the trackers in
+            daemon threads of the current process instead of subprocesses,
+            which avoids copying the page tables of a parent with a large heap
+            on fork, but the CPU time and memory of the trackers are then
+            included in the process-level metrics of the current process.
+            "agent" starts the trackers as new Python processes running only
+            the lean [resource_tracker.agent][] entry point, see
+            [resource_tracker.tracker.start_agent][], which neither copies nor
+            re-imports the current process.
         autostart: Whether to start tracking immediately. Defaults to True.
         track_processes: Whether to track resource usage at the process level.
             Defaults to True.
@@ -486,6 +308,69 @@ class ResourceTracker:
             enabled.  Defaults to 60.
         streaming_metadata: Optional dict of run metadata forwarded to the
             Sentinel API (e.g. ``project_name``, ``job_name``, ``tags``).
+        memory_sampling: How the process-level memory usage is measured, see
+            [resource_tracker.ProcessTracker][]. Defaults to "full".
+        process_discovery: How the descendant processes are discovered, see
+            [resource_tracker.ProcessTracker][]. Defaults to "children".
+        process_accounting: How the process-level resource usage is accounted
+            for, see [resource_tracker.ProcessTracker][]. Defaults to "tree".
+        intervals: Mapping of metric groups to their own sampling interval in
+            seconds, e.g. `{"disk_io": 1, "network": 1, "disk_space": 60,
+            "gpu": 2}` with `interval=0.1` to track CPU and memory usage every
+            100 ms. See [resource_tracker.SystemTracker][] for the supported
+            groups, of which "cpu", "memory", "disk_io" and "gpu" also apply to
+            the [resource_tracker.ProcessTracker][]. Defaults to None,
+            collecting all metrics every `interval` seconds.
+        process_counting: How the system-wide number of processes is counted,
+            see [resource_tracker.SystemTracker][]. Defaults to "scan".
+        cpu_accounting: How the process-level CPU usage is measured, see
+            [resource_tracker.ProcessTracker][]. Defaults to "ticks".
+        implementation: Which collector backend to use in both trackers:
+            "psutil", "procfs" (Linux only), or "auto" to run a short
+            calibration of both against `pid` when starting, and pick the
+            faster one. Defaults to None, reading the
+            `RESOURCE_TRACKER_IMPLEMENTATION` environment variable, and falling
+            back to psutil if installed, otherwise procfs. The selected
+            implementation and the calibration timings are recorded in the
+            `snapshot` metadata.
+        gpu_columns: Which system-level GPU stats to report, see
+            [resource_tracker.SystemTracker][]. Defaults to "total". With
+            "per_device", the stats of each GPU are also charted in the report.
+        sampler: How to sample the process-level and system-wide metrics.
+            Defaults to "separate", running a [resource_tracker.ProcessTracker][]
+            and a [resource_tracker.SystemTracker][] in two subprocesses, each
+            with its own clock and output file. "combined" runs a single
+            [resource_tracker.CombinedTracker][] subprocess instead, collecting
+            both in one loop and writing one row with one timestamp per tick,
+            which halves the fork and memory overhead, and keeps the rows
+            aligned. Note that it stops when the tracked process exits. Only
+            applies when tracking both processes and the system.
+        transport: How the collected rows are passed from the trackers to the
+            current process. Defaults to "csv", with the trackers writing
+            temporary CSV files that are parsed on each access of the metrics.
+            "shared_memory" writes the rows as float64 records into a
+            [resource_tracker.ring_buffer.RingBufferReader][] instead, which
+            are read without parsing, and drained regularly in a background
+            thread. Supports max. 256 columns per tracker.
+        csv_sink: Whether to also write the temporary CSV files when using
+            `transport="shared_memory"`, e.g. to keep a persistent copy of the
+            collected data, and fall back to reading it if rows were lost in
+            the ring buffer. Defaults to False.
+        retention: The number of most recent samples to keep as-is in memory.
+            Defaults to None, keeping all samples. If set, the older samples
+            are kept only as the min, mean and max of each column per period
+            of the `rollups`, see [resource_tracker.retention.MetricsRetention][],
+            updated in a background thread. The metric properties then return
+            the recent samples preceded by the means of the older periods, and
+            `stats()` computes the mean, min, max and sum of all samples from
+            running totals, so the memory usage and the cost of accessing the
+            metrics stay bounded for jobs running for days. The CSV files are
+            still written (unless using `transport="shared_memory"`), but only
+            the new rows are parsed.
+        rollups: The length of the rollup periods in seconds when using
+            `retention`, from the finest to the coarsest, each being a
+            multiple of the previous one. Each rollup keeps max. `retention`
+            periods. Defaults to 1 and 15 minutes.
 
     Example:
 
@@ -519,17 +404,72 @@ class ResourceTracker:
         sentinel_token: Optional[str] = None,
         upload_interval: int = 60,
         streaming_metadata: Optional[dict] = None,
+        memory_sampling: Literal["full", "adaptive"] = "full",
+        process_discovery: Literal["children", "table"] = "children",
+        process_accounting: Literal["tree", "cgroup"] = "tree",
+        intervals: Optional[Dict[str, float]] = None,
+        process_counting: Literal["scan", "loadavg"] = "scan",
+        cpu_accounting: Literal["ticks", "schedstat"] = "ticks",
+        implementation: Optional[Literal["psutil", "procfs", "auto"]] = None,
+        gpu_columns: Literal["total", "per_device"] = "total",
+        sampler: Literal["separate", "combined"] = "separate",
+        transport: Literal["csv", "shared_memory"] = "csv",
+        csv_sink: bool = False,
+        retention: Optional[int] = None,
+        rollups: Sequence[float] = (60, 900),
     ):
         self.pid = pid
         self.children = children
         self.interval = interval
         self.method = method
+        self.memory_sampling = memory_sampling
+        self.process_discovery = process_discovery
+        self.process_accounting = process_accounting
+        self.process_counting = process_counting
+        self.cpu_accounting = cpu_accounting
+        if implementation not in (None, *TRACKER_IMPLEMENTATIONS, "auto"):
+            raise ValueError(f"Unsupported tracker implementation: {implementation}")
+        self.implementation = implementation
+        self.implementation_timings = None
+        if gpu_columns not in ("total", "per_device"):
+            raise ValueError(f"Unsupported GPU columns: {gpu_columns}")
+        self.gpu_columns = gpu_columns
+        self.intervals = intervals or {}
+        unknown = set(self.intervals) - set(SYSTEM_METRIC_GROUPS)
+        if unknown:
+            raise ValueError(
+                f"Unsupported metric group(s): {', '.join(sorted(unknown))}."
+            )
+        if sampler not in ("separate", "combined"):
+            raise ValueError(f"Unsupported sampler: {sampler}")
+        self.sampler = sampler
+        if transport not in ("csv", "shared_memory"):
+            raise ValueError(f"Unsupported transport: {transport}")
+        self.transport = transport
+        self.csv_sink = csv_sink
+        if retention is not None and (not isinstance(retention, int) or retention < 1):
+            raise ValueError(f"Unsupported retention: {retention}")
+        self.retention = retention
+        if any(r <= 0 for r in rollups) or any(
+            coarser % finer for finer, coarser in zip(rollups, rollups[1:])
+        ):
+            raise ValueError(f"Unsupported rollups: {rollups}")
+        self.rollups = tuple(rollups)
+        self._retention = None
+        self.ring_buffers = {}
+        self._csv_readers = {}
         self.autostart = autostart
+        self.track_processes = track_processes
+        self.track_system = track_system
         self.trackers = []
-        if track_processes:
-            self.trackers.append("process_tracker")
-        if track_system:
-            self.trackers.append("system_tracker")
+        if sampler == "combined" and track_processes and track_system:
+            self.trackers.append("combined_tracker")
+        else:
+            self.sampler = "separate"
+            if track_processes:
+                self.trackers.append("process_tracker")
+            if track_system:
+                self.trackers.append("system_tracker")
         self.discover_server = discover_server
         self.discover_cloud = discover_cloud
 
@@ -546,7 +486,14 @@ class ResourceTracker:
                 "psutil is required for resource tracking on non-Linux platforms"
             )
 
-        if method is None:
+        if method == "thread":
+            self.mpc = None
+            # stop the tracker threads, as they cannot be terminated
+            self.stop_event = Event()
+        elif method == "agent":
+            # the trackers are started as new Python processes, see _start_worker
+            self.mpc = None
+        elif method is None:
             # try to fork when possible due to leaked semaphores on older Python versions
             # see e.g. https://github.com/python/cpython/issues/90549
             if platform in ["linux", "darwin"]:
@@ -556,8 +503,8 @@ class ResourceTracker:
         else:
             self.mpc = get_context(method)
 
-        # error details from subprocesses
-        self.error_queue = self.mpc.SimpleQueue()
+        # error details from subprocesses (or threads)
+        self.error_queue = SimpleQueue() if self.mpc is None else self.mpc.SimpleQueue()
 
         # create temporary CSV file(s) for the tracker(s), and record only the file path(s)
         # to be passed later to subprocess(es) avoiding pickling the file object(s)
@@ -595,33 +542,133 @@ class ResourceTracker:
         if self.start_time - time() < 0.05:
             self.start_time += self.interval
 
+        # resolve (and calibrate) once, so that both trackers use the same backend
+        self.implementation, timings = resolve_tracker_implementation(
+            self.implementation, self.pid
+        )
+        self.implementation_timings = timings or self.implementation_timings
+        # calibration might have taken a while
+        while self.start_time - time() < 0.05:
+            self.start_time += self.interval
+
+        if self.transport == "shared_memory":
+            from .ring_buffer import (
+                RingBufferReader,
+                close_ring_buffers,
+                drain_ring_buffers,
+            )
+
+            capacity = 1024
+            self.ring_buffers = {
+                tracker_name: RingBufferReader(
+                    capacity=capacity, keep=self.retention is None
+                )
+                for tracker_name in self.trackers
+            }
+            self._drain_stop_event = Event()
+            finalize(
+                self,
+                close_ring_buffers,
+                list(self.ring_buffers.values()),
+                self._drain_stop_event,
+            )
+            # read well before the trackers could fill up the ring buffers
+            Thread(
+                target=drain_ring_buffers,
+                args=(
+                    list(self.ring_buffers.values()),
+                    self.interval * capacity / 4,
+                    self._drain_stop_event,
+                ),
+                daemon=True,
+            ).start()
+
+        if self.retention is not None:
+            from .retention import MetricsRetention, update_retention
+
+            # the system-level timestamp is kept, like in get_combined_metrics
+            prefixes = {
+                "combined_tracker": "",
+                "system_tracker": "system_",
+                "process_tracker": "process_",
+            }
+            self._retention = MetricsRetention(
+                sources={
+                    prefix: self._get_metrics_source(tracker_name)
+                    for tracker_name, prefix in prefixes.items()
+                    if tracker_name in self.trackers
+                },
+                raw_samples=self.retention,
+                resolutions=self.rollups,
+            )
+            self._retention_stop_event = Event()
+            finalize(self, self._retention_stop_event.set)
+            Thread(
+                target=update_retention,
+                args=(self._retention, self.interval * 64, self._retention_stop_event),
+                daemon=True,
+            ).start()
+
+        # started first, so that the process tracker can skip it
+        exclude_pids = []
+        if "system_tracker" in self.trackers:
+            self.system_tracker_process = self._start_worker(
+                "system",
+                {
+                    "start_time": self.start_time,
+                    "interval": self.interval,
+                    **self._get_output_kwargs("system_tracker"),
+                    "intervals": self.intervals,
+                    "process_counting": self.process_counting,
+                    "implementation": self.implementation,
+                    "gpu_columns": self.gpu_columns,
+                },
+            )
+            if self.method != "thread":
+                exclude_pids.append(self.system_tracker_process.pid)
+
         if "process_tracker" in self.trackers:
-            self.process_tracker_process = self.mpc.Process(
-                target=_run_tracker,
-                args=("process", self.error_queue),
-                kwargs={
+            self.process_tracker_process = self._start_worker(
+                "process",
+                {
                     "pid": self.pid,
                     "start_time": self.start_time,
                     "interval": self.interval,
                     "children": self.children,
-                    "output_file": self.process_tracker_filepath,
+                    **self._get_output_kwargs("process_tracker"),
+                    "memory_sampling": self.memory_sampling,
+                    "process_discovery": self.process_discovery,
+                    "process_accounting": self.process_accounting,
+                    "cpu_accounting": self.cpu_accounting,
+                    "exclude_pids": exclude_pids,
+                    "implementation": self.implementation,
+                    "intervals": {
+                        group: interval
+                        for group, interval in self.intervals.items()
+                        if group in PROCESS_METRIC_GROUPS
+                    },
                 },
-                daemon=True,
             )
-            self.process_tracker_process.start()
 
-        if "system_tracker" in self.trackers:
-            self.system_tracker_process = self.mpc.Process(
-                target=_run_tracker,
-                args=("system", self.error_queue),
-                kwargs={
+        if "combined_tracker" in self.trackers:
+            self.combined_tracker_process = self._start_worker(
+                "combined",
+                {
+                    "pid": self.pid,
                     "start_time": self.start_time,
                     "interval": self.interval,
-                    "output_file": self.system_tracker_filepath,
+                    "children": self.children,
+                    **self._get_output_kwargs("combined_tracker"),
+                    "intervals": self.intervals,
+                    "memory_sampling": self.memory_sampling,
+                    "process_discovery": self.process_discovery,
+                    "process_accounting": self.process_accounting,
+                    "cpu_accounting": self.cpu_accounting,
+                    "process_counting": self.process_counting,
+                    "implementation": self.implementation,
+                    "gpu_columns": self.gpu_columns,
                 },
-                daemon=True,
             )
-            self.system_tracker_process.start()
 
         def collect_server_info():
             """Collect server info to be run in a background thread."""
@@ -644,15 +691,16 @@ class ResourceTracker:
             cloud_thread = Thread(target=collect_cloud_info, daemon=True)
             cloud_thread.start()
 
-        # make sure to cleanup the started subprocess(es)
-        finalize(
-            self,
-            cleanup_processes,
-            [
-                getattr(self, f"{tracker_name}_process")
-                for tracker_name in self.trackers
-            ],
-        )
+        # make sure to cleanup the started subprocess(es) or thread(s)
+        workers = [
+            getattr(self, f"{tracker_name}_process") for tracker_name in self.trackers
+        ]
+        if self.method == "thread":
+            finalize(self, cleanup_threads, workers, self.stop_event)
+        elif self.method == "agent":
+            finalize(self, cleanup_subprocesses, workers)
+        else:
+            finalize(self, cleanup_processes, workers)
 
         # --- Start streaming if a Sentinel API token is available ---
         if self._sentinel_token:
@@ -676,6 +724,112 @@ class ResourceTracker:
                 logger.warning("Failed to start streaming: %s", e)
                 self._streaming = None
 
+    def _get_output_kwargs(self, tracker_name: str) -> dict:
+        """Keyword arguments of a tracker defining where to write the collected rows."""
+        kwargs = {}
+        if self.transport == "csv" or self.csv_sink:
+            kwargs["output_file"] = getattr(self, f"{tracker_name}_filepath")
+        if tracker_name in self.ring_buffers:
+            kwargs["ring_buffer"] = self.ring_buffers[tracker_name].name
+        return kwargs
+
+    def _read_metrics(self, tracker_name: str) -> TinyDataFrame:
+        """Read the rows collected by a tracker from its ring buffer or CSV file."""
+        ring_buffer = self.ring_buffers.get(tracker_name)
+        if ring_buffer is not None:
+            data = ring_buffer.read()
+            if not ring_buffer.lost or not self.csv_sink:
+                return TinyDataFrame(data=data)
+        # parse only the rows appended since the last access
+        if tracker_name not in self._csv_readers:
+            self._csv_readers[tracker_name] = IncrementalCsvReader(
+                getattr(self, f"{tracker_name}_filepath")
+            )
+        return self._csv_readers[tracker_name].read(
+            retries=2, retry_delay=min(0.05, self.interval / 10)
+        )
+
+    def _get_metrics_source(self, tracker_name: str) -> Callable[[], object]:
+        """Function returning the new rows of a tracker, see [resource_tracker.retention.MetricsRetention][]."""
+        if tracker_name in self.ring_buffers:
+            return self.ring_buffers[tracker_name].read
+        reader = IncrementalCsvReader(
+            getattr(self, f"{tracker_name}_filepath"), keep=False
+        )
+        self._csv_readers[tracker_name] = reader
+        return partial(
+            reader.read, retries=2, retry_delay=min(0.05, self.interval / 10)
+        )
+
+    def _update_retention(self) -> None:
+        """Read the new rows of the running trackers into the retained metrics."""
+        if self.running:
+            try:
+                self._retention.update()
+            except Exception as e:
+                logger.warning(f"Failed to update the retained metrics: {e}")
+
+    def _get_retained_metrics(self, prefix: str = "") -> TinyDataFrame:
+        """The recent samples preceded by the means of the older periods.
+
+        Args:
+            prefix: The prefix of the columns to select, e.g. "process_".
+                Defaults to all columns.
+        """
+        if (
+            prefix
+            and self.sampler != "combined"
+            and prefix + "tracker" not in self.trackers
+        ):
+            return TinyDataFrame(data=[])
+        self._update_retention()
+        metrics = self._retention.history()
+        return split_combined_metrics(metrics, prefix) if prefix else metrics
+
+    def _start_worker(self, tracker_type: str, kwargs: dict):
+        """Start a subprocess (or a thread/agent depending on `method`) running a tracker.
+
+        Args:
+            tracker_type: The type of the tracker: "process", "system" or "combined".
+            kwargs: The keyword arguments passed to the tracker class.
+
+        Returns:
+            The started `multiprocessing.Process`, `threading.Thread` or
+            `subprocess.Popen` object.
+        """
+        if self.method == "agent":
+            return start_agent(tracker_type, kwargs)
+        if self.method == "thread":
+            worker = Thread(
+                target=_run_tracker,
+                args=(tracker_type, self.error_queue),
+                kwargs={**kwargs, "stop_event": self.stop_event},
+                daemon=True,
+            )
+        else:
+            worker = self.mpc.Process(
+                target=_run_tracker,
+                args=(tracker_type, self.error_queue),
+                kwargs=kwargs,
+                daemon=True,
+            )
+        worker.start()
+        return worker
+
+    def _cleanup_workers(self, workers: list):
+        """Stop the subprocesses, threads or agents of the trackers."""
+        if self.method == "thread":
+            cleanup_threads(workers, self.stop_event)
+        elif self.method == "agent":
+            for worker in workers:
+                if worker.poll() not in (None, 0):
+                    logger.warning(
+                        f"Resource tracker agent exited with code {worker.returncode}"
+                    )
+            cleanup_subprocesses(workers)
+        else:
+            cleanup_processes(workers)
+
     def _update_combined_csv(self) -> None:
         """Append new combined metric rows to the streaming CSV temp file.
 
@@ -683,9 +837,16 @@ class ResourceTracker:
         before each upload cycle to ensure the combined CSV is up-to-date.
         """
         try:
-            combined_new_lines = self.get_combined_metrics(
-                offset=self._combined_csv_rows_written
-            )
+            if self._retention is not None:
+                self._update_retention()
+                combined_new_lines, rows_written = self._retention.since(
+                    self._combined_csv_rows_written
+                )
+            else:
+                combined_new_lines = self.get_combined_metrics(
+                    offset=self._combined_csv_rows_written
+                )
+                rows_written = self._combined_csv_rows_written + len(combined_new_lines)
             if combined_new_lines:
                 buf = StringIO(newline="")
                 writer = csv_writer(buf, quoting=QUOTE_NONNUMERIC)
@@ -700,7 +861,7 @@ class ResourceTracker:
                     )
                 with open(self._combined_csv_filepath, "ab") as f:
                     f.write(buf.getvalue().encode("utf-8"))
-                self._combined_csv_rows_written += len(combined_new_lines)
+                self._combined_csv_rows_written = rows_written
         except Exception as e:
             logger.debug("Combined CSV update: %s", e)
 
@@ -721,11 +882,18 @@ class ResourceTracker:
                     for tracker_name in self.trackers
                 ]
             )
+        with suppress(Exception):
+            if self.ring_buffers:
+                from .ring_buffer import close_ring_buffers
+
+                close_ring_buffers(
+                    list(self.ring_buffers.values()), self._drain_stop_event
+                )
         with suppress(Exception):
             if hasattr(self, "_combined_csv_filepath"):
                 cleanup_files([self._combined_csv_filepath])
         with suppress(Exception):
-            cleanup_processes(
+            self._cleanup_workers(
                 [
                     getattr(self, f"{tracker_name}_process")
                     for tracker_name in self.trackers
@@ -756,8 +924,16 @@ class ResourceTracker:
         for tracker_name in self.trackers:
             process_attr = f"{tracker_name}_process"
             if hasattr(self, process_attr):
-                cleanup_processes([getattr(self, process_attr)])
-        self.error_queue.close()
+                self._cleanup_workers([getattr(self, process_attr)])
+        if self.mpc is not None:
+            self.error_queue.close()
+        # read the last rows before the ring buffers or CSV files are removed
+        if self._retention is not None:
+            self._retention_stop_event.set()
+            try:
+                self._retention.update()
+            except Exception as e:
+                logger.warning(f"Failed to update the retained metrics: {e}")
 
         # Finalize streaming — flush remaining data and call finish_run
         if self._streaming is not None:
@@ -805,6 +981,11 @@ class ResourceTracker:
     @property
     def n_samples(self) -> int:
         """Number of samples collected by the resource tracker."""
+        if self._retention is not None:
+            self._update_retention()
+            return self._retention.samples
+        if self.sampler == "combined":
+            return len(self.combined_tracker_metrics)
         return min(len(self.process_metrics), len(self.system_metrics))
 
     @property
@@ -856,6 +1037,21 @@ class ResourceTracker:
         """
         return self._sentinel_result
 
+    @property
+    def combined_tracker_metrics(self) -> TinyDataFrame:
+        """Collected data from [resource_tracker.CombinedTracker][] when using `sampler="combined"`.
+
+        Returns:
+            A [resource_tracker.tiny_data_frame.TinyDataFrame][] object containing the collected data or an empty list if the [resource_tracker.CombinedTracker][] is not running.
+        """
+        if self._retention is not None:
+            return self._get_retained_metrics()
+        try:
+            return self._read_metrics("combined_tracker")
+        except Exception as e:
+            logger.warning(f"Failed to read combined metrics: {e}")
+            return TinyDataFrame(data=[])
+
     @property
     def process_metrics(self) -> TinyDataFrame:
         """Collected data from [resource_tracker.ProcessTracker][].
@@ -863,12 +1059,12 @@ class ResourceTracker:
         Returns:
             A [resource_tracker.tiny_data_frame.TinyDataFrame][] object containing the collected data or an empty list if the [resource_tracker.ProcessTracker][] is not running.
         """
+        if self._retention is not None:
+            return self._get_retained_metrics("process_")
+        if self.sampler == "combined":
+            return split_combined_metrics(self.combined_tracker_metrics, "process_")
         try:
-            return TinyDataFrame(
-                csv_file_path=self.process_tracker_filepath,
-                retries=2,
-                retry_delay=min(0.05, self.interval / 10),
-            )
+            return self._read_metrics("process_tracker")
         except Exception as e:
             logger.warning(f"Failed to read process metrics: {e}")
             return TinyDataFrame(data=[])
@@ -880,12 +1076,12 @@ class ResourceTracker:
         Returns:
             A [resource_tracker.tiny_data_frame.TinyDataFrame][] object containing the collected data or an empty list if the [resource_tracker.SystemTracker][] is not running.
         """
+        if self._retention is not None:
+            return self._get_retained_metrics("system_")
+        if self.sampler == "combined":
+            return split_combined_metrics(self.combined_tracker_metrics, "system_")
         try:
-            return TinyDataFrame(
-                csv_file_path=self.system_tracker_filepath,
-                retries=2,
-                retry_delay=min(0.05, self.interval / 10),
-            )
+            return self._read_metrics("system_tracker")
         except Exception as e:
             logger.warning(f"Failed to read system metrics: {e}")
             return TinyDataFrame(data=[])
@@ -896,20 +1092,53 @@ class ResourceTracker:
         Returns:
             A dictionary containing the current state of the resource tracker.
         """
+        if self._retention is not None:
+            # split the same rows, as new samples might arrive between reads
+            metrics = self._get_retained_metrics()
+            process_metrics = split_combined_metrics(metrics, "process_")
+            system_metrics = split_combined_metrics(metrics, "system_")
+            # the gaps between the periods are not skipped ticks
+            raw = self._retention.raw
+            sampling = {
+                "process": summarize_sampling(
+                    split_combined_metrics(raw, "process_"), self.interval
+                ),
+                "system": summarize_sampling(
+                    split_combined_metrics(raw, "system_"), self.interval
+                ),
+            }
+        else:
+            process_metrics = self.process_metrics
+            system_metrics = self.system_metrics
+            sampling = {
+                "process": summarize_sampling(process_metrics, self.interval),
+                "system": summarize_sampling(system_metrics, self.interval),
+            }
         return {
             "metadata": {
                 "version": 1,
                 "resource_tracker": {
                     "version": __version__,
-                    "implementation": "psutil" if is_psutil_available() else "procfs",
+                    "implementation": self.implementation,
+                    "implementation_timings": self.implementation_timings,
                 },
                 "pid": self.pid,
                 "children": self.children,
                 "interval": self.interval,
                 "method": self.method,
+                "memory_sampling": self.memory_sampling,
+                "process_discovery": self.process_discovery,
+                "process_accounting": self.process_accounting,
+                "intervals": self.intervals,
+                "process_counting": self.process_counting,
+                "cpu_accounting": self.cpu_accounting,
+                "gpu_columns": self.gpu_columns,
+                "sampler": self.sampler,
+                "transport": self.transport,
+                "csv_sink": self.csv_sink,
                 "autostart": self.autostart,
-                "track_processes": "process_tracker" in self.trackers,
-                "track_system": "system_tracker" in self.trackers,
+                "track_processes": self.track_processes,
+                "track_system": self.track_system,
                 "discover_server": self.discover_server,
                 "discover_cloud": self.discover_cloud,
                 "start_time": self.start_time,
@@ -917,11 +1146,14 @@ class ResourceTracker:
                 "duration": round(
                     (self.stop_time or time()) - self.start_time + self.interval, 2
                 ),
+                "sampling": sampling,
+                "retention": self.retention,
+                "rollups": list(self.rollups),
             },
             "server_info": self.server_info,
             "cloud_info": self.cloud_info,
-            "process_metrics": self.process_metrics.to_dict(),
-            "system_metrics": self.system_metrics.to_dict(),
+            "process_metrics": process_metrics.to_dict(),
+            "system_metrics": system_metrics.to_dict(),
         }
 
     @classmethod
@@ -936,6 +1168,21 @@ class ResourceTracker:
             children=snapshot["metadata"]["children"],
             interval=snapshot["metadata"]["interval"],
             method=snapshot["metadata"]["method"],
+            memory_sampling=snapshot["metadata"].get("memory_sampling", "full"),
+            process_discovery=snapshot["metadata"].get("process_discovery", "children"),
+            process_accounting=snapshot["metadata"].get("process_accounting", "tree"),
+            intervals=snapshot["metadata"].get("intervals"),
+            process_counting=snapshot["metadata"].get("process_counting", "scan"),
+            cpu_accounting=snapshot["metadata"].get("cpu_accounting", "ticks"),
+            implementation=snapshot["metadata"]["resource_tracker"].get(
+                "implementation"
+            ),
+            gpu_columns=snapshot["metadata"].get("gpu_columns", "total"),
+            sampler=snapshot["metadata"].get("sampler", "separate"),
+            transport=snapshot["metadata"].get("transport", "csv"),
+            csv_sink=snapshot["metadata"].get("csv_sink", False),
+            retention=snapshot["metadata"].get("retention"),
+            rollups=snapshot["metadata"].get("rollups", (60, 900)),
             autostart=False,
             track_processes=snapshot["metadata"]["track_processes"],
             track_system=snapshot["metadata"]["track_system"],
@@ -944,8 +1191,28 @@ class ResourceTracker:
         )
         tracker.start_time = snapshot["metadata"]["start_time"]
         tracker.stop_time = snapshot["metadata"]["stop_time"]
+        tracker.implementation_timings = snapshot["metadata"]["resource_tracker"].get(
+            "implementation_timings"
+        )
         tracker._server_info = snapshot["server_info"]
         tracker._cloud_info = snapshot["cloud_info"]
+        if tracker.sampler == "combined":
+            combined = {}
+            for prefix in ("process_", "system_"):
+                for row_index, row in enumerate(snapshot[prefix + "metrics"]):
+                    # the timestamp and sampling diagnostics are shared
+                    shared = ("timestamp", *SAMPLING_COLUMNS)
+                    if row_index == len(combined):
+                        combined[row_index] = {
+                            k: v for k, v in row.items() if k in shared
+                        }
+                    combined[row_index].update(
+                        {prefix + k: v for k, v in row.items() if k not in shared}
+                    )
+            TinyDataFrame(data=list(combined.values())).to_csv(
+                tracker.combined_tracker_filepath
+            )
+            return tracker
         TinyDataFrame(data=snapshot["process_metrics"]).to_csv(
             tracker.process_tracker_filepath
         )
@@ -1016,8 +1283,19 @@ class ResourceTracker:
             A [resource_tracker.tiny_data_frame.TinyDataFrame][] object containing the combined data or an empty list if tracker(s) not running.
         """
         try:
-            process_metrics = self.process_metrics
-            system_metrics = self.system_metrics
+            if self._retention is not None:
+                # read the retained rows only once
+                metrics = self._get_retained_metrics()
+                process_metrics = split_combined_metrics(metrics, "process_")
+                system_metrics = split_combined_metrics(metrics, "system_")
+            elif self.sampler == "combined":
+                # read the shared file only once
+                metrics = self.combined_tracker_metrics
+                process_metrics = split_combined_metrics(metrics, "process_")
+                system_metrics = split_combined_metrics(metrics, "system_")
+            else:
+                process_metrics = self.process_metrics
+                system_metrics = self.system_metrics
 
             # ensure both have the same length
             if len(process_metrics) > len(system_metrics):
@@ -1035,10 +1313,14 @@ class ResourceTracker:
                 return TinyDataFrame(data=[])
 
             if bytes:
-                for col, factor in BYTE_MAPPING.items():
-                    for metrics in (system_metrics, process_metrics):
-                        if col in metrics.columns:
-                            metrics[col] = [v * factor for v in metrics[col]]
+                for metrics in (system_metrics, process_metrics):
+                    for col in metrics.columns:
+                        factor = get_byte_factor(col)
+                        if factor is not None:
+                            metrics[col] = [
+                                v * factor if v is not None else None
+                                for v in metrics[col]
+                            ]
 
             if system_prefix is None:
                 system_prefix = "system_" if not human_names else "System "
@@ -1050,15 +1332,14 @@ class ResourceTracker:
                 columns={
                     n: (
                         (system_prefix if n != "timestamp" else "")
-                        + (n if not human_names else HUMAN_NAMES_MAPPING.get(n, n))
+                        + (n if not human_names else get_human_name(n))
                     )
                     for n in system_metrics.columns
                 }
             )
             for col in process_metrics.columns[1:]:
                 combined[
-                    process_prefix
-                    + (col if not human_names else HUMAN_NAMES_MAPPING.get(col, col))
+                    process_prefix + (col if not human_names else get_human_name(col))
                 ] = process_metrics[col]
 
             return combined
@@ -1089,6 +1370,10 @@ class ResourceTracker:
             StatSpec(column="system_disk_space_used_gb", agg=max, round=2),
             StatSpec(column="system_net_recv_bytes", agg=sum),
             StatSpec(column="system_net_sent_bytes", agg=sum),
+            StatSpec(column="tracker_cpu_usage", agg=mean, round=4),
+            StatSpec(column="tracker_cpu_usage", agg=max, round=4),
+            StatSpec(column="tracker_memory_mib", agg=mean, round=2),
+            StatSpec(column="tracker_memory_mib", agg=max, round=2),
             StatSpec(
                 column="timestamp", agg=lambda x: max(x) - min(x), agg_name="duration"
             ),
@@ -1096,6 +1381,11 @@ class ResourceTracker:
     ) -> dict:
         """Collect statistics from the resource tracker.
 
+        Besides the columns of [resource_tracker.ResourceTracker.get_combined_metrics][],
+        the `tracker_*` columns with the total resource usage of all trackers
+        (see [resource_tracker.ProcessTracker][]) are also available, e.g. to
+        measure the overhead of tracking with different sampling intervals.
+
         Args:
             specs: A list of [resource_tracker.tiny_data_frame.StatSpec][] objects specifying the statistics to collect.
 
@@ -1103,7 +1393,19 @@ class ResourceTracker:
             A dictionary containing the collected statistics.
         """
         if self.n_samples > 0:
-            stats = self.get_combined_metrics().stats(specs)
+            metrics = self.get_combined_metrics()
+            add_tracker_overhead(metrics)
+            # skip the overhead not measured, e.g. memory usage of threads
+            specs = [
+                spec
+                for spec in specs
+                if spec.column in metrics.columns or spec.column not in OVERHEAD_COLUMNS
+            ]
+            stats = metrics.stats(specs)
+            if self._retention is not None:
+                # computed from all samples instead of the means of the periods
+                for column, values in self._retention.stats(specs).items():
+                    stats[column].update(values)
             stats["timestamp"]["duration"] += self.interval
             return stats
         else:
@@ -1231,7 +1533,7 @@ class ResourceTracker:
             ),
             "resource_tracker": {
                 "version": __version__,
-                "implementation": "psutil" if is_psutil_available() else "procfs",
+                "implementation": self.implementation,
                 "integration": integration,
                 "integration_is": {
                     "standalone": integration == "standalone",
@@ -1256,6 +1558,17 @@ class ResourceTracker:
             # convert to JS milliseconds
             csv_data["Timestamp"] = [t * 1000 for t in csv_data["Timestamp"]]
             ctx["csv"][name] = csv_data.to_csv(quote_strings=False)
+        # per-GPU charts with one series per GPU, only with gpu_columns="per_device"
+        for name, metrics in REPORT_GPU_DEVICE_MAPPING.items():
+            columns = []
+            for column in self.system_metrics.columns:
+                device_column = split_gpu_device_column(column)
+                if device_column is not None and device_column[1] in metrics:
+                    columns.append("System " + get_human_name(column))
+            if columns and len(joined) > 0:
+                csv_data = joined[["Timestamp"] + columns]
+                csv_data["Timestamp"] = [t * 1000 for t in csv_data["Timestamp"]]
+                ctx["csv"][name] = csv_data.to_csv(quote_strings=False)
 
         # lookup instance prices
         rec_server_cost = ctx["recommended_server"]["min_price_ondemand"]
@@ -0,0 +1,240 @@
+"""
+Helpers to track resource usage of a process via its cgroup v2 accounting.
+
+Instead of walking the process tree and summing the usage of the live
+processes, the kernel's cgroup v2 accounting (`cpu.stat`, `memory.current`,
+`memory.stat` and `io.stat`) is read for the cgroup of the tracked process.
+This has constant cost no matter how many processes are in the cgroup, and
+also includes the CPU time of short-lived processes that exited between two
+samples.
+
+Note that all processes in the cgroup are accounted for, which might include
+other processes than the descendants of the tracked process (e.g. when
+running in a container or in a systemd service/scope with other processes).
+This is specific to Linux with the unified cgroup v2 hierarchy mounted.
+"""
+
+from contextlib import suppress
+from functools import cache
+from os import path
+from time import time
+from typing import Dict, Optional, Set, Union
+
+from .helpers import is_group_due
+from .nvidia import (
+    ProcessGpuMonitor,
+    process_nvidia_smi_pmon,
+    start_nvidia_smi_pmon,
+)
+
+
+@cache
+def get_cgroup2_mount() -> Optional[str]:
+    """Find the mount point of the unified cgroup v2 hierarchy.
+
+    Returns:
+        The mount point (usually `/sys/fs/cgroup`) or None if not mounted.
+    """
+    with suppress(FileNotFoundError):
+        with open("/proc/self/mounts", "r") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 3 and parts[2] == "cgroup2":
+                    return parts[1]
+    return None
+
+
+def get_process_cgroup(pid: int) -> Optional[str]:
+    """Find the cgroup v2 directory of a process.
+
+    Args:
+        pid: The process ID to find the cgroup for.
+
+    Returns:
+        The path of the cgroup directory, or None if the process is not in a
+        cgroup v2 hierarchy with CPU and memory accounting available.
+    """
+    mount = get_cgroup2_mount()
+    if mount is None:
+        return None
+    with suppress(ProcessLookupError, FileNotFoundError):
+        with open(f"/proc/{pid}/cgroup", "r") as f:
+            for line in f:
+                if line.startswith("0::"):
+                    cgroup = path.join(mount, line[3:].strip().lstrip("/"))
+                    if all(
+                        path.isfile(path.join(cgroup, file))
+                        for file in ("cpu.stat", "memory.current", "cgroup.procs")
+                    ):
+                        return cgroup
+    return None
+
+
+def read_cgroup_file(cgroup: str, file: str) -> str:
+    """Read a file of a cgroup.
+
+    Args:
+        cgroup: The path of the cgroup directory.
+        file: The name of the file in the cgroup directory.
+
+    Returns:
+        The content of the file, or an empty string if not available.
+    """
+    with suppress(FileNotFoundError, PermissionError):
+        with open(path.join(cgroup, file), "r") as f:
+            return f.read()
+    return ""
+
+
+def get_cgroup_pids(cgroup: str) -> Set[int]:
+    """Get the process IDs in a cgroup.
+
+    Args:
+        cgroup: The path of the cgroup directory.
+
+    Returns:
+        The process IDs in the cgroup.
+    """
+    return {int(pid) for pid in read_cgroup_file(cgroup, "cgroup.procs").split()}
+
+
+def is_process_running(pid: int) -> bool:
+    """Check if a process is running, i.e. it exists and is not a zombie.
+
+    Args:
+        pid: The process ID to check.
+
+    Returns:
+        Whether the process is running.
+    """
+    with suppress(ProcessLookupError, FileNotFoundError):
+        with open(f"/proc/{pid}/stat", "r") as f:
+            # the state follows the command name, which might contain spaces
+            return f.read().rpartition(")")[2].split()[0] != "Z"
+    return False
+
+
+def parse_flat_keyed(content: str) -> Dict[str, int]:
+    """Parse a flat keyed cgroup file (e.g. `cpu.stat` or `memory.stat`).
+
+    Args:
+        content: The content of the file with one "key value" pair per line.
+
+    Returns:
+        A dictionary mapping keys to their integer values.
+    """
+    values = {}
+    for line in content.splitlines():
+        parts = line.split()
+        if len(parts) == 2:
+            with suppress(ValueError):
+                values[parts[0]] = int(parts[1])
+    return values
+
+
+def get_cgroup_stats(cgroup: str) -> Dict[str, Union[int, float]]:
+    """Collect current/cumulative stats of a cgroup.
+
+    Args:
+        cgroup: The path of the cgroup directory.
+
+    Returns:
+        A dictionary containing cgroup stats:
+
+            - utime (float): The total user mode CPU time in seconds.
+            - stime (float): The total system mode CPU time in seconds.
+            - memory_mib (float): The current working set in MiB, i.e. the
+              memory charged to the cgroup (`memory.current`) without the
+              inactive file cache that can be reclaimed without swapping.
+            - disk_read_bytes (int): The total number of bytes read.
+            - disk_write_bytes (int): The total number of bytes written.
+    """
+    cpu = parse_flat_keyed(read_cgroup_file(cgroup, "cpu.stat"))
+    memory = int(read_cgroup_file(cgroup, "memory.current").strip() or 0)
+    inactive_file = parse_flat_keyed(read_cgroup_file(cgroup, "memory.stat")).get(
+        "inactive_file", 0
+    )
+    read_bytes = write_bytes = 0
+    # e.g. "259:0 rbytes=1 wbytes=2 rios=3 wios=4 dbytes=0 dios=0"
+    for line in read_cgroup_file(cgroup, "io.stat").splitlines():
+        for field in line.split()[1:]:
+            key, _, value = field.partition("=")
+            if key == "rbytes":
+                read_bytes += int(value)
+            elif key == "wbytes":
+                write_bytes += int(value)
+    return {
+        "utime": cpu.get("user_usec", 0) / 1e6,
+        "stime": cpu.get("system_usec", 0) / 1e6,
+        "memory_mib": max(0, memory - inactive_file) / 1024**2,
+        "disk_read_bytes": read_bytes,
+        "disk_write_bytes": write_bytes,
+    }
+
+
+def get_process_stats(
+    pid: int,
+    children: bool = True,
+    cgroup: Optional[str] = None,
+    groups: Optional[Set[str]] = None,
+    gpu_monitor: Optional[ProcessGpuMonitor] = None,
+) -> Dict[str, Union[int, float, None, Set[int]]]:
+    """Collect current/cumulative stats of a process from its cgroup.
+
+    Args:
+        pid: The process ID to track.
+        children: Ignored, as all processes in the cgroup are tracked.
+        cgroup: The path of the cgroup directory. Defaults to None, looking up
+            the cgroup of the process via
+            [resource_tracker.tracker_cgroup.get_process_cgroup][] on each call.
+        groups: Optional metric groups to collect, see
+            [resource_tracker.column_maps.PROCESS_METRIC_GROUPS][]. The cgroup
+            accounting files are cheap to read, so only the GPU stats are
+            skipped when "gpu" is not listed. Defaults to None, collecting all.
+        gpu_monitor: Optional long-lived GPU monitor to read the GPU stats
+            from instead of running `nvidia-smi pmon` on each call, see
+            [resource_tracker.nvidia.start_gpu_monitor][].
+
+    Returns:
+        A dictionary containing process stats:
+
+            - timestamp (float): The current timestamp.
+            - pid (int): The process ID.
+            - children (int): The current number of other processes in the cgroup.
+            - utime (float): The total user mode CPU time of the cgroup in seconds.
+            - stime (float): The total system mode CPU time of the cgroup in seconds.
+            - memory_mib (float): The current working set of the cgroup in MiB.
+              Reported as 0 when the process is not in the cgroup (anymore).
+            - disk_read_bytes (int): The total number of bytes read.
+            - disk_write_bytes (int): The total number of bytes written.
+            - gpu_usage (float): The current GPU utilization between 0 and GPU count.
+            - gpu_vram_mib (float): The current GPU memory used in MiB.
+            - gpu_utilized (int): The number of GPUs with utilization > 0.
+    """
+    current_time = time()
+    gpu_due = is_group_due(groups, "gpu")
+    nvidia_process = (
+        start_nvidia_smi_pmon() if gpu_due and gpu_monitor is None else None
+    )
+
+    if cgroup is None:
+        cgroup = get_process_cgroup(pid)
+    pids = get_cgroup_pids(cgroup) if cgroup else set()
+    stats = {
+        "timestamp": current_time,
+        "pid": pid,
+        "children": max(0, len(pids) - 1),
+        "utime": 0,
+        "stime": 0,
+        "memory_mib": 0,
+        "disk_read_bytes": 0,
+        "disk_write_bytes": 0,
+    }
+    if pid in pids:
+        stats.update(get_cgroup_stats(cgroup))
+
+    if gpu_due and gpu_monitor is not None:
+        stats.update(gpu_monitor.get_process_gpu_stats(pids))
+    else:
+        stats.update(process_nvidia_smi_pmon(nvidia_process, pids))
+    return stats
@@ -9,21 +9,41 @@ over all `smaps` files.
 from contextlib import suppress
 from functools import cache
 from glob import glob
-from os import listdir
+from os import O_RDONLY, listdir
+from os import close as os_close
+from os import open as os_open
 from time import time
-from typing import Dict, Set, Union
+from typing import Dict, List, Literal, NamedTuple, Optional, Set, Tuple, Union
 
 # not available on Windows
 with suppress(ImportError):
-    from os import statvfs, sysconf
-
-from .helpers import get_zfs_pools_space, is_partition
+    from os import preadv, statvfs, sysconf
+    from select import POLLERR, POLLPRI, poll
+
+from .helpers import (
+    HELPER_PIDS,
+    PssSampler,
+    get_zfs_pools_space,
+    is_group_due,
+    is_partition,
+)
 from .nvidia import (
+    ProcessGpuMonitor,
+    SystemGpuMonitor,
     process_nvidia_smi,
     process_nvidia_smi_pmon,
     start_nvidia_smi,
     start_nvidia_smi_pmon,
 )
+from .process_table import ProcessTable
+from .procfs_parsers import (
+    Buffer,
+    SystemRecord,
+    parse_loadavg,
+    parse_meminfo,
+    parse_net_dev,
+    parse_stat,
+)
 
 
 @cache
@@ -47,11 +67,18 @@ def get_sector_sizes() -> Dict[str, int]:
     return sector_sizes
 
 
-def get_process_children(pid: int) -> Set[int]:
+@cache
+def get_page_size() -> int:
+    """Get the size of a memory page in bytes."""
+    return sysconf("SC_PAGE_SIZE")
+
+
+def get_process_children(pid: int, exclude: Optional[Set[int]] = None) -> Set[int]:
     """Get all descendant processes recursively.
 
     Args:
         pid: The process ID to get descendant processes for.
+        exclude: Optional process IDs to skip along with their descendants.
 
     Returns:
         All descendant process ids.
@@ -59,9 +86,11 @@ def get_process_children(pid: int) -> Set[int]:
     try:
         with open(f"/proc/{pid}/task/{pid}/children", "r") as f:
             children = {int(child) for child in f.read().strip().split()}
+            if exclude:
+                children -= exclude
             descendants = set()
             for child in children:
-                descendants.update(get_process_children(child))
+                descendants.update(get_process_children(child, exclude))
             return children | descendants
     except (ProcessLookupError, FileNotFoundError):
         return set()
@@ -85,6 +114,25 @@ def get_process_rss(pid: int) -> int:
         return 0
 
 
+def get_process_statm_rss(pid: int) -> int:
+    """Get the current resident set size of a process from `/proc/{pid}/statm`.
+
+    This is cheaper than reading `/proc/{pid}/status` as the kernel only
+    formats a few numbers, and much cheaper than reading
+    `/proc/{pid}/smaps_rollup` as it does not walk the page tables.
+
+    Args:
+        pid: The process ID to get the resident set size for.
+
+    Returns:
+        The current resident set size of the process in KiB.
+    """
+    with suppress(ProcessLookupError, FileNotFoundError):
+        with open(f"/proc/{pid}/statm", "r") as f:
+            return int(f.read().split()[1]) * get_page_size() // 1024
+    return 0
+
+
 def get_process_pss_rollup(pid: int) -> int:
     """Reads the total PSS from `/proc/{pid}/smaps_rollup`.
 
@@ -94,7 +142,7 @@ def get_process_pss_rollup(pid: int) -> int:
     Returns:
         The total PSS in KiB.
     """
-    with suppress(ProcessLookupError, FileNotFoundError):
+    with suppress(ProcessLookupError, FileNotFoundError, PermissionError):
         with open(f"/proc/{pid}/smaps_rollup", "r") as f:
             for line in f:
                 if line.startswith("Pss:"):
@@ -129,6 +177,43 @@ def get_process_proc_times(pid: int, children: bool = True) -> Dict[str, int]:
         return {"utime": 0, "stime": 0}
 
 
+def get_process_schedstat(pid: int, threads: int = 0) -> Tuple[int, int]:
+    """Get the run time and run queue wait time of a process from `schedstat`.
+
+    The scheduler accounts these in nanoseconds, unlike the `utime`/`stime`
+    clock ticks (usually 10 ms) in `/proc/{pid}/stat`. As
+    `/proc/{pid}/schedstat` only covers the main thread, the `schedstat` file
+    of all threads is read for multi-threaded processes. Note that threads
+    that exited since the last sample are not included.
+
+    Args:
+        pid: The process ID to get the scheduler stats for.
+        threads: The number of threads of the process, if known. With a single
+            thread, only `/proc/{pid}/schedstat` is read.
+
+    Returns:
+        A tuple of the time spent on the CPU and waiting on a run queue in nanoseconds.
+    """
+    if threads == 1:
+        paths = [f"/proc/{pid}/schedstat"]
+    else:
+        try:
+            paths = [
+                f"/proc/{pid}/task/{tid}/schedstat"
+                for tid in listdir(f"/proc/{pid}/task")
+            ]
+        except (ProcessLookupError, FileNotFoundError):
+            return 0, 0
+    run_time = wait_time = 0
+    for path in paths:
+        with suppress(ProcessLookupError, FileNotFoundError):
+            with open(path, "r") as f:
+                values = f.read().split()
+            run_time += int(values[0])
+            wait_time += int(values[1])
+    return run_time, wait_time
+
+
 def get_process_proc_io(pid: int) -> Dict[str, int]:
     """Get the total bytes read and written by a process from `/proc/{pid}/io`.
 
@@ -151,14 +236,140 @@ def get_process_proc_io(pid: int) -> Dict[str, int]:
         return {"read_bytes": 0, "write_bytes": 0}
 
 
+class ProcessRecord(NamedTuple):
+    """Resource usage of a single process read from procfs in a single pass.
+
+    CPU times are in clock ticks (scheduler run and wait times in
+    nanoseconds), memory in KiB, and I/O in bytes as reported by the kernel.
+    """
+
+    pid: int
+    utime: int
+    stime: int
+    cutime: int
+    cstime: int
+    pss: int
+    read_bytes: int
+    write_bytes: int
+    pss_fresh: bool = True
+    run_time: int = 0
+    wait_time: int = 0
+
+
+def get_process_record(
+    pid: int,
+    pss_sampler: Optional[PssSampler] = None,
+    groups: Optional[Set[str]] = None,
+    schedstat: bool = False,
+) -> Optional[ProcessRecord]:
+    """Read `stat`, `io` and `smaps_rollup` of a process exactly once.
+
+    Args:
+        pid: The process ID to read the stats for.
+        pss_sampler: Optional [resource_tracker.helpers.PssSampler][] to read
+            the cheap RSS from `statm` instead, and only read `smaps_rollup`
+            when the sampler decides to refresh the PSS.
+        groups: Optional metric groups to collect, see
+            [resource_tracker.column_maps.PROCESS_METRIC_GROUPS][]. The `io`
+            file is only read for "disk_io", and the memory usage only for
+            "memory". Defaults to None, collecting all.
+        schedstat: Whether to also read the nanosecond run and run queue wait
+            times via [resource_tracker.tracker_procfs.get_process_schedstat][].
+
+    Returns:
+        A [resource_tracker.tracker_procfs.ProcessRecord][] or None if the
+        process does not exist (anymore).
+    """
+    try:
+        with open(f"/proc/{pid}/stat", "r") as f:
+            # process name might include spaces or parentheses
+            values = f.read().rpartition(")")[2].split()
+    except (ProcessLookupError, FileNotFoundError):
+        return None
+
+    read_bytes = write_bytes = 0
+    if is_group_due(groups, "disk_io"):
+        with suppress(ProcessLookupError, FileNotFoundError, PermissionError):
+            with open(f"/proc/{pid}/io", "r") as f:
+                for line in f:
+                    if line.startswith("read_bytes:"):
+                        read_bytes = int(line.split()[1])
+                    elif line.startswith("write_bytes:"):
+                        write_bytes = int(line.split()[1])
+                        break
+
+    pss_fresh = True
+    if not is_group_due(groups, "memory"):
+        pss = 0
+    elif pss_sampler is None:
+        pss = get_process_pss_rollup(pid)
+    else:
+        pss, pss_fresh = pss_sampler.get(
+            pid, get_process_statm_rss(pid), lambda: get_process_pss_rollup(pid)
+        )
+
+    run_time = wait_time = 0
+    if schedstat and is_group_due(groups, "cpu"):
+        run_time, wait_time = get_process_schedstat(pid, threads=int(values[17]))
+
+    # https://docs.kernel.org/filesystems/proc.html (fields 14-17 and 20,
+    # counting from the state field as index 0 after the process name)
+    return ProcessRecord(
+        pid=pid,
+        utime=int(values[11]),
+        stime=int(values[12]),
+        cutime=int(values[13]),
+        cstime=int(values[14]),
+        pss=pss,
+        read_bytes=read_bytes,
+        write_bytes=write_bytes,
+        pss_fresh=pss_fresh,
+        run_time=run_time,
+        wait_time=wait_time,
+    )
+
+
 def get_process_stats(
-    pid: int, children: bool = True
+    pid: int,
+    children: bool = True,
+    pss_sampler: Optional[PssSampler] = None,
+    process_table: Optional[ProcessTable] = None,
+    groups: Optional[Set[str]] = None,
+    schedstat: bool = False,
+    gpu_monitor: Optional[ProcessGpuMonitor] = None,
+    exclude_pids: Optional[Set[int]] = None,
+    exclude_helpers: bool = True,
 ) -> Dict[str, Union[int, float, None, Set[int]]]:
     """Collect current/cumulative stats of a process from procfs.
 
+    The process tree is walked once, and each process's `stat`, `io` and
+    `smaps_rollup` files are read exactly once per call via
+    [resource_tracker.tracker_procfs.get_process_record][].
+
     Args:
         pid: The process ID to track.
         children: Whether to include child processes.
+        pss_sampler: Optional [resource_tracker.helpers.PssSampler][] to only
+            refresh the PSS of the processes from time to time, and estimate
+            it from the RSS in between.
+        process_table: Optional [resource_tracker.process_table.ProcessTable][]
+            to discover the descendant processes instead of recursively reading
+            the `children` files of the process tree. It is refreshed on each call.
+        groups: Optional metric groups to collect, see
+            [resource_tracker.column_maps.PROCESS_METRIC_GROUPS][]. The stats
+            of the other groups are reported as 0. Defaults to None, collecting all.
+        schedstat: Whether to also report the nanosecond resolution run and
+            run queue wait times of the live processes and their threads, see
+            [resource_tracker.tracker_procfs.get_process_schedstat][].
+        gpu_monitor: Optional long-lived GPU monitor to read the GPU stats
+            from instead of running `nvidia-smi pmon` on each call, see
+            [resource_tracker.nvidia.start_gpu_monitor][].
+        exclude_pids: Optional process IDs to exclude from the descendants
+            along with their own descendants, e.g. the tracker's own
+            processes.
+        exclude_helpers: Whether to exclude the helper subprocesses of the
+            trackers (see [resource_tracker.helpers.HELPER_PIDS][]). Defaults
+            to True, set to False when measuring the tracker's own usage.
 
     Returns:
         A dictionary containing process stats:
@@ -174,51 +385,410 @@ def get_process_stats(
             - gpu_usage (float): The current GPU utilization between 0 and GPU count.
             - gpu_vram_mib (float): The current GPU memory used in MiB.
             - gpu_utilized (int): The number of GPUs with utilization > 0.
+            - memory_pss_share (float): Only when `pss_sampler` is provided, the
+              share of `memory_mib` that was freshly read as PSS in this call,
+              the rest being estimated from the RSS.
+            - run_time (float): Only when `schedstat` is enabled, the total
+              time spent on the CPU by the live processes in seconds.
+            - run_queue_wait (float): Only when `schedstat` is enabled, the
+              total time spent waiting on a run queue in seconds.
     """
     current_time = time()
 
-    nvidia_process = start_nvidia_smi_pmon()
-
-    current_children = get_process_children(pid)
-    current_pss = get_process_pss_rollup(pid)
-    if children:
-        for child in current_children:
-            current_pss += get_process_pss_rollup(child)
-    current_proc_times = get_process_proc_times(pid, children)
-    if children:
-        for child in current_children:
-            current_proc_times["utime"] += get_process_proc_times(child, True)["utime"]
-            current_proc_times["stime"] += get_process_proc_times(child, True)["stime"]
-    current_io = get_process_proc_io(pid)
-    if children:
-        for child in current_children:
-            child_io = get_process_proc_io(child)
-            for key in set(current_io) & set(child_io):
-                current_io[key] += child_io[key]
-
-    gpu_stats = process_nvidia_smi_pmon(nvidia_process, {pid} | current_children)
-
-    return {
+    gpu_due = is_group_due(groups, "gpu")
+    nvidia_process = (
+        start_nvidia_smi_pmon() if gpu_due and gpu_monitor is None else None
+    )
+
+    # skip the tracker's own processes and helper subprocesses
+    exclude = set(exclude_pids or ())
+    if exclude_helpers:
+        exclude |= HELPER_PIDS
+    if nvidia_process is not None:
+        exclude.add(nvidia_process.pid)
+    if process_table is not None:
+        process_table.refresh()
+        current_children = process_table.descendants(pid, exclude)
+    else:
+        current_children = get_process_children(pid, exclude)
+    processes = ({pid} | current_children) if children else {pid}
+    utime = stime = pss = fresh_pss = read_bytes = write_bytes = 0
+    run_time = wait_time = 0
+    for process in processes:
+        record = get_process_record(process, pss_sampler, groups, schedstat)
+        if record is None:
+            continue
+        if record.pss_fresh:
+            fresh_pss += record.pss
+        # exited children's CPU time is only included when tracking children
+        utime += record.utime + (record.cutime if children else 0)
+        stime += record.stime + (record.cstime if children else 0)
+        pss += record.pss
+        read_bytes += record.read_bytes
+        write_bytes += record.write_bytes
+        run_time += record.run_time
+        wait_time += record.wait_time
+
+    if gpu_due and gpu_monitor is not None:
+        gpu_stats = gpu_monitor.get_process_gpu_stats({pid} | current_children)
+    else:
+        gpu_stats = process_nvidia_smi_pmon(nvidia_process, {pid} | current_children)
+
+    stats = {
         "timestamp": current_time,
         "pid": pid,
         "children": len(current_children) if children else None,
-        "utime": current_proc_times["utime"] / sysconf("SC_CLK_TCK"),
-        "stime": current_proc_times["stime"] / sysconf("SC_CLK_TCK"),
-        "memory_mib": current_pss / 1024,
-        "disk_read_bytes": current_io["read_bytes"],
-        "disk_write_bytes": current_io["write_bytes"],
+        "utime": utime / sysconf("SC_CLK_TCK"),
+        "stime": stime / sysconf("SC_CLK_TCK"),
+        "memory_mib": pss / 1024,
+        "disk_read_bytes": read_bytes,
+        "disk_write_bytes": write_bytes,
         **gpu_stats,
     }
+    if pss_sampler is not None:
+        pss_sampler.forget_others(processes)
+        stats["memory_pss_share"] = fresh_pss / pss if pss else 1
+    if schedstat:
+        stats["run_time"] = run_time / 1e9
+        stats["run_queue_wait"] = wait_time / 1e9
+    return stats
 
 
-def get_system_stats() -> Dict[str, Union[int, float, Dict]]:
+def parse_mounts(content: str) -> Tuple[List[str], bool]:
+    """Parse the mount points to check for disk space from the mount table.
+
+    Args:
+        content: The content of `/proc/mounts`.
+
+    Returns:
+        A tuple of the list of mount points (excluding virtual and ZFS
+        filesystems) and whether any ZFS filesystem is mounted.
+    """
+    mount_points = []
+    check_zfs = False
+    for line in content.splitlines():
+        parts = line.split()
+        if len(parts) >= 3:
+            mount_point = parts[1]
+            filesystem = parts[2]
+            # skip known virtual filesystems
+            if mount_point.startswith(("/proc", "/sys", "/dev", "/run")):
+                continue
+            # skip zfs, will count later due to overlapping partitions
+            if filesystem == "zfs":
+                check_zfs = True
+                continue
+            mount_points.append(mount_point)
+    return mount_points, check_zfs
+
+
+def get_disk_spaces(
+    mount_points: List[str], check_zfs: bool = False
+) -> Dict[str, Dict[str, int]]:
+    """Collect the disk space stats of mount points.
+
+    Args:
+        mount_points: The mount points to check.
+        check_zfs: Whether to also check the space of ZFS pools.
+
+    Returns:
+        A dictionary mapping mount points to their total, used and free space in bytes.
+    """
+    disk_spaces = {}
+    for mount_point in mount_points:
+        try:
+            fs_stats = statvfs(mount_point)
+            # skip pseudo filesystems
+            if fs_stats.f_blocks == 0:
+                continue
+            block_size = fs_stats.f_frsize
+            total_space = fs_stats.f_blocks * block_size
+            free_space = fs_stats.f_bavail * block_size
+            used_space = total_space - free_space
+            disk_spaces[mount_point] = {
+                "total": total_space,
+                "used": used_space,
+                "free": free_space,
+            }
+        except (OSError, PermissionError):
+            pass
+    if check_zfs:
+        disk_spaces.update(get_zfs_pools_space())
+    return disk_spaces
+
+
+class ProcFile:
+    """A procfs file kept open to be reread from the beginning on each sample.
+
+    Rereading an already open file with `preadv` into a reused buffer avoids
+    the `open`/`close` syscalls and the Python file object overhead of
+    opening the file again on every sample.
+
+    Args:
+        path: Path to the procfs file.
+        buffer_size: Initial size of the read buffer in bytes, which is
+            doubled whenever the file content does not fit.
+    """
+
+    def __init__(self, path: str, buffer_size: int = 4096):
+        self.path = path
+        self.fd = os_open(path, O_RDONLY)
+        self.buffer = bytearray(buffer_size)
+
+    def readinto(self) -> int:
+        """Read the full content of the file into the reused buffer.
+
+        Returns:
+            The number of bytes read, i.e. the content of the file is in the
+            first this many bytes of `buffer`.
+        """
+        size = 0
+        while True:
+            if size == len(self.buffer):
+                self.buffer.extend(bytes(len(self.buffer)))
+            view = memoryview(self.buffer)[size:]
+            n = preadv(self.fd, [view], size)
+            view.release()
+            if n == 0:
+                return size
+            size += n
+
+    def read(self) -> str:
+        """Read the full content of the file.
+
+        Returns:
+            The current content of the file.
+        """
+        size = self.readinto()
+        return str(memoryview(self.buffer)[:size], "utf-8")
+
+    def close(self):
+        """Close the file descriptor."""
+        if self.fd is not None:
+            os_close(self.fd)
+            self.fd = None
+
+
+class MountTable:
+    """Cache of the mount points to check for disk space.
+
+    The mount table is only parsed again when it changed, which is signaled
+    by the kernel via `POLLPRI` on the open `/proc/self/mounts` file, so
+    hosts with hundreds of container overlay and bind mounts do not need to
+    parse the full mount table on every sample.
+
+    Attributes:
+        mount_points: The mount points to check for disk space, see
+            [resource_tracker.tracker_procfs.parse_mounts][].
+        check_zfs: Whether any ZFS filesystem is mounted.
+    """
+
+    path = "/proc/self/mounts"
+
+    def __init__(self):
+        self.file = ProcFile(self.path)
+        self.poller = poll()
+        self.poller.register(self.file.fd, POLLPRI | POLLERR)
+        self.mount_points: List[str] = []
+        self.check_zfs = False
+        self.refresh()
+
+    def refresh(self):
+        """Parse the current mount table."""
+        self.mount_points, self.check_zfs = parse_mounts(self.file.read())
+
+    def update(self) -> bool:
+        """Parse the mount table again if it changed since the last call.
+
+        Returns:
+            Whether the mount table changed.
+        """
+        if not self.poller.poll(0):
+            return False
+        self.refresh()
+        return True
+
+    def close(self):
+        """Close the file descriptor."""
+        if self.file.fd is not None:
+            self.poller.unregister(self.file.fd)
+        self.file.close()
+
+
+class SystemStatsReader:
+    """Keep the procfs files used for system-wide stats open between samples.
+
+    Files that cannot be opened (e.g. not available on the system) are read
+    via a regular `open` call instead, so missing files are still reported as
+    `FileNotFoundError` to the caller.
+
+    The mount points to check for disk space are cached in a
+    [resource_tracker.tracker_procfs.MountTable][], and the disk space stats
+    are only collected again after `disk_space_interval` seconds or when the
+    mount table changed.
+
+    Args:
+        disk_space_interval: Minimum number of seconds between collecting disk
+            space stats. Defaults to 60.
+    """
+
+    paths = (
+        "/proc/stat",
+        "/proc/loadavg",
+        "/proc/meminfo",
+        "/proc/diskstats",
+        "/proc/net/dev",
+    )
+
+    def __init__(self, disk_space_interval: float = 60):
+        self.files: Dict[str, ProcFile] = {}
+        for path in self.paths:
+            with suppress(OSError):
+                self.files[path] = ProcFile(path)
+        self.record = SystemRecord()
+        self.mounts: Optional[MountTable] = None
+        with suppress(OSError, NameError):
+            self.mounts = MountTable()
+        self.disk_space_interval = disk_space_interval
+        self.disk_spaces: Optional[Dict[str, Dict[str, int]]] = None
+        self.disk_spaces_time = 0.0
+
+    def readinto(self, path: str) -> Tuple[Buffer, int]:
+        """Read the full content of a procfs file without decoding it.
+
+        Args:
+            path: Path to the procfs file.
+
+        Returns:
+            A tuple of the buffer holding the content of the file and the
+            number of valid bytes in it. The buffer is reused by later reads.
+        """
+        if path in self.files:
+            file = self.files[path]
+            return file.buffer, file.readinto()
+        with open(path, "rb") as f:
+            content = f.read()
+        return content, len(content)
+
+    def read(self, path: str) -> str:
+        """Read the full content of a procfs file.
+
+        Args:
+            path: Path to the procfs file.
+
+        Returns:
+            The current content of the file.
+        """
+        if path in self.files:
+            return self.files[path].read()
+        with open(path, "r") as f:
+            return f.read()
+
+    def get_disk_spaces(self) -> Dict[str, Dict[str, int]]:
+        """Get the disk space stats, collected again only when outdated.
+
+        Returns:
+            A dictionary mapping mount points to their total, used and free space in bytes.
+        """
+        changed = self.mounts is not None and self.mounts.update()
+        if (
+            changed
+            or self.disk_spaces is None
+            or time() - self.disk_spaces_time >= self.disk_space_interval
+        ):
+            if self.mounts is not None:
+                mounts = (self.mounts.mount_points, self.mounts.check_zfs)
+            else:
+                mounts = ([], False)
+                with suppress(FileNotFoundError):
+                    mounts = parse_mounts(read_proc_file("/proc/mounts"))
+            self.disk_spaces = get_disk_spaces(*mounts)
+            self.disk_spaces_time = time()
+        return self.disk_spaces
+
+    def close(self):
+        """Close all open file descriptors."""
+        for file in self.files.values():
+            file.close()
+        self.files = {}
+        if self.mounts is not None:
+            self.mounts.close()
+            self.mounts = None
+
+
+def read_proc_file(path: str, reader: Optional[SystemStatsReader] = None) -> str:
+    """Read a procfs file either via an open reader or by opening the file.
+
+    Args:
+        path: Path to the procfs file.
+        reader: Optional [resource_tracker.tracker_procfs.SystemStatsReader][]
+            keeping the file open between calls.
+
+    Returns:
+        The current content of the file.
+    """
+    if reader is not None:
+        return reader.read(path)
+    with open(path, "r") as f:
+        return f.read()
+
+
+def read_proc_bytes(
+    path: str, reader: Optional[SystemStatsReader] = None
+) -> Tuple[Buffer, int]:
+    """Read a procfs file without decoding, either via an open reader or by opening the file.
+
+    Args:
+        path: Path to the procfs file.
+        reader: Optional [resource_tracker.tracker_procfs.SystemStatsReader][]
+            keeping the file open between calls.
+
+    Returns:
+        A tuple of the buffer holding the content of the file and the number
+        of valid bytes in it.
+    """
+    if reader is not None:
+        return reader.readinto(path)
+    with open(path, "rb") as f:
+        content = f.read()
+    return content, len(content)
+
+
+def get_system_stats(
+    reader: Optional[SystemStatsReader] = None,
+    groups: Optional[Set[str]] = None,
+    process_counting: Literal["scan", "loadavg"] = "scan",
+    gpu_monitor: Optional[SystemGpuMonitor] = None,
+    gpu_devices: bool = False,
+) -> Dict[str, Union[int, float, Dict]]:
     """Collect current system-wide stats from procfs.
 
+    Args:
+        reader: Optional [resource_tracker.tracker_procfs.SystemStatsReader][]
+            to reuse open file descriptors between calls, and to cache the
+            mount table and disk space stats. If not provided, the files are
+            opened and closed on each call.
+        groups: Optional metric groups to collect, see
+            [resource_tracker.column_maps.SYSTEM_METRIC_GROUPS][]. The stats
+            of the other groups are reported as 0 (or empty). Defaults to None,
+            collecting all.
+        process_counting: How to count the processes. Defaults to "scan",
+            listing all process directories in `/proc`. "loadavg" reads the
+            total number of tasks from `/proc/loadavg` instead, which is
+            constant cost, but also counts threads.
+        gpu_monitor: Optional long-lived GPU monitor to read the GPU stats
+            from instead of running `nvidia-smi` on each call, see
+            [resource_tracker.nvidia.start_gpu_monitor][].
+        gpu_devices: Whether to also report the stats of each GPU via the
+            `gpu_monitor` in `gpu_devices`. Defaults to False.
+
     Returns:
         A dictionary containing system stats:
 
             - timestamp (float): The current timestamp.
             - processes (int): Number of running processes.
+            - procs_running (int): Number of runnable tasks.
+            - procs_blocked (int): Number of tasks blocked waiting for I/O.
             - utime (int): Total user mode CPU time in seconds.
             - stime (int): Total system mode CPU time in seconds.
             - memory_free_mib (float): Free physical memory in MiB.
@@ -240,10 +810,14 @@ def get_system_stats() -> Dict[str, Union[int, float, Dict]]:
 
             - net_recv_bytes (int): Total bytes received over network.
             - net_sent_bytes (int): Total bytes sent over network.
+            - gpu_devices (list): Only with `gpu_devices`, the stats of each
+              GPU, see [resource_tracker.column_maps.GPU_DEVICE_COLUMNS][].
     """
     stats = {
         "timestamp": time(),
         "processes": 0,
+        "procs_running": 0,
+        "procs_blocked": 0,
         "utime": 0,
         "stime": 0,
         "memory_free_mib": 0,
@@ -258,52 +832,51 @@ def get_system_stats() -> Dict[str, Union[int, float, Dict]]:
         "net_sent_bytes": 0,
     }
 
-    nvidia_process = start_nvidia_smi()
-
-    with suppress(FileNotFoundError):
-        with open("/proc/stat", "r") as f:
-            for line in f:
-                if line.startswith("cpu "):
-                    cpu_stats = line.split()
-                    tps = sysconf("SC_CLK_TCK")
-                    # user + nice
-                    stats["utime"] = (int(cpu_stats[1]) + int(cpu_stats[2])) / tps
-                    stats["stime"] = int(cpu_stats[3]) / tps
-        stats["processes"] = len([x for x in listdir("/proc") if x.isdigit()])
-
-    # memory stats reported in KiB
-    with suppress(FileNotFoundError):
-        with open("/proc/meminfo", "r") as f:
-            mem_info = {}
-            for line in f:
-                parts = line.split(":")
-                if len(parts) == 2:
-                    key = parts[0].strip()
-                    value_parts = parts[1].strip().split()
-                    if len(value_parts) > 0:
-                        try:
-                            mem_info[key] = int(value_parts[0])
-                        except ValueError:
-                            pass
-
-            total = mem_info.get("MemTotal", 0)
-            free = mem_info.get("MemFree", 0)
-            buffers = mem_info.get("Buffers", 0)
-            cached = mem_info.get("Cached", 0) + mem_info.get("SReclaimable", 0)
+    gpu_due = is_group_due(groups, "gpu")
+    nvidia_process = start_nvidia_smi() if gpu_due and gpu_monitor is None else None
+
+    # parsed into a fixed-slot record reused between calls
+    record = reader.record if reader is not None else SystemRecord()
+
+    if is_group_due(groups, "cpu"):
+        with suppress(FileNotFoundError):
+            parse_stat(*read_proc_bytes("/proc/stat", reader), record)
+            tps = sysconf("SC_CLK_TCK")
+            stats["utime"] = (record.cpu_user + record.cpu_nice) / tps
+            stats["stime"] = record.cpu_system / tps
+            stats["procs_running"] = record.procs_running
+            stats["procs_blocked"] = record.procs_blocked
+        with suppress(FileNotFoundError):
+            if process_counting == "loadavg":
+                parse_loadavg(*read_proc_bytes("/proc/loadavg", reader), record)
+                stats["processes"] = record.tasks_total
+            else:
+                stats["processes"] = len([x for x in listdir("/proc") if x.isdigit()])
+
+    if is_group_due(groups, "memory"):
+        # memory stats reported in KiB
+        with suppress(FileNotFoundError):
+            parse_meminfo(*read_proc_bytes("/proc/meminfo", reader), record)
+            total = record.mem_total or 0
+            free = record.mem_free or 0
+            buffers = record.buffers or 0
+            cached = (record.cached or 0) + (record.sreclaimable or 0)
             stats["memory_free_mib"] = free / 1024
             stats["memory_buffers_mib"] = buffers / 1024
             stats["memory_cached_mib"] = cached / 1024
             # Use MemAvailable to match psutil's calculation: used = total - MemAvailable.
             # MemAvailable (Linux 3.14+) is more accurate than MemFree+Buffers+Cached
             # because it also accounts for kernel low-watermark reservations.
-            available = mem_info.get("MemAvailable", free + buffers + cached)
+            available = record.mem_available
+            if available is None:
+                available = free + buffers + cached
             stats["memory_used_mib"] = (total - available) / 1024
-            stats["memory_active_mib"] = mem_info.get("Active", 0) / 1024
-            stats["memory_inactive_mib"] = mem_info.get("Inactive", 0) / 1024
+            stats["memory_active_mib"] = (record.active or 0) / 1024
+            stats["memory_inactive_mib"] = (record.inactive or 0) / 1024
 
-    with suppress(FileNotFoundError):
-        with open("/proc/diskstats", "r") as f:
-            for line in f:
+    if is_group_due(groups, "disk_io"):
+        with suppress(FileNotFoundError):
+            for line in read_proc_file("/proc/diskstats", reader).splitlines():
                 parts = line.split()
                 if len(parts) >= 14:
                     disk_name = parts[2]
@@ -314,54 +887,28 @@ def get_system_stats() -> Dict[str, Union[int, float, Dict]]:
                             "write_bytes": int(parts[9]) * sector_size,
                         }
 
-    with suppress(FileNotFoundError):
-        with open("/proc/net/dev", "r") as f:
-            # skip header lines
-            next(f)
-            next(f)
-            for line in f:
-                parts = line.split(":")
-                if len(parts) == 2:
-                    interface = parts[0].strip()
-                    if interface != "lo":
-                        values = parts[1].strip().split()
-                        stats["net_recv_bytes"] += int(values[0])
-                        stats["net_sent_bytes"] += int(values[8])
-
-    check_zfs = False
-    with suppress(FileNotFoundError):
-        with open("/proc/mounts", "r") as f:
-            for line in f:
-                parts = line.split()
-                if len(parts) >= 2:
-                    mount_point = parts[1]
-                    filesystem = parts[2]
-                    # skip known virtual filesystems
-                    if mount_point.startswith(("/proc", "/sys", "/dev", "/run")):
-                        continue
-                    # skip zfs, will count later due to overlapping partitions
-                    if filesystem == "zfs":
-                        check_zfs = True
-                        continue
-                    try:
-                        fs_stats = statvfs(mount_point)
-                        # skip pseudo filesystems
-                        if fs_stats.f_blocks == 0:
-                            continue
-                        block_size = fs_stats.f_frsize
-                        total_space = fs_stats.f_blocks * block_size
-                        free_space = fs_stats.f_bavail * block_size
-                        used_space = total_space - free_space
-                        stats["disk_spaces"][mount_point] = {
-                            "total": total_space,
-                            "used": used_space,
-                            "free": free_space,
-                        }
-                    except (OSError, PermissionError):
-                        pass
-    if check_zfs:
-        stats["disk_spaces"].update(get_zfs_pools_space())
-
-    stats.update(process_nvidia_smi(nvidia_process))
+    if is_group_due(groups, "network"):
+        with suppress(FileNotFoundError):
+            parse_net_dev(*read_proc_bytes("/proc/net/dev", reader), record)
+            stats["net_recv_bytes"] = record.net_recv_bytes
+            stats["net_sent_bytes"] = record.net_sent_bytes
+
+    if is_group_due(groups, "disk_space"):
+        if reader is not None:
+            stats["disk_spaces"] = reader.get_disk_spaces()
+        else:
+            with suppress(FileNotFoundError):
+                stats["disk_spaces"] = get_disk_spaces(
+                    *parse_mounts(read_proc_file("/proc/mounts"))
+                )
+
+    if gpu_devices:
+        stats["gpu_devices"] = []
+    if gpu_due and gpu_monitor is not None:
+        stats.update(gpu_monitor.get_gpu_stats())
+        if gpu_devices:
+            stats["gpu_devices"] = gpu_monitor.get_device_stats()
+    else:
+        stats.update(process_nvidia_smi(nvidia_process))
 
     return stats
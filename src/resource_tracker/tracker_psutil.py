@@ -4,8 +4,10 @@ Helpers to track resource usage via `psutil`.
 
 import re
 from contextlib import suppress
+from functools import cache
+from os import listdir, path
 from time import time
-from typing import Dict, Set, Union
+from typing import Dict, Literal, Optional, Set, Tuple, Union
 
 from psutil import (
     Process,
@@ -18,26 +20,199 @@ from psutil import (
     virtual_memory,
 )
 
-from .helpers import get_zfs_pools_space, is_partition
+from .helpers import (
+    HELPER_PIDS,
+    PssSampler,
+    exclude_subtrees,
+    get_zfs_pools_space,
+    is_group_due,
+    is_partition,
+)
 from .nvidia import (
+    ProcessGpuMonitor,
+    SystemGpuMonitor,
     process_nvidia_smi,
     process_nvidia_smi_pmon,
     start_nvidia_smi,
     start_nvidia_smi_pmon,
 )
+from .process_table import ProcessTable, get_process_ppid
+from .procfs_parsers import SystemRecord, parse_loadavg, parse_stat
+from .tracker_procfs import get_process_schedstat
 
 # Known APFS data-volume mountpoints in priority order
 _APFS_DATA_MOUNTPOINTS: tuple = ("/System/Volumes/Data",)
 
 
+@cache
+def get_memory_attributes(fields: Tuple[str, ...]) -> Tuple[str, ...]:
+    """Resolve the preferred memory usage metrics available on the platform.
+
+    Args:
+        fields: The fields of the named tuple returned by `memory_full_info`.
+
+    Returns:
+        The available attributes out of PSS, USS and RSS in order of preference.
+    """
+    return tuple(attr for attr in ("pss", "uss", "rss") if attr in fields)
+
+
+def get_process_memory(process: Process) -> int:
+    """Get the preferred memory usage metric of a process.
+
+    Args:
+        process: The `psutil.Process` object.
+
+    Returns:
+        The PSS on Linux, USS on macOS and Windows, or RSS on other OSs
+        where neither PSS nor USS are available, in bytes.
+    """
+    memory_info = process.memory_full_info()
+    for attr in get_memory_attributes(memory_info._fields):
+        value = getattr(memory_info, attr)
+        if value:
+            return value
+    return 0
+
+
+class ProcessCache:
+    """Keep `psutil.Process` objects of the tracked processes between samples.
+
+    Creating a `psutil.Process` involves more than reading the creation time
+    of the process, so reusing the objects avoids that for every process on
+    every sample. The objects are keyed by process ID and creation time, so
+    that a reused process ID is not matched to a stale object. The creation
+    time is read from procfs (as the start time in clock ticks) when not
+    provided by the caller (e.g. from a
+    [resource_tracker.process_table.ProcessTable][]).
+    """
+
+    def __init__(self):
+        self.processes: Dict[int, Process] = {}
+        self.create_times: Dict[int, float] = {}
+
+    def get(self, pid: int, create_time: Optional[float] = None) -> Process:
+        """Get the cached `psutil.Process` object of a process, or create a new one.
+
+        Args:
+            pid: The process ID.
+            create_time: The creation time of the process (in any unit used
+                consistently for the process ID), if known, to detect a reused
+                process ID. Defaults to None, reading the start time from
+                procfs if available.
+
+        Returns:
+            The `psutil.Process` object.
+
+        Raises:
+            psutil.NoSuchProcess: If the process does not exist (anymore).
+        """
+        process = self.processes.get(pid)
+        known = self.create_times.get(pid)
+        if create_time is None:
+            record = get_process_ppid(pid)
+            if record is not None:
+                create_time = record[1]
+        if process is None or (
+            create_time is not None and known is not None and known != create_time
+        ):
+            process = self.processes[pid] = Process(pid)
+            self.create_times.pop(pid, None)
+        if create_time is not None:
+            self.create_times[pid] = create_time
+        return process
+
+    def forget_others(self, pids: Set[int]):
+        """Drop the processes not in `pids`, e.g. after they exited.
+
+        Args:
+            pids: The process IDs currently tracked.
+        """
+        if len(self.processes) > len(pids):
+            self.processes = {
+                pid: process for pid, process in self.processes.items() if pid in pids
+            }
+            self.create_times = {
+                pid: create_time
+                for pid, create_time in self.create_times.items()
+                if pid in pids
+            }
+
+
+def get_child_pids(pid: int, exclude: Optional[Set[int]] = None) -> Set[int]:
+    """Get all descendant process IDs from the `children` files of all threads in procfs.
+
+    Unlike `psutil.Process.children`, this neither reads the parent of all
+    processes of the system, nor creates `psutil.Process` objects. Requires a
+    kernel built with `CONFIG_PROC_CHILDREN` (Linux only).
+
+    Args:
+        pid: The process ID to get descendant processes for.
+        exclude: Optional process IDs to skip along with their descendants.
+
+    Returns:
+        All descendant process IDs.
+    """
+    exclude = exclude or set()
+    descendants = set()
+    queue = [pid]
+    while queue:
+        parent = queue.pop()
+        # process might have been terminated meanwhile
+        with suppress(OSError):
+            for task in listdir(f"/proc/{parent}/task"):
+                with suppress(OSError):
+                    with open(f"/proc/{parent}/task/{task}/children", "r") as f:
+                        for child in map(int, f.read().split()):
+                            if child not in descendants and child not in exclude:
+                                descendants.add(child)
+                                queue.append(child)
+    return descendants
+
+
 def get_process_stats(
-    pid: int, children: bool = True
+    pid: int,
+    children: bool = True,
+    pss_sampler: Optional[PssSampler] = None,
+    process_table: Optional[ProcessTable] = None,
+    groups: Optional[Set[str]] = None,
+    schedstat: bool = False,
+    process_cache: Optional[ProcessCache] = None,
+    gpu_monitor: Optional[ProcessGpuMonitor] = None,
+    exclude_pids: Optional[Set[int]] = None,
+    exclude_helpers: bool = True,
 ) -> Dict[str, Union[int, float, None, Set[int]]]:
     """Collect current/cumulative stats of a process via psutil.
 
+    The stats of each process are read within `psutil.Process.oneshot` to
+    share the underlying system calls and file reads.
+
     Args:
         pid: The process ID to track.
         children: Whether to include child processes.
+        pss_sampler: Optional [resource_tracker.helpers.PssSampler][] to only
+            refresh the memory usage via `memory_full_info` from time to time,
+            and estimate it from the cheap RSS in between.
+        process_table: Optional [resource_tracker.process_table.ProcessTable][]
+            to discover the descendant processes instead of relying on
+            `psutil.Process.children`. It is refreshed on each call.
+        groups: Optional metric groups to collect, see
+            [resource_tracker.column_maps.PROCESS_METRIC_GROUPS][]. The stats
+            of the other groups are reported as 0. Defaults to None, collecting all.
+        schedstat: Whether to also report the nanosecond resolution run and
+            run queue wait times from procfs (Linux only), see
+            [resource_tracker.tracker_procfs.get_process_schedstat][].
+        process_cache: Optional [resource_tracker.tracker_psutil.ProcessCache][]
+            to reuse the `psutil.Process` objects between calls.
+        gpu_monitor: Optional long-lived GPU monitor to read the GPU stats
+            from instead of running `nvidia-smi pmon` on each call, see
+            [resource_tracker.nvidia.start_gpu_monitor][].
+        exclude_pids: Optional process IDs to exclude from the descendants
+            along with their own descendants, e.g. the tracker's own
+            processes.
+        exclude_helpers: Whether to exclude the helper subprocesses of the
+            trackers (see [resource_tracker.helpers.HELPER_PIDS][]). Defaults
+            to True, set to False when measuring the tracker's own usage.
 
     Returns:
         A dictionary containing process stats:
@@ -56,13 +231,71 @@ def get_process_stats(
             - gpu_usage (float): The current GPU utilization between 0 and GPU count.
             - gpu_vram_mib (float): The current GPU memory used in MiB.
             - gpu_utilized (int): The number of GPUs with utilization > 0.
+            - memory_pss_share (float): Only when `pss_sampler` is provided, the
+              share of `memory_mib` that was freshly read in this call, the
+              rest being estimated from the RSS.
+            - run_time (float): Only when `schedstat` is enabled, the total
+              time spent on the CPU by the live processes in seconds.
+            - run_queue_wait (float): Only when `schedstat` is enabled, the
+              total time spent waiting on a run queue in seconds.
     """
     current_time = time()
-    nvidia_process = start_nvidia_smi_pmon()
-
-    processes = [Process(pid)]
+    gpu_due = is_group_due(groups, "gpu")
+    nvidia_process = (
+        start_nvidia_smi_pmon() if gpu_due and gpu_monitor is None else None
+    )
+
+    # skip the tracker's own processes and helper subprocesses
+    exclude = set(exclude_pids or ())
+    if exclude_helpers:
+        exclude |= HELPER_PIDS
+    if nvidia_process is not None:
+        exclude.add(nvidia_process.pid)
+    get_process = process_cache.get if process_cache is not None else Process
+    processes = [get_process(pid)]
     if children:
-        current_children = processes[0].children(recursive=True)
+        if process_table is not None:
+            process_table.refresh()
+            current_children = []
+            for child in process_table.descendants(pid, exclude):
+                # process might have been terminated since the refresh
+                with suppress(Exception):
+                    if process_cache is not None:
+                        # the start time detects reused process IDs
+                        current_children.append(
+                            process_cache.get(
+                                child, process_table.start_times.get(child)
+                            )
+                        )
+                    else:
+                        current_children.append(Process(child))
+        elif process_cache is not None and path.exists(
+            f"/proc/{pid}/task/{pid}/children"
+        ):
+            # only create psutil.Process objects for the new processes
+            current_children = []
+            for child in get_child_pids(pid, exclude):
+                with suppress(Exception):
+                    current_children.append(process_cache.get(child))
+        else:
+            current_children = processes[0].children(recursive=True)
+            if exclude:
+                parents = {}
+                for child in current_children:
+                    with suppress(Exception):
+                        parents[child.pid] = child.ppid()
+                excluded = exclude_subtrees(parents, exclude)
+                current_children = [
+                    child for child in current_children if child.pid not in excluded
+                ]
+            if process_cache is not None:
+                cached_children = []
+                for child in current_children:
+                    with suppress(Exception):
+                        cached_children.append(
+                            process_cache.get(child.pid, child.create_time())
+                        )
+                current_children = cached_children
         processes = processes + list(current_children)
 
     stats = {
@@ -75,44 +308,145 @@ def get_process_stats(
         "disk_read_bytes": 0,
         "disk_write_bytes": 0,
     }
+    fresh_memory = 0
+    run_time = wait_time = 0
 
     for process in processes:
         # process might have been terminated, so silently skip if not found
-        with suppress(Exception):
-            cpu_times = process.cpu_times()
-            stats["utime"] += cpu_times.user + cpu_times.children_user
-            stats["stime"] += cpu_times.system + cpu_times.children_system
-            memory_info = process.memory_full_info()
-            for attr in ("pss", "uss", "rss"):
-                if (
-                    hasattr(memory_info, attr)
-                    and getattr(memory_info, attr) is not None
-                    and getattr(memory_info, attr) != 0
-                ):
-                    stats["memory_mib"] += getattr(memory_info, attr) / 1024**2  # Mib
-                    break
-            io_counters = process.io_counters()
-            stats["disk_read_bytes"] += io_counters.read_bytes
-            stats["disk_write_bytes"] += io_counters.write_bytes
-
-    stats.update(process_nvidia_smi_pmon(nvidia_process, [p.pid for p in processes]))
+        with suppress(Exception), process.oneshot():
+            if is_group_due(groups, "cpu"):
+                cpu_times = process.cpu_times()
+                stats["utime"] += cpu_times.user + cpu_times.children_user
+                stats["stime"] += cpu_times.system + cpu_times.children_system
+                if schedstat:
+                    process_run_time, process_wait_time = get_process_schedstat(
+                        process.pid
+                    )
+                    run_time += process_run_time
+                    wait_time += process_wait_time
+            if is_group_due(groups, "memory"):
+                if pss_sampler is None:
+                    memory = get_process_memory(process)
+                else:
+                    memory, fresh = pss_sampler.get(
+                        process.pid,
+                        process.memory_info().rss,
+                        lambda: get_process_memory(process),
+                    )
+                    if fresh:
+                        fresh_memory += memory / 1024**2  # MiB
+                stats["memory_mib"] += memory / 1024**2  # MiB
+            if is_group_due(groups, "disk_io"):
+                io_counters = process.io_counters()
+                stats["disk_read_bytes"] += io_counters.read_bytes
+                stats["disk_write_bytes"] += io_counters.write_bytes
+
+    if gpu_due and gpu_monitor is not None:
+        stats.update(gpu_monitor.get_process_gpu_stats(p.pid for p in processes))
+    else:
+        stats.update(
+            process_nvidia_smi_pmon(nvidia_process, [p.pid for p in processes])
+        )
+    if process_cache is not None:
+        process_cache.forget_others({p.pid for p in processes})
+    if pss_sampler is not None:
+        pss_sampler.forget_others({p.pid for p in processes})
+        stats["memory_pss_share"] = (
+            fresh_memory / stats["memory_mib"] if stats["memory_mib"] else 1
+        )
+    if schedstat:
+        stats["run_time"] = run_time / 1e9
+        stats["run_queue_wait"] = wait_time / 1e9
 
     return stats
 
 
-def get_system_stats() -> Dict[str, Union[int, float, Dict]]:
+def get_disk_spaces() -> Dict[str, Dict[str, int]]:
+    """Collect the disk space stats of the mounted partitions via psutil.
+
+    Returns:
+        A dictionary mapping mount points to their total, used and free space in bytes.
+    """
+    disk_spaces = {}
+    disks = disk_partitions()
+    check_zfs = False
+    apfs_candidates: Dict[str, list] = {}  # container → [(priority, mountpoint)]
+
+    for disk in disks:
+        if disk.fstype == "zfs":
+            check_zfs = True
+            continue
+        if disk.fstype == "apfs":
+            if "ro" in disk.opts.split(","):
+                continue
+            m = re.match(r"(/dev/disk\d+)", disk.device)
+            container = m.group(1) if m else disk.device
+            prio = (
+                _APFS_DATA_MOUNTPOINTS.index(disk.mountpoint)
+                if disk.mountpoint in _APFS_DATA_MOUNTPOINTS
+                else len(_APFS_DATA_MOUNTPOINTS)  # fallback: first rw volume
+            )
+            apfs_candidates.setdefault(container, []).append((prio, disk.mountpoint))
+            continue
+        with suppress(Exception):
+            usage = disk_usage(disk.mountpoint)
+            disk_spaces[disk.mountpoint] = {
+                "total": usage.total,
+                "used": usage.used,
+                "free": usage.free,
+            }
+
+    for candidates in apfs_candidates.values():
+        _, mountpoint = min(candidates)
+        with suppress(Exception):
+            usage = disk_usage(mountpoint)
+            disk_spaces[mountpoint] = {
+                "total": usage.total,
+                "used": usage.used,
+                "free": usage.free,
+            }
+
+    if check_zfs:
+        disk_spaces.update(get_zfs_pools_space())
+    return disk_spaces
+
+
+def get_system_stats(
+    groups: Optional[Set[str]] = None,
+    process_counting: Literal["scan", "loadavg"] = "scan",
+    gpu_monitor: Optional[SystemGpuMonitor] = None,
+    gpu_devices: bool = False,
+) -> Dict[str, Union[int, float, Dict]]:
     """Collect current system-wide stats via psutil.
 
     Note that some fields are not available on all platforms,
     e.g. memory buffers/cache are specific to Linux and BSD,
     and active/inactive anonymous pages are specific to Linux,
-    so `0` is returned for these fields on other platforms.
+    so `0` is returned for these fields on other platforms. The same applies
+    to the number of runnable and blocked tasks read from `/proc/stat`.
+
+    Args:
+        groups: Optional metric groups to collect, see
+            [resource_tracker.column_maps.SYSTEM_METRIC_GROUPS][]. The stats
+            of the other groups are reported as 0 (or empty). Defaults to None,
+            collecting all.
+        process_counting: How to count the processes. Defaults to "scan",
+            listing all processes via `psutil.pids`. "loadavg" reads the total
+            number of tasks (including threads) from `/proc/loadavg` instead
+            when available (Linux).
+        gpu_monitor: Optional long-lived GPU monitor to read the GPU stats
+            from instead of running `nvidia-smi` on each call, see
+            [resource_tracker.nvidia.start_gpu_monitor][].
+        gpu_devices: Whether to also report the stats of each GPU via the
+            `gpu_monitor` in `gpu_devices`. Defaults to False.
 
     Returns:
         A dictionary containing system stats:
 
             - timestamp (float): The current timestamp.
             - processes (int): Number of running processes.
+            - procs_running (int): Number of runnable tasks.
+            - procs_blocked (int): Number of tasks blocked waiting for I/O.
             - utime (int): Total user mode CPU time in seconds.
             - stime (int): Total system mode CPU time in seconds.
             - memory_free_mib (float): Free physical memory in MiB.
@@ -134,10 +468,14 @@ def get_system_stats() -> Dict[str, Union[int, float, Dict]]:
 
             - net_recv_bytes (int): Total bytes received over network.
             - net_sent_bytes (int): Total bytes sent over network.
+            - gpu_devices (list): Only with `gpu_devices`, the stats of each
+              GPU, see [resource_tracker.column_maps.GPU_DEVICE_COLUMNS][].
     """
     stats = {
         "timestamp": time(),
         "processes": 0,
+        "procs_running": 0,
+        "procs_blocked": 0,
         "utime": 0,
         "stime": 0,
         "memory_free_mib": 0,
@@ -152,83 +490,69 @@ def get_system_stats() -> Dict[str, Union[int, float, Dict]]:
         "net_sent_bytes": 0,
     }
 
-    nvidia_process = start_nvidia_smi()
-
-    cpu = cpu_times()
-    stats["utime"] = cpu.user
-    if hasattr(cpu, "nice"):
-        stats["utime"] += cpu.nice
-    stats["stime"] = cpu.system
-    stats["processes"] = len(pids())
-
-    # store memory stats in KiB
-    memory = virtual_memory()
-    stats["memory_free_mib"] = memory.free / 1024**2  # MiB
-    if hasattr(memory, "buffers"):
-        stats["memory_buffers_mib"] = memory.buffers / 1024**2  # MiB
-    if hasattr(memory, "cached"):
-        stats["memory_cached_mib"] = memory.cached / 1024**2  # MiB
-    if hasattr(memory, "active"):
-        stats["memory_active_mib"] = memory.active / 1024**2  # MiB
-    if hasattr(memory, "inactive"):
-        stats["memory_inactive_mib"] = memory.inactive / 1024**2  # MiB
-    stats["memory_used_mib"] = memory.used / 1024**2  # MiB
-
-    disk_io = disk_io_counters(perdisk=True)
-    stats["disk_stats"] = {
-        disk_name: {
-            "read_bytes": disk_io[disk_name].read_bytes,
-            "write_bytes": disk_io[disk_name].write_bytes,
-        }
-        for disk_name in disk_io
-        if not is_partition(disk_name)
-    }
-
-    net_io = net_io_counters()
-    stats["net_recv_bytes"] = net_io.bytes_recv
-    stats["net_sent_bytes"] = net_io.bytes_sent
-
-    disks = disk_partitions()
-    check_zfs = False
-    apfs_candidates: Dict[str, list] = {}  # container → [(priority, mountpoint)]
-
-    for disk in disks:
-        if disk.fstype == "zfs":
-            check_zfs = True
-            continue
-        if disk.fstype == "apfs":
-            if "ro" in disk.opts.split(","):
-                continue
-            m = re.match(r"(/dev/disk\d+)", disk.device)
-            container = m.group(1) if m else disk.device
-            prio = (
-                _APFS_DATA_MOUNTPOINTS.index(disk.mountpoint)
-                if disk.mountpoint in _APFS_DATA_MOUNTPOINTS
-                else len(_APFS_DATA_MOUNTPOINTS)  # fallback: first rw volume
-            )
-            apfs_candidates.setdefault(container, []).append((prio, disk.mountpoint))
-            continue
-        with suppress(Exception):
-            usage = disk_usage(disk.mountpoint)
-            stats["disk_spaces"][disk.mountpoint] = {
-                "total": usage.total,
-                "used": usage.used,
-                "free": usage.free,
-            }
-
-    for candidates in apfs_candidates.values():
-        _, mountpoint = min(candidates)
-        with suppress(Exception):
-            usage = disk_usage(mountpoint)
-            stats["disk_spaces"][mountpoint] = {
-                "total": usage.total,
-                "used": usage.used,
-                "free": usage.free,
+    gpu_due = is_group_due(groups, "gpu")
+    nvidia_process = start_nvidia_smi() if gpu_due and gpu_monitor is None else None
+
+    if is_group_due(groups, "cpu"):
+        cpu = cpu_times()
+        stats["utime"] = cpu.user
+        if hasattr(cpu, "nice"):
+            stats["utime"] += cpu.nice
+        stats["stime"] = cpu.system
+        record = SystemRecord()
+        with suppress(FileNotFoundError):
+            with open("/proc/stat", "rb") as f:
+                content = f.read()
+            parse_stat(content, len(content), record)
+            stats["procs_running"] = record.procs_running
+            stats["procs_blocked"] = record.procs_blocked
+        if process_counting == "loadavg":
+            with suppress(FileNotFoundError):
+                with open("/proc/loadavg", "rb") as f:
+                    content = f.read()
+                parse_loadavg(content, len(content), record)
+        stats["processes"] = record.tasks_total or len(pids())
+
+    if is_group_due(groups, "memory"):
+        # store memory stats in KiB
+        memory = virtual_memory()
+        stats["memory_free_mib"] = memory.free / 1024**2  # MiB
+        if hasattr(memory, "buffers"):
+            stats["memory_buffers_mib"] = memory.buffers / 1024**2  # MiB
+        if hasattr(memory, "cached"):
+            stats["memory_cached_mib"] = memory.cached / 1024**2  # MiB
+        if hasattr(memory, "active"):
+            stats["memory_active_mib"] = memory.active / 1024**2  # MiB
+        if hasattr(memory, "inactive"):
+            stats["memory_inactive_mib"] = memory.inactive / 1024**2  # MiB
+        stats["memory_used_mib"] = memory.used / 1024**2  # MiB
+
+    if is_group_due(groups, "disk_io"):
+        disk_io = disk_io_counters(perdisk=True)
+        stats["disk_stats"] = {
+            disk_name: {
+                "read_bytes": disk_io[disk_name].read_bytes,
+                "write_bytes": disk_io[disk_name].write_bytes,
             }
+            for disk_name in disk_io
+            if not is_partition(disk_name)
+        }
 
-    if check_zfs:
-        stats["disk_spaces"].update(get_zfs_pools_space())
-
-    stats.update(process_nvidia_smi(nvidia_process))
+    if is_group_due(groups, "network"):
+        net_io = net_io_counters()
+        stats["net_recv_bytes"] = net_io.bytes_recv
+        stats["net_sent_bytes"] = net_io.bytes_sent
+
+    if is_group_due(groups, "disk_space"):
+        stats["disk_spaces"] = get_disk_spaces()
+
+    if gpu_devices:
+        stats["gpu_devices"] = []
+    if gpu_due and gpu_monitor is not None:
+        stats.update(gpu_monitor.get_gpu_stats())
+        if gpu_devices:
+            stats["gpu_devices"] = gpu_monitor.get_device_stats()
+    else:
+        stats.update(process_nvidia_smi(nvidia_process))
 
     return stats
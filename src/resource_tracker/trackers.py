@@ -0,0 +1,957 @@
+"""
+Process-level and system-wide trackers collecting resource usage in a loop.
+
+These classes only depend on the collector backends (see
+[resource_tracker.tracker_procfs][], [resource_tracker.tracker_psutil][] and
+[resource_tracker.tracker_cgroup][]), and not on the reporting, cloud discovery
+or streaming features of [resource_tracker.ResourceTracker][], so they can be
+imported quickly, e.g. by the lean [resource_tracker.agent][] entry point.
+"""
+
+from csv import QUOTE_NONNUMERIC
+from functools import partial
+from logging import getLogger
+from os import getpid, path
+from sys import stdout
+from threading import Event
+from time import sleep, time
+from typing import Any, Dict, Iterable, List, Literal, Optional
+from warnings import warn
+
+from .column_maps import (
+    GPU_DEVICE_COLUMNS,
+    PROCESS_METRIC_GROUPS,
+    SYSTEM_METRIC_GROUPS,
+)
+from .helpers import (
+    MultiRateScheduler,
+    OverheadMeter,
+    PssSampler,
+    SamplingClock,
+    get_tracker_implementation,
+    render_csv_row,
+    resolve_tracker_implementation,
+)
+from .nvidia import start_gpu_monitor
+
+logger = getLogger(__name__)
+
+
+class MetricsSink:
+    """Write the rows collected by a tracker as CSV and/or into a shared-memory ring buffer.
+
+    Args:
+        output_file: File to write the CSV to. Defaults to None, printing to
+            stdout, unless `ring_buffer` is set.
+        ring_buffer: Name of the shared memory block of a
+            [resource_tracker.ring_buffer.RingBufferReader][] to write the rows
+            to. Defaults to None.
+    """
+
+    def __init__(
+        self, output_file: Optional[str] = None, ring_buffer: Optional[str] = None
+    ):
+        self.output_file = output_file
+        self.file_handle = None
+        if output_file:
+            self.file_handle = open(output_file, "wb")
+        elif ring_buffer is None:
+            self.file_handle = stdout.buffer
+        self.ring_buffer = None
+        if ring_buffer is not None:
+            from .ring_buffer import RingBufferWriter
+
+            self.ring_buffer = RingBufferWriter(ring_buffer)
+
+    def write_header(self, columns: Iterable[str]):
+        """Write the header of the CSV."""
+        if self.file_handle is not None:
+            self.file_handle.write(render_csv_row(columns, quoting=QUOTE_NONNUMERIC))
+            if self.output_file:
+                self.file_handle.flush()
+
+    def write(self, row: Dict[str, Any]):
+        """Write a row of collected stats."""
+        if self.file_handle is not None:
+            self.file_handle.write(
+                render_csv_row(row.values(), quoting=QUOTE_NONNUMERIC)
+            )
+            if self.output_file:
+                self.file_handle.flush()
+        if self.ring_buffer is not None:
+            self.ring_buffer.write(row)
+
+    def close(self):
+        """Close the output file and detach from the ring buffer."""
+        if self.output_file and not self.file_handle.closed:
+            self.file_handle.close()
+        if self.ring_buffer is not None:
+            self.ring_buffer.close()
+
+
+class ProcessTracker:
+    """Track resource usage of a process and optionally its children.
+
+    This class monitors system resources like CPU times and usage, memory usage,
+    GPU and VRAM utilization, I/O operations for a given process ID and
+    optionally its child processes.
+
+    Data is collected every `interval` seconds and written to the stdout or
+    `output_file` (if provided) as CSV. Currently, the following columns are
+    tracked:
+
+    - timestamp (float): The current timestamp.
+    - pid (int): The monitored process ID.
+    - children (int | None): The current number of child processes.
+    - utime (int): The total user+nice mode CPU time in seconds.
+    - stime (int): The total system mode CPU time in seconds.
+    - cpu_usage (float): The current CPU usage between 0 and number of CPUs.
+    - memory_mib (float): The current memory usage in MiB. Implementation depends on the
+      operating system, and it is preferably PSS (Proportional Set Size) on Linux,
+      USS (Unique Set Size) on macOS and Windows, and RSS (Resident Set Size) on
+      Windows.
+    - disk_read_bytes (int): The total number of bytes read from disk.
+    - disk_write_bytes (int): The total number of bytes written to disk.
+    - gpu_usage (float): The current GPU utilization between 0 and GPU count.
+    - gpu_vram_mib (float): The current GPU memory used in MiB.
+    - gpu_utilized (int): The number of GPUs with utilization > 0.
+    - memory_pss_share (float): Only tracked with `memory_sampling="adaptive"`,
+      the share of `memory_mib` freshly read as PSS in the sample (between 0 and
+      1), the rest being estimated from the RSS.
+    - run_queue_wait (float): Only tracked with `cpu_accounting="schedstat"`,
+      the time the processes spent waiting on a run queue in seconds.
+    - sample_latency_ms (float): The time spent on collecting the sample in ms.
+    - schedule_lag_ms (float): How late the collection of the sample started
+      compared to its scheduled tick in ms. When falling behind, the missed
+      ticks are skipped, see [resource_tracker.helpers.SamplingClock][].
+    - tracker_cpu_usage (float): The CPU usage of the tracker itself (including
+      its helper subprocesses) between 0 and number of CPUs.
+    - tracker_memory_mib (float | None): The memory usage of the tracker itself
+      (including its helper subprocesses) in MiB, or None when running in a
+      thread of the tracked process.
+    - tracker_disk_read_bytes and tracker_disk_write_bytes (int | None): The
+      number of bytes read from and written to disk by the tracker, or None
+      when running in a thread. See [resource_tracker.helpers.OverheadMeter][].
+
+    The GPU stats are queried in-process via NVML when the NVIDIA driver's
+    library can be loaded, otherwise read from a long-lived `nvidia-smi pmon`
+    subprocess, see [resource_tracker.nvidia.start_gpu_monitor][]. The GPU
+    monitor is started with the tracking and closed when tracking stops.
+
+    Args:
+        pid (int, optional): Process ID to track. Defaults to current process ID.
+        start_time: Time when to start tracking. Defaults to current time.
+        interval (float, optional): Sampling interval in seconds. Defaults to 1.
+        children (bool, optional): Whether to track child processes. Defaults to True.
+        autostart (bool, optional): Whether to start tracking immediately. Defaults to True.
+        output_file (str, optional): File to write the output to. Defaults to None, print to stdout.
+        memory_sampling (str, optional): How to measure memory usage. Defaults to
+            "full", reading the PSS (or USS/RSS) of all processes on every
+            sample. "adaptive" reads the cheap RSS on every sample, and only
+            refreshes the expensive PSS every 10th sample or when the RSS
+            changed by more than 10%, see [resource_tracker.helpers.PssSampler][].
+        process_discovery (str, optional): How to discover the descendant processes.
+            Defaults to "children", relying on the `children` files in procfs or
+            `psutil.Process.children`. "table" (Linux only) scans all processes
+            via a [resource_tracker.process_table.ProcessTable][] instead, which
+            also keeps track of descendants re-parented after their parent exited.
+        process_accounting (str, optional): How to account for the resource usage.
+            Defaults to "tree", summing the usage of the process and its live
+            descendants. "cgroup" (Linux only) reads the cgroup v2 accounting of
+            the cgroup of the process instead, see
+            [resource_tracker.tracker_cgroup][], which has constant cost and
+            includes short-lived children exited between samples, but also
+            accounts for all other processes in the same cgroup. Falls back to
+            "tree" with a warning if cgroup v2 accounting is not available.
+            `memory_sampling` and `process_discovery` are ignored with "cgroup".
+        intervals (dict, optional): Mapping of metric groups ("cpu", "memory",
+            "disk_io" and "gpu", see
+            [resource_tracker.column_maps.PROCESS_METRIC_GROUPS][]) to their own
+            sampling interval in seconds, rounded to a multiple of `interval`.
+            Groups not listed are collected every `interval` seconds, and the
+            values of slower groups are carried forward into every row, see
+            [resource_tracker.helpers.MultiRateScheduler][]. Note that exited
+            processes are only detected when the memory usage is collected.
+            Defaults to None, collecting all groups every `interval` seconds.
+        cpu_accounting (str, optional): How to measure CPU usage. Defaults to
+            "ticks", using the `utime`/`stime` clock ticks (usually 10 ms),
+            which quantizes `cpu_usage` at sub-second intervals. "schedstat"
+            (Linux only) computes `cpu_usage` from the nanosecond run times of
+            the scheduler, and also reports `run_queue_wait`, see
+            [resource_tracker.tracker_procfs.get_process_schedstat][]. Note that
+            the CPU time of children exited between samples is not included in
+            `cpu_usage` in this mode. Falls back to "ticks" with a warning if
+            not available, and ignored with `process_accounting="cgroup"`.
+        implementation (str, optional): Which collector backend to use: "psutil",
+            "procfs" (Linux only), or "auto" to calibrate both against the
+            tracked process and pick the faster one. Defaults to None, reading
+            the `RESOURCE_TRACKER_IMPLEMENTATION` environment variable, and
+            falling back to psutil if installed, otherwise procfs, see
+            [resource_tracker.helpers.resolve_tracker_implementation][].
+            Ignored with `process_accounting="cgroup"`.
+        stop_event (Event, optional): Event to stop tracking when set, e.g. when
+            running in a thread. Defaults to None, tracking until the process
+            exits.
+        ring_buffer (str, optional): Name of the shared memory block of a
+            [resource_tracker.ring_buffer.RingBufferReader][] to also write the
+            rows to. Defaults to None.
+        exclude_pids (list, optional): Process IDs to exclude from the tracked
+            descendants along with their own descendants, e.g. other trackers
+            started by the tracked process. The current process (when not the
+            tracked one) and the helper subprocesses of the trackers (e.g.
+            `nvidia-smi`) are always excluded. Ignored with
+            `process_accounting="cgroup"`. Defaults to None.
+    """
+
+    def __init__(
+        self,
+        pid: int = getpid(),
+        start_time: float = time(),
+        interval: float = 1,
+        children: bool = True,
+        autostart: bool = True,
+        output_file: str = None,
+        memory_sampling: Literal["full", "adaptive"] = "full",
+        process_discovery: Literal["children", "table"] = "children",
+        process_accounting: Literal["tree", "cgroup"] = "tree",
+        intervals: Optional[Dict[str, float]] = None,
+        cpu_accounting: Literal["ticks", "schedstat"] = "ticks",
+        implementation: Optional[Literal["psutil", "procfs", "auto"]] = None,
+        stop_event: Optional[Event] = None,
+        ring_buffer: Optional[str] = None,
+        exclude_pids: Optional[List[int]] = None,
+    ):
+        if memory_sampling not in ("full", "adaptive"):
+            raise ValueError(f"Unsupported memory sampling mode: {memory_sampling}")
+        if process_discovery not in ("children", "table"):
+            raise ValueError(f"Unsupported process discovery: {process_discovery}")
+        if process_accounting not in ("tree", "cgroup"):
+            raise ValueError(f"Unsupported process accounting: {process_accounting}")
+        if cpu_accounting not in ("ticks", "schedstat"):
+            raise ValueError(f"Unsupported CPU accounting: {cpu_accounting}")
+        if cpu_accounting == "schedstat" and not path.exists(f"/proc/{pid}/schedstat"):
+            logger.warning(
+                "No scheduler stats available in procfs, "
+                "falling back to CPU accounting in clock ticks."
+            )
+            cpu_accounting = "ticks"
+        self.memory_sampling = memory_sampling
+        self.process_discovery = process_discovery
+        self.process_accounting = process_accounting
+        self.cpu_accounting = cpu_accounting
+        self.pss_sampler = None
+        self.process_table = None
+        self.process_cache = None
+        # started with the tracking, so that no subprocess is left behind
+        # when the tracker is never started or fails to initialize
+        self.gpu_monitor = None
+        self.implementation = None
+        self.implementation_timings = None
+        # don't account for the tracker itself when it's a descendant
+        self.exclude_pids = set(exclude_pids or ())
+        if getpid() != pid:
+            self.exclude_pids.add(getpid())
+
+        if process_accounting == "cgroup":
+            from .tracker_cgroup import get_process_cgroup
+            from .tracker_cgroup import get_process_stats as get_cgroup_stats
+
+            cgroup = get_process_cgroup(pid)
+            if cgroup is not None:
+                self.get_process_stats = partial(get_cgroup_stats, cgroup=cgroup)
+            else:
+                logger.warning(
+                    f"No cgroup v2 accounting available for process {pid}, "
+                    "falling back to tracking the process tree."
+                )
+                self.process_accounting = "tree"
+
+        if self.process_accounting == "tree":
+            self.implementation, self.implementation_timings = (
+                resolve_tracker_implementation(implementation, pid)
+            )
+            get_process_stats, _ = get_tracker_implementation(self.implementation)
+            kwargs = {}
+            if memory_sampling == "adaptive":
+                self.pss_sampler = kwargs["pss_sampler"] = PssSampler()
+            if process_discovery == "table":
+                from .process_table import ProcessTable
+
+                self.process_table = kwargs["process_table"] = ProcessTable()
+            if cpu_accounting == "schedstat":
+                kwargs["schedstat"] = True
+            if self.implementation == "psutil":
+                from .tracker_psutil import ProcessCache
+
+                self.process_cache = kwargs["process_cache"] = ProcessCache()
+            kwargs["exclude_pids"] = self.exclude_pids
+            self.get_process_stats = partial(get_process_stats, **kwargs)
+
+        self.pid = pid
+        self.stop_event = stop_event
+        self.ring_buffer = ring_buffer
+        self.status = "running"
+        self.interval = interval
+        self.intervals = intervals or {}
+        self.scheduler = None
+        if self.intervals:
+            self.scheduler = MultiRateScheduler(
+                interval, self.intervals, PROCESS_METRIC_GROUPS
+            )
+        self.cycle = 0
+        self.children = children
+        self.start_time = start_time
+
+        # initial data collection so that we can use that as a baseline when diffing after the first interval
+        self.stats = self.get_process_stats(pid, children)
+
+        if autostart:
+            # wait for the start time to be reached
+            if start_time > time():
+                sleep(start_time - time())
+            # we can now start. 1st interval used to collect baseline
+            self.start_tracking(output_file)
+
+    def __call__(self):
+        """Dummy method to make this class callable."""
+        pass
+
+    def diff_stats(self):
+        """Calculate stats since last call."""
+        last_stats = self.stats
+        self.cycle += 1
+        if self.scheduler is None:
+            self.stats = self.get_process_stats(self.pid, self.children)
+            return self._diff_stats(self.stats, last_stats)
+
+        due = self.scheduler.due(self.cycle)
+        self.stats = self.scheduler.merge(
+            self.get_process_stats(self.pid, self.children, groups=due),
+            last_stats,
+            due,
+        )
+        return self.scheduler.update(
+            self._diff_stats(self.stats, last_stats),
+            self.stats,
+            last_stats,
+            due,
+            self._diff_stats,
+        )
+
+    def _diff_stats(self, current_stats: dict, last_stats: dict) -> dict:
+        """Calculate the reported stats between two collected stats."""
+        stats = {
+            "timestamp": round(current_stats["timestamp"], 3),
+            "pid": self.pid,
+            "children": (
+                current_stats["children"] if current_stats.get("children") else None
+            ),
+            "utime": max(0, round(current_stats["utime"] - last_stats["utime"], 6)),
+            "stime": max(0, round(current_stats["stime"] - last_stats["stime"], 6)),
+            "cpu_usage": round(
+                max(
+                    0,
+                    (
+                        (current_stats["utime"] + current_stats["stime"])
+                        - (last_stats["utime"] + last_stats["stime"])
+                    )
+                    / (current_stats["timestamp"] - last_stats["timestamp"]),
+                ),
+                4,
+            ),
+            "memory_mib": round(current_stats["memory_mib"], 4),
+            "disk_read_bytes": max(
+                0, current_stats["disk_read_bytes"] - last_stats["disk_read_bytes"]
+            ),
+            "disk_write_bytes": max(
+                0, current_stats["disk_write_bytes"] - last_stats["disk_write_bytes"]
+            ),
+            "gpu_usage": round(current_stats["gpu_usage"], 4),
+            "gpu_vram_mib": round(current_stats["gpu_vram_mib"], 4),
+            "gpu_utilized": current_stats["gpu_utilized"],
+        }
+        if "memory_pss_share" in current_stats:
+            stats["memory_pss_share"] = round(current_stats["memory_pss_share"], 4)
+        if "run_time" in current_stats:
+            stats["cpu_usage"] = round(
+                max(
+                    0,
+                    (current_stats["run_time"] - last_stats["run_time"])
+                    / (current_stats["timestamp"] - last_stats["timestamp"]),
+                ),
+                4,
+            )
+            stats["run_queue_wait"] = max(
+                0,
+                round(
+                    current_stats["run_queue_wait"] - last_stats["run_queue_wait"], 6
+                ),
+            )
+        return stats
+
+    def has_exited(self, memory_mib: float) -> bool:
+        """Check if the tracked process has exited.
+
+        Args:
+            memory_mib: The memory usage in the last stats.
+
+        Returns:
+            Whether the process has exited.
+        """
+        if self.process_accounting == "cgroup":
+            from .tracker_cgroup import is_process_running
+
+            # the memory charged to the cgroup does not drop to 0 on exit
+            return not is_process_running(self.pid)
+        return memory_mib == 0
+
+    def start_gpu_monitor(self):
+        """Start the long-lived GPU monitor used when collecting the stats."""
+        if self.gpu_monitor is None:
+            self.gpu_monitor = start_gpu_monitor("process", self.interval)
+            self.get_process_stats = partial(
+                self.get_process_stats, gpu_monitor=self.gpu_monitor
+            )
+
+    def start_tracking(
+        self, output_file: Optional[str] = None, print_header: bool = True
+    ):
+        """Start an infinite loop tracking resource usage of the process until it exits.
+
+        A CSV line is written every `interval` seconds.
+
+        Args:
+            output_file: File to write the output to. Defaults to None, printing
+                to stdout (unless writing to a `ring_buffer`).
+            print_header: Whether to print the header of the CSV. Defaults to True.
+        """
+        sink = MetricsSink(output_file, self.ring_buffer)
+        clock = SamplingClock(self.start_time, self.interval)
+        meter = OverheadMeter(self.implementation)
+        try:
+            self.start_gpu_monitor()
+            while True:
+                started = time()
+                current_stats = self.diff_stats()
+                if self.has_exited(current_stats["memory_mib"]):
+                    self.status = "exited"
+                    break
+                current_stats.update(clock.measure(started, time()))
+                current_stats.update(meter.measure())
+                # don't print values yet, we collect data for the 1st baseline
+                if self.cycle == 1:
+                    if print_header:
+                        sink.write_header(current_stats.keys())
+                else:
+                    sink.write(current_stats)
+                # sleep until the next tick (skipping the missed ones), or stop if requested
+                if clock.wait(self.stop_event):
+                    break
+        finally:
+            sink.close()
+            if self.gpu_monitor is not None:
+                self.gpu_monitor.close()
+
+
+class PidTracker(ProcessTracker):
+    """Old name for [resource_tracker.ProcessTracker][].
+
+    This class is deprecated and will be removed in the future.
+    """
+
+    def __init__(self, *args, **kwargs):
+        warn(
+            "PidTracker is deprecated and will be removed in a future release. "
+            "Please use ProcessTracker instead.",
+            DeprecationWarning,
+            stacklevel=2,
+        )
+        super().__init__(*args, **kwargs)
+
+
+class SystemTracker:
+    """Track system-wide resource usage.
+
+    This class monitors system resources like CPU times and usage, memory usage,
+    GPU and VRAM utilization, disk I/O, and network traffic for the entire system.
+
+    Data is collected every `interval` seconds and written to the stdout or
+    `output_file` (if provided) as CSV. Currently, the following columns are
+    tracked:
+
+    - timestamp (float): The current timestamp.
+    - processes (int): The number of running processes.
+    - procs_running (int): The number of runnable tasks (Linux only).
+    - procs_blocked (int): The number of tasks blocked waiting for I/O (Linux only).
+    - utime (int): The total user+nice mode CPU time in seconds.
+    - stime (int): The total system mode CPU time in seconds.
+    - cpu_usage (float): The current CPU usage between 0 and number of CPUs.
+    - memory_free_mib (float): The amount of free memory in MiB.
+    - memory_used_mib (float): The amount of used memory in MiB.
+    - memory_buffers_mib (float): The amount of memory used for buffers in MiB.
+    - memory_cached_mib (float): The amount of memory used for caching in MiB.
+    - memory_active_mib (float): The amount of memory used for active pages in MiB.
+    - memory_inactive_mib (float): The amount of memory used for inactive pages in MiB.
+    - disk_read_bytes (int): The total number of bytes read from disk.
+    - disk_write_bytes (int): The total number of bytes written to disk.
+    - disk_space_total_gb (float): The total disk space in GB.
+    - disk_space_used_gb (float): The used disk space in GB.
+    - disk_space_free_gb (float): The free disk space in GB.
+    - net_recv_bytes (int): The total number of bytes received over network.
+    - net_sent_bytes (int): The total number of bytes sent over network.
+    - gpu_usage (float): The current GPU utilization between 0 and GPU count.
+    - gpu_vram_mib (float): The current GPU memory used in MiB.
+    - gpu_utilized (int): The number of GPUs with utilization > 0.
+    - gpu{index}_usage, gpu{index}_vram_mib, gpu{index}_power_w,
+      gpu{index}_sm_clock_mhz, gpu{index}_pcie_rx_mib_s,
+      gpu{index}_pcie_tx_mib_s and gpu{index}_throttle_reasons: Only tracked
+      with `gpu_columns="per_device"`, the utilization (between 0 and 1), the
+      memory used in MiB, the power draw in W, the SM clock in MHz, the PCIe
+      receive and transmit throughput in MiB/s, and the bitmask of the active
+      clock throttle reasons (NVML only) of each GPU.
+    - sample_latency_ms (float): The time spent on collecting the sample in ms.
+    - schedule_lag_ms (float): How late the collection of the sample started
+      compared to its scheduled tick in ms. When falling behind, the missed
+      ticks are skipped, see [resource_tracker.helpers.SamplingClock][].
+    - tracker_cpu_usage (float): The CPU usage of the tracker itself (including
+      its helper subprocesses) between 0 and number of CPUs.
+    - tracker_memory_mib (float | None): The memory usage of the tracker itself
+      (including its helper subprocesses) in MiB, or None when running in a
+      thread of the tracked process.
+    - tracker_disk_read_bytes and tracker_disk_write_bytes (int | None): The
+      number of bytes read from and written to disk by the tracker, or None
+      when running in a thread. See [resource_tracker.helpers.OverheadMeter][].
+
+    When using the `procfs` implementation, the system-wide procfs files are
+    kept open between samples via a
+    [resource_tracker.tracker_procfs.SystemStatsReader][], which is closed
+    when tracking stops. The reader also caches the mount table until it
+    changes, and collects the disk space stats only once a minute (unless
+    the "disk_space" group is scheduled via `intervals`).
+
+    The GPU stats are queried in-process via NVML when the NVIDIA driver's
+    library can be loaded, otherwise read from a long-lived `nvidia-smi dmon`
+    subprocess, see [resource_tracker.nvidia.start_gpu_monitor][]. The GPU
+    monitor is started with the tracking and closed when tracking stops.
+
+    Args:
+        start_time: Time when to start tracking. Defaults to current time.
+        interval: Sampling interval in seconds. Defaults to 1.
+        autostart: Whether to start tracking immediately. Defaults to True.
+        output_file: File to write the output to. Defaults to None, print to stdout.
+        intervals: Mapping of metric groups ("cpu", "memory", "disk_io",
+            "network", "disk_space" and "gpu", see
+            [resource_tracker.column_maps.SYSTEM_METRIC_GROUPS][]) to their own
+            sampling interval in seconds, rounded to a multiple of `interval`.
+            Groups not listed are collected every `interval` seconds, and the
+            values of slower groups are carried forward into every row, see
+            [resource_tracker.helpers.MultiRateScheduler][]. Defaults to None,
+            collecting all groups every `interval` seconds.
+        process_counting: How to count the processes. Defaults to "scan",
+            listing all processes on each sample. "loadavg" reads the total
+            number of tasks from `/proc/loadavg` instead (Linux only), which
+            has constant cost even with tens of thousands of processes, but
+            also counts threads.
+        implementation: Which collector backend to use: "psutil", "procfs"
+            (Linux only), or "auto" to calibrate both and pick the faster one.
+            Defaults to None, reading the `RESOURCE_TRACKER_IMPLEMENTATION`
+            environment variable, and falling back to psutil if installed,
+            otherwise procfs, see
+            [resource_tracker.helpers.resolve_tracker_implementation][].
+        gpu_columns: Which GPU stats to report. Defaults to "total", summing
+            the utilization and memory usage of all GPUs. "per_device" also
+            reports the stats of each GPU in separate columns, e.g. to spot a
+            single GPU lagging behind the others. The number of GPUs is
+            determined when the tracker starts.
+        stop_event: Event to stop tracking when set, e.g. when running in a
+            thread. Defaults to None, tracking until terminated.
+        ring_buffer: Name of the shared memory block of a
+            [resource_tracker.ring_buffer.RingBufferReader][] to also write the
+            rows to. Defaults to None.
+    """
+
+    def __init__(
+        self,
+        start_time: float = time(),
+        interval: float = 1,
+        autostart: bool = True,
+        output_file: str = None,
+        intervals: Optional[Dict[str, float]] = None,
+        process_counting: Literal["scan", "loadavg"] = "scan",
+        implementation: Optional[Literal["psutil", "procfs", "auto"]] = None,
+        gpu_columns: Literal["total", "per_device"] = "total",
+        stop_event: Optional[Event] = None,
+        ring_buffer: Optional[str] = None,
+    ):
+        if process_counting not in ("scan", "loadavg"):
+            raise ValueError(f"Unsupported process counting: {process_counting}")
+        if gpu_columns not in ("total", "per_device"):
+            raise ValueError(f"Unsupported GPU columns: {gpu_columns}")
+        self.process_counting = process_counting
+        self.gpu_columns = gpu_columns
+        self.implementation, self.implementation_timings = (
+            resolve_tracker_implementation(implementation)
+        )
+        _, get_system_stats = get_tracker_implementation(self.implementation)
+        # started with the tracking, see start_gpu_monitor
+        self.gpu_monitor = None
+        self.gpu_device_count = 0
+        self.get_system_stats = partial(
+            get_system_stats, process_counting=process_counting
+        )
+
+        self.intervals = intervals or {}
+        self.scheduler = None
+        if self.intervals:
+            self.scheduler = MultiRateScheduler(
+                interval, self.intervals, SYSTEM_METRIC_GROUPS
+            )
+
+        self.reader = None
+        if self.implementation == "procfs":
+            from .tracker_procfs import SystemStatsReader
+
+            # disk space is collected at its own interval by the scheduler if set
+            self.reader = SystemStatsReader(
+                disk_space_interval=0 if "disk_space" in self.intervals else 60
+            )
+            self.get_system_stats = partial(self.get_system_stats, reader=self.reader)
+
+        self.stop_event = stop_event
+        self.ring_buffer = ring_buffer
+        self.status = "running"
+        self.interval = interval
+        self.cycle = 0
+        self.start_time = start_time
+
+        # dummy data collection so that diffing on the first time does not fail
+        self.stats = self.get_system_stats()
+
+        if autostart:
+            # wait for the start time to be reached
+            if start_time > time():
+                sleep(start_time - time())
+            # we can now start. 1st interval used to collect baseline
+            self.start_tracking(output_file)
+
+    def __call__(self):
+        """Dummy method to make this class callable."""
+        pass
+
+    def diff_stats(self):
+        """Calculate stats since last call."""
+        last_stats = self.stats
+        self.cycle += 1
+        if self.scheduler is None:
+            self.stats = self.get_system_stats()
+            return self._diff_stats(self.stats, last_stats)
+
+        due = self.scheduler.due(self.cycle)
+        self.stats = self.scheduler.merge(
+            self.get_system_stats(groups=due), last_stats, due
+        )
+        return self.scheduler.update(
+            self._diff_stats(self.stats, last_stats),
+            self.stats,
+            last_stats,
+            due,
+            self._diff_stats,
+        )
+
+    def _diff_stats(self, current_stats: dict, last_stats: dict) -> dict:
+        """Calculate the reported stats between two collected stats."""
+        time_diff = current_stats["timestamp"] - last_stats["timestamp"]
+
+        total_read_bytes = 0
+        total_write_bytes = 0
+        for disk_name in set(current_stats["disk_stats"]) & set(
+            last_stats["disk_stats"]
+        ):
+            read_bytes = max(
+                0,
+                current_stats["disk_stats"][disk_name]["read_bytes"]
+                - last_stats["disk_stats"][disk_name]["read_bytes"],
+            )
+            write_bytes = max(
+                0,
+                current_stats["disk_stats"][disk_name]["write_bytes"]
+                - last_stats["disk_stats"][disk_name]["write_bytes"],
+            )
+            total_read_bytes += read_bytes
+            total_write_bytes += write_bytes
+
+        disk_space_total = 0
+        disk_space_used = 0
+        disk_space_free = 0
+        for disk_space in current_stats["disk_spaces"].values():
+            disk_space_total += disk_space["total"]
+            disk_space_used += disk_space["used"]
+            disk_space_free += disk_space["free"]
+
+        stats = {
+            "timestamp": round(current_stats["timestamp"], 3),
+            "processes": current_stats["processes"],
+            "procs_running": current_stats["procs_running"],
+            "procs_blocked": current_stats["procs_blocked"],
+            "utime": max(0, round(current_stats["utime"] - last_stats["utime"], 6)),
+            "stime": max(0, round(current_stats["stime"] - last_stats["stime"], 6)),
+            "cpu_usage": round(
+                max(
+                    0,
+                    (
+                        (current_stats["utime"] + current_stats["stime"])
+                        - (last_stats["utime"] + last_stats["stime"])
+                    )
+                    / time_diff,
+                ),
+                4,
+            ),
+            "memory_free_mib": round(current_stats["memory_free_mib"], 4),
+            "memory_used_mib": round(current_stats["memory_used_mib"], 4),
+            "memory_buffers_mib": round(current_stats["memory_buffers_mib"], 4),
+            "memory_cached_mib": round(current_stats["memory_cached_mib"], 4),
+            "memory_active_mib": round(current_stats["memory_active_mib"], 4),
+            "memory_inactive_mib": round(current_stats["memory_inactive_mib"], 4),
+            "disk_read_bytes": total_read_bytes,
+            "disk_write_bytes": total_write_bytes,
+            "disk_space_total_gb": round(disk_space_total / 1000_000_000, 2),
+            "disk_space_used_gb": round(disk_space_used / 1000_000_000, 2),
+            "disk_space_free_gb": round(disk_space_free / 1000_000_000, 2),
+            "net_recv_bytes": max(
+                0, current_stats["net_recv_bytes"] - last_stats["net_recv_bytes"]
+            ),
+            "net_sent_bytes": max(
+                0, current_stats["net_sent_bytes"] - last_stats["net_sent_bytes"]
+            ),
+            "gpu_usage": round(current_stats["gpu_usage"], 4),
+            "gpu_vram_mib": round(current_stats["gpu_vram_mib"], 4),
+            "gpu_utilized": current_stats["gpu_utilized"],
+        }
+        # the columns are fixed at start, even if a GPU is missing from a sample
+        devices = current_stats.get("gpu_devices", [])
+        for index in range(self.gpu_device_count):
+            device = devices[index] if index < len(devices) else {}
+            for metric in GPU_DEVICE_COLUMNS:
+                stats[f"gpu{index}_{metric}"] = round(device.get(metric, 0), 4)
+        return stats
+
+    def start_gpu_monitor(self):
+        """Start the long-lived GPU monitor used when collecting the stats.
+
+        The number of per-GPU columns is also set from the monitored devices
+        when using `gpu_columns="per_device"`.
+        """
+        if self.gpu_monitor is None:
+            gpu_devices = self.gpu_columns == "per_device"
+            self.gpu_monitor = start_gpu_monitor("system", self.interval, gpu_devices)
+            if gpu_devices and self.gpu_monitor is not None:
+                self.gpu_device_count = self.gpu_monitor.device_count
+            self.get_system_stats = partial(
+                self.get_system_stats,
+                gpu_monitor=self.gpu_monitor,
+                gpu_devices=self.gpu_device_count > 0,
+            )
+
+    def start_tracking(
+        self, output_file: Optional[str] = None, print_header: bool = True
+    ):
+        """Start an infinite loop tracking system resource usage.
+
+        A CSV line is written every `interval` seconds.
+
+        Args:
+            output_file: File to write the output to. Defaults to None, printing
+                to stdout (unless writing to a `ring_buffer`).
+            print_header: Whether to print the header of the CSV. Defaults to True.
+        """
+        sink = MetricsSink(output_file, self.ring_buffer)
+        clock = SamplingClock(self.start_time, self.interval)
+        meter = OverheadMeter(self.implementation)
+        try:
+            self.start_gpu_monitor()
+            while True:
+                started = time()
+                current_stats = self.diff_stats()
+                current_stats.update(clock.measure(started, time()))
+                current_stats.update(meter.measure())
+                # don't print values yet, we collect data for the 1st baseline
+                if self.cycle == 1:
+                    if print_header:
+                        sink.write_header(current_stats.keys())
+                else:
+                    sink.write(current_stats)
+                # sleep until the next tick (skipping the missed ones), or stop if requested
+                if clock.wait(self.stop_event):
+                    break
+        finally:
+            sink.close()
+            if self.reader is not None:
+                self.reader.close()
+            if self.gpu_monitor is not None:
+                self.gpu_monitor.close()
+
+
+class CombinedTracker:
+    """Track resource usage of a process and the system in a single loop.
+
+    Runs a [resource_tracker.ProcessTracker][] and a
+    [resource_tracker.SystemTracker][] in the same process, sampling both one
+    after the other on each tick, and writing a single CSV line per tick with
+    one timestamp. Columns are prefixed with "process_" and "system_" like in
+    [resource_tracker.ResourceTracker.get_combined_metrics][], so the process-
+    and system-level rows are always aligned. The `sample_latency_ms` and
+    `schedule_lag_ms` diagnostics of the loop are reported without a prefix,
+    and the overhead of the loop (`tracker_*` columns) with the process-level
+    metrics.
+
+    Tracking stops when the tracked process exits.
+
+    Args:
+        pid: Process ID to track. Defaults to current process ID.
+        start_time: Time when to start tracking. Defaults to current time.
+        interval: Sampling interval in seconds. Defaults to 1.
+        children: Whether to track child processes. Defaults to True.
+        autostart: Whether to start tracking immediately. Defaults to True.
+        output_file: File to write the output to. Defaults to None, print to stdout.
+        intervals: Mapping of metric groups to their own sampling interval in
+            seconds, see [resource_tracker.SystemTracker][]. The groups of
+            [resource_tracker.column_maps.PROCESS_METRIC_GROUPS][] also apply to
+            the process-level metrics. Defaults to None.
+        stop_event: Event to stop tracking when set, e.g. when running in a
+            thread. Defaults to None, tracking until the process exits.
+        ring_buffer: Name of the shared memory block of a
+            [resource_tracker.ring_buffer.RingBufferReader][] to also write the
+            rows to. Defaults to None.
+        **kwargs: Further options passed to the
+            [resource_tracker.ProcessTracker][] (`memory_sampling`,
+            `process_discovery`, `process_accounting`, `cpu_accounting`,
+            `exclude_pids`) and
+            the [resource_tracker.SystemTracker][] (`process_counting`,
+            `gpu_columns`), or both (`implementation`, calibrated only once
+            when using "auto").
+    """
+
+    def __init__(
+        self,
+        pid: int = getpid(),
+        start_time: float = time(),
+        interval: float = 1,
+        children: bool = True,
+        autostart: bool = True,
+        output_file: str = None,
+        intervals: Optional[Dict[str, float]] = None,
+        stop_event: Optional[Event] = None,
+        ring_buffer: Optional[str] = None,
+        **kwargs,
+    ):
+        intervals = intervals or {}
+        process_options = (
+            "memory_sampling",
+            "process_discovery",
+            "process_accounting",
+            "cpu_accounting",
+            "exclude_pids",
+        )
+        # calibrated only once when using "auto"
+        implementation, implementation_timings = resolve_tracker_implementation(
+            kwargs.pop("implementation", None), pid
+        )
+        self.process_tracker = ProcessTracker(
+            pid=pid,
+            start_time=start_time,
+            interval=interval,
+            children=children,
+            autostart=False,
+            intervals={
+                group: group_interval
+                for group, group_interval in intervals.items()
+                if group in PROCESS_METRIC_GROUPS
+            },
+            implementation=implementation,
+            **{k: v for k, v in kwargs.items() if k in process_options},
+        )
+        self.system_tracker = SystemTracker(
+            start_time=start_time,
+            interval=interval,
+            autostart=False,
+            intervals=intervals,
+            implementation=implementation,
+            **{k: v for k, v in kwargs.items() if k not in process_options},
+        )
+        for tracker in (self.process_tracker, self.system_tracker):
+            tracker.implementation_timings = implementation_timings
+        self.stop_event = stop_event
+        self.ring_buffer = ring_buffer
+        self.status = "running"
+        self.interval = interval
+        self.cycle = 0
+        self.start_time = start_time
+
+        if autostart:
+            # wait for the start time to be reached
+            if start_time > time():
+                sleep(start_time - time())
+            # we can now start. 1st interval used to collect baseline
+            self.start_tracking(output_file)
+
+    def __call__(self):
+        """Dummy method to make this class callable."""
+        pass
+
+    def diff_stats(self):
+        """Calculate both the process-level and system-wide stats since last call."""
+        self.cycle += 1
+        process_stats = self.process_tracker.diff_stats()
+        system_stats = self.system_tracker.diff_stats()
+        stats = {"timestamp": process_stats.pop("timestamp")}
+        system_stats.pop("timestamp")
+        for key, value in process_stats.items():
+            stats["process_" + key] = value
+        for key, value in system_stats.items():
+            stats["system_" + key] = value
+        return stats
+
+    def start_tracking(
+        self, output_file: Optional[str] = None, print_header: bool = True
+    ):
+        """Start an infinite loop tracking resource usage until the process exits.
+
+        A CSV line is written every `interval` seconds.
+
+        Args:
+            output_file: File to write the output to. Defaults to None, printing
+                to stdout (unless writing to a `ring_buffer`).
+            print_header: Whether to print the header of the CSV. Defaults to True.
+        """
+        sink = MetricsSink(output_file, self.ring_buffer)
+        clock = SamplingClock(self.start_time, self.interval)
+        meter = OverheadMeter(self.system_tracker.implementation)
+        try:
+            self.process_tracker.start_gpu_monitor()
+            self.system_tracker.start_gpu_monitor()
+            while True:
+                started = time()
+                current_stats = self.diff_stats()
+                if self.process_tracker.has_exited(current_stats["process_memory_mib"]):
+                    self.status = "exited"
+                    break
+                current_stats.update(clock.measure(started, time()))
+                # the overhead of the single loop is reported with the process-level metrics
+                for key, value in meter.measure().items():
+                    current_stats["process_" + key] = value
+                # don't print values yet, we collect data for the 1st baseline
+                if self.cycle == 1:
+                    if print_header:
+                        sink.write_header(current_stats.keys())
+                else:
+                    sink.write(current_stats)
+                # sleep until the next tick (skipping the missed ones), or stop if requested
+                if clock.wait(self.stop_event):
+                    break
+        finally:
+            sink.close()
+            if self.system_tracker.reader is not None:
+                self.system_tracker.reader.close()
+            for tracker in (self.process_tracker, self.system_tracker):
+                if tracker.gpu_monitor is not None:
+                    tracker.gpu_monitor.close()
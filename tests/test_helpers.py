@@ -113,3 +113,130 @@ def test_aggregate_stats_with_custom_agg_type():
 
     with raises(ValueError):
         aggregate_stats([stats1, stats2])
+
+
+def test_multi_rate_scheduler():
+    """Test that slower metric groups are carried forward into every row."""
+    from resource_tracker.helpers import MultiRateScheduler
+
+    groups = {
+        "cpu": {"stats": ("utime",), "columns": ("utime",)},
+        "network": {
+            "stats": ("net_recv_bytes", "connections"),
+            "columns": ("net_recv_bytes", "connections"),
+        },
+    }
+    scheduler = MultiRateScheduler(1, {"network": 3}, groups)
+    assert scheduler.every == {"cpu": 1, "network": 3}
+    assert scheduler.due(1) == {"cpu"}
+    assert scheduler.due(3) == {"cpu", "network"}
+
+    def diff(stats, last_stats):
+        return {
+            "timestamp": stats["timestamp"],
+            "utime": stats["utime"] - last_stats["utime"],
+            "net_recv_bytes": stats["net_recv_bytes"] - last_stats["net_recv_bytes"],
+            "connections": stats["connections"],
+        }
+
+    stats = {"timestamp": 0, "utime": 0, "net_recv_bytes": 0, "connections": 1}
+    rows = []
+    for cycle in range(1, 10):
+        due = scheduler.due(cycle)
+        # 1 CPU second and 100 bytes received per second, 5 connections from t=3
+        collected = {
+            "timestamp": cycle,
+            "utime": cycle,
+            "net_recv_bytes": cycle * 100 if "network" in due else 0,
+            "connections": (5 if cycle >= 3 else 1) if "network" in due else 0,
+        }
+        last_stats = stats
+        stats = scheduler.merge(collected, last_stats, due)
+        rows.append(
+            scheduler.update(diff(stats, last_stats), stats, last_stats, due, diff)
+        )
+
+    assert [row["utime"] for row in rows] == [1] * 9
+    # no rate known before the first collection of the group
+    assert [row["net_recv_bytes"] for row in rows[:2]] == [0, 0]
+    assert [row["net_recv_bytes"] for row in rows[2:]] == [100] * 7
+    assert [row["connections"] for row in rows] == [1, 1, 5, 5, 5, 5, 5, 5, 5]
+
+
+def test_multi_rate_scheduler_unknown_group():
+    from resource_tracker.column_maps import SYSTEM_METRIC_GROUPS
+    from resource_tracker.helpers import MultiRateScheduler
+
+    with raises(ValueError, match="foo"):
+        MultiRateScheduler(1, {"foo": 10}, SYSTEM_METRIC_GROUPS)
+
+
+def test_resolve_tracker_implementation(monkeypatch):
+    """Test the override and auto-selection of the tracker implementation."""
+    from resource_tracker.helpers import (
+        calibrate_tracker_implementations,
+        is_tracker_implementation_available,
+        resolve_tracker_implementation,
+    )
+
+    monkeypatch.delenv("RESOURCE_TRACKER_IMPLEMENTATION", raising=False)
+    available = [
+        implementation
+        for implementation in ("psutil", "procfs")
+        if is_tracker_implementation_available(implementation)
+    ]
+    assert resolve_tracker_implementation() == (available[0], None)
+    monkeypatch.setenv("RESOURCE_TRACKER_IMPLEMENTATION", available[-1])
+    assert resolve_tracker_implementation() == (available[-1], None)
+    # constructor argument takes precedence over the environment variable
+    assert resolve_tracker_implementation(available[0]) == (available[0], None)
+    with raises(ValueError):
+        resolve_tracker_implementation("foo")
+
+    timings = calibrate_tracker_implementations(iterations=2)
+    assert set(timings) == set(available)
+    assert all(timing > 0 for timing in timings.values())
+    implementation, timings = resolve_tracker_implementation("auto")
+    assert timings[implementation] == min(timings.values())
+
+
+def test_overhead_meter():
+    """Test that the tracker's own resource usage is measured in processes and threads."""
+    from threading import Thread
+
+    from resource_tracker.helpers import OverheadMeter
+
+    meter = OverheadMeter()
+    sum(range(1000000))
+    overhead = meter.measure()
+    assert overhead["tracker_cpu_usage"] > 0
+    assert overhead["tracker_memory_mib"] > 0
+    assert overhead["tracker_disk_write_bytes"] >= 0
+
+    measured = []
+    thread = Thread(target=lambda: measured.append(OverheadMeter().measure()))
+    thread.start()
+    thread.join()
+    assert measured[0]["tracker_cpu_usage"] >= 0
+    assert measured[0]["tracker_memory_mib"] is None
+
+
+def test_overhead_meter_helpers():
+    """Test that the helper subprocesses are counted in the tracker's own usage."""
+    from subprocess import Popen
+    from sys import executable
+    from time import sleep
+
+    from resource_tracker.helpers import HELPER_PIDS, OverheadMeter
+
+    helper = Popen([executable, "-c", "while True: pass"])
+    HELPER_PIDS.add(helper.pid)
+    try:
+        meter = OverheadMeter()
+        sleep(0.5)
+        overhead = meter.measure()
+    finally:
+        HELPER_PIDS.discard(helper.pid)
+        helper.kill()
+        helper.wait()
+    assert overhead["tracker_cpu_usage"] > 0.5
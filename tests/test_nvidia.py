@@ -0,0 +1,387 @@
+from os import getpid
+from platform import system
+from subprocess import CalledProcessError, TimeoutExpired
+from sys import executable
+from time import sleep, time
+
+import pytest
+
+from resource_tracker.helpers import HELPER_PIDS
+from resource_tracker.nvidia import (
+    NVML_ERROR_INSUFFICIENT_SIZE,
+    NVML_ERROR_NOT_FOUND,
+    NVML_SUCCESS,
+    NvidiaSmiComputeApps,
+    NvidiaSmiDmon,
+    NvidiaSmiPmon,
+    Nvml,
+    NvmlError,
+    load_nvml,
+    run_nvidia_smi,
+    start_gpu_monitor,
+)
+
+
+class FakeNvmlLibrary:
+    """Mimic the NVML functions used by Nvml, called with ctypes arguments."""
+
+    def __init__(self, devices):
+        self.devices = devices
+
+    def device(self, handle):
+        return self.devices[handle.value - 1]
+
+    def fill(self, items, count, values, setter):
+        if items is None or count._obj.value < len(values):
+            count._obj.value = len(values)
+            return NVML_ERROR_INSUFFICIENT_SIZE if values else NVML_SUCCESS
+        for item, value in zip(items, values):
+            setter(item, *value)
+        count._obj.value = len(values)
+        return NVML_SUCCESS
+
+    def nvmlInit_v2(self):
+        return NVML_SUCCESS
+
+    def nvmlDeviceGetCount_v2(self, count):
+        count._obj.value = len(self.devices)
+        return NVML_SUCCESS
+
+    def nvmlDeviceGetHandleByIndex_v2(self, index, handle):
+        handle._obj.value = index.value + 1
+        return NVML_SUCCESS
+
+    def nvmlDeviceGetUtilizationRates(self, handle, utilization):
+        utilization._obj.gpu = self.device(handle)["gpu"]
+        return NVML_SUCCESS
+
+    def nvmlDeviceGetMemoryInfo(self, handle, memory):
+        memory._obj.used = self.device(handle)["used"]
+        return NVML_SUCCESS
+
+    def nvmlDeviceGetProcessUtilization(self, handle, items, count, last_seen):
+        samples = [
+            (pid, timestamp, sm)
+            for pid, (timestamp, sm, _) in self.device(handle)["processes"].items()
+            if timestamp > last_seen.value
+        ]
+        if not samples:
+            return NVML_ERROR_NOT_FOUND
+
+        def setter(item, pid, timestamp, sm):
+            item.pid, item.timeStamp, item.smUtil = pid, timestamp, sm
+
+        return self.fill(items, count, samples, setter)
+
+    def nvmlDeviceGetComputeRunningProcesses_v3(self, handle, count, items):
+        processes = [
+            (pid, memory)
+            for pid, (_, _, memory) in self.device(handle)["processes"].items()
+        ]
+
+        def setter(item, pid, memory):
+            item.pid, item.usedGpuMemory = pid, memory
+
+        return self.fill(items, count, processes, setter)
+
+    def nvmlDeviceGetGraphicsRunningProcesses_v2(self, handle, count, items):
+        return self.fill(items, count, [], None)
+
+    def nvmlDeviceGetPowerUsage(self, handle, power):
+        power._obj.value = self.device(handle)["gpu"] * 1000  # mW
+        return NVML_SUCCESS
+
+    def nvmlDeviceGetClockInfo(self, handle, clock_type, clock):
+        clock._obj.value = 1500
+        return NVML_SUCCESS
+
+    def nvmlDeviceGetPcieThroughput(self, handle, counter, throughput):
+        throughput._obj.value = 2048 if counter.value else 1024  # KB/s
+        return NVML_SUCCESS
+
+    def nvmlDeviceGetCurrentClocksThrottleReasons(self, handle, reasons):
+        return 3  # NVML_ERROR_NOT_SUPPORTED
+
+
+DEVICES = [
+    {
+        "gpu": 50,
+        "used": 2048 * 1024**2,
+        # pid: (sample timestamp, SM utilization, used memory)
+        "processes": {100: (10, 40, 1024 * 1024**2), 200: (11, 10, 512 * 1024**2)},
+    },
+    {"gpu": 0, "used": 256 * 1024**2, "processes": {100: (12, 0, 256 * 1024**2)}},
+]
+
+
+def test_nvml_gpu_stats():
+    """Test that the utilization and memory usage of all GPUs are summed."""
+    nvml = Nvml(FakeNvmlLibrary(DEVICES))
+    assert len(nvml.handles) == 2
+    assert nvml.get_gpu_stats() == {
+        "gpu_usage": 0.5,
+        "gpu_vram_mib": 2304,
+        "gpu_utilized": 1,
+    }
+
+
+def test_nvml_device_stats():
+    """Test that the stats of each GPU are reported, with 0 when not supported."""
+    nvml = Nvml(FakeNvmlLibrary(DEVICES))
+    assert nvml.device_count == 2
+    devices = nvml.get_device_stats()
+    assert devices[0] == {
+        "usage": 0.5,
+        "vram_mib": 2048,
+        "power_w": 50,
+        "sm_clock_mhz": 1500,
+        "pcie_rx_mib_s": 2,
+        "pcie_tx_mib_s": 1,
+        "throttle_reasons": 0,
+    }
+    assert devices[1]["vram_mib"] == 256
+
+
+def test_nvml_process_gpu_stats():
+    """Test that the GPU usage of the monitored processes is summed over GPUs."""
+    nvml = Nvml(FakeNvmlLibrary(DEVICES))
+    stats = nvml.get_process_gpu_stats({100})
+    assert stats == {
+        "gpu_usage": 0.4,
+        "gpu_vram_mib": 1280,
+        "gpu_utilized": 1,
+        "gpu_utilized_indexes": {0},
+    }
+    # only samples newer than the last seen ones are used for utilization
+    stats = nvml.get_process_gpu_stats()
+    assert stats["gpu_usage"] == 0
+    assert stats["gpu_vram_mib"] == 1792
+
+
+def test_nvml_errors(monkeypatch):
+    """Test that NVML is not used when it cannot be initialized."""
+    library = FakeNvmlLibrary(DEVICES)
+    library.nvmlInit_v2 = lambda: 9  # NVML_ERROR_DRIVER_NOT_LOADED
+    pytest.raises(NvmlError, Nvml, library)
+    # too old driver without the v2 process info
+    monkeypatch.delattr(FakeNvmlLibrary, "nvmlDeviceGetGraphicsRunningProcesses_v2")
+    pytest.raises(AttributeError, Nvml, FakeNvmlLibrary(DEVICES))
+
+
+def test_nvml_not_supported(monkeypatch):
+    """Test that sampling goes on when some NVML queries are not supported."""
+    from resource_tracker import SystemTracker
+    from resource_tracker.tracker_procfs import get_process_stats
+
+    library = FakeNvmlLibrary(DEVICES)
+    # NVML_ERROR_NOT_SUPPORTED, e.g. in MIG mode
+    library.nvmlDeviceGetUtilizationRates = lambda handle, utilization: 3
+    library.nvmlDeviceGetProcessUtilization = lambda *args: 3
+    nvml = Nvml(library)
+    assert nvml.is_supported()
+    assert nvml.get_gpu_stats()["gpu_vram_mib"] == 2304
+    assert nvml.get_device_stats()[0]["usage"] == 0
+    stats = get_process_stats(getpid(), gpu_monitor=nvml)
+    assert stats["gpu_usage"] == 0
+    monkeypatch.setattr("resource_tracker.nvidia.load_nvml", lambda: nvml)
+    tracker = SystemTracker(autostart=False, gpu_columns="per_device")
+    tracker.start_gpu_monitor()
+    tracker.diff_stats()
+    stats = tracker.diff_stats()
+    assert stats["gpu_usage"] == 0
+    assert stats["gpu_vram_mib"] == 2304
+    assert stats["gpu1_vram_mib"] == 256
+    # nvidia-smi is used instead when no GPU can be queried
+    library.nvmlDeviceGetMemoryInfo = lambda handle, memory: 3
+    assert not nvml.is_supported()
+    monkeypatch.setattr("resource_tracker.nvidia.Nvml", lambda: Nvml(library))
+    assert load_nvml() is None
+
+
+def test_get_process_stats_nvml():
+    """Test that the GPU stats are queried via NVML when provided."""
+    from resource_tracker.tracker_psutil import get_process_stats
+
+    devices = [{"gpu": 100, "used": 0, "processes": {getpid(): (1, 80, 1024**2)}}]
+    stats = get_process_stats(getpid(), gpu_monitor=Nvml(FakeNvmlLibrary(devices)))
+    assert stats["gpu_usage"] == 0.8
+    assert stats["gpu_vram_mib"] == 1
+    assert stats["gpu_utilized"] == 1
+
+
+def test_load_nvml():
+    """Either NVML is available, or the nvidia-smi fallback is used."""
+    nvml = load_nvml()
+    assert nvml is None or isinstance(nvml, Nvml)
+
+
+PMON_OUTPUT = """\
+# Time        gpu         pid   type     sm    mem    enc    dec    jpg    ofa     fb   ccpm    command
+# HH:MM:SS    Idx           #    C/G      %      %      %      %      %      %     MB     MB    name
+ 12:00:00      0        100     C     10      1      -      -      -      -    100      0    python
+ 12:00:00      1          -     -      -      -      -      -      -      -      -      -    -
+ 12:00:01      0        100     C     40      5      -      -      -      -   1024      0    python
+ 12:00:01      0        200     C     20      5      -      -      -      -    512      0    python
+ 12:00:01      1        100     C      -      -      -      -      -      -    256      0    python
+"""
+
+DMON_OUTPUT = """\
+#Time        gpu    pwr  gtemp  mtemp     sm    mem    enc    dec   mclk   pclk     fb   bar1  rxpci  txpci
+#HH:MM:SS    Idx      W      C      C      %      %      %      %    MHz    MHz     MB     MB   MB/s   MB/s
+ 12:00:00      1     60     40      -      0      0      0      0   1215    210    256      5      1      2
+ 12:00:00      0    250     70      -      3      1      0      0   1215   1980    512      5    100     20
+"""
+
+LIST_GPUS_OUTPUT = """\
+GPU 0: NVIDIA A100-SXM4-40GB (UUID: GPU-00000000-0000-0000-0000-000000000000)
+GPU 1: NVIDIA A100-SXM4-40GB (UUID: GPU-00000000-0000-0000-0000-000000000001)
+"""
+
+# 8 GPUs, more than `nvidia-smi pmon` can monitor
+QUERY_GPU_OUTPUT = "".join(
+    f"GPU-{index}, {index}, {100 if index == 7 else 50}\n" for index in range(8)
+)
+
+QUERY_COMPUTE_APPS_OUTPUT = """\
+100, 1024, GPU-0
+200, 3072, GPU-0
+100, 512, GPU-7
+300, 256, GPU-5
+"""
+
+
+@pytest.fixture
+def fake_nvidia_smi(tmp_path, monkeypatch):
+    """Put a fake `nvidia-smi` on PATH printing the pmon/dmon output."""
+    script = tmp_path / "nvidia-smi"
+    script.write_text(
+        f"#!{executable}\n"
+        "import sys\n"
+        "outputs = "
+        f"{{'pmon': {PMON_OUTPUT!r}, 'dmon': {DMON_OUTPUT!r}, '-L': {LIST_GPUS_OUTPUT!r},"
+        f" '--query-gpu': {QUERY_GPU_OUTPUT!r},"
+        f" '--query-compute-apps': {QUERY_COMPUTE_APPS_OUTPUT!r}}}\n"
+        "print(outputs[sys.argv[1].split('=')[0]])\n"
+    )
+    script.chmod(0o755)
+    monkeypatch.setenv("PATH", str(tmp_path), prepend=":")
+
+
+def wait_for_sample(stream):
+    deadline = time() + 5
+    while stream.thread.is_alive() and time() < deadline:
+        sleep(0.01)
+    return stream
+
+
+@pytest.mark.skipif(system() == "Windows", reason="fake nvidia-smi is a script")
+def test_nvidia_smi_pmon_stream(fake_nvidia_smi):
+    """Test that the latest complete sample of `nvidia-smi pmon` is used."""
+    stream = wait_for_sample(NvidiaSmiPmon())
+    assert stream.process.args[1:5] == ["pmon", "-d", "1", "-s"]
+    assert len(stream.latest) == 3
+    assert stream.get_process_gpu_stats({100}) == {
+        "gpu_usage": 0.4,
+        "gpu_vram_mib": 1280,
+        "gpu_utilized": 1,
+        "gpu_utilized_indexes": {0},
+    }
+    assert stream.get_process_gpu_stats()["gpu_usage"] == pytest.approx(0.6)
+    stream.close()
+
+
+@pytest.mark.skipif(system() == "Windows", reason="fake nvidia-smi is a script")
+def test_nvidia_smi_dmon_stream(fake_nvidia_smi):
+    """Test that the device-level stats are parsed from `nvidia-smi dmon`."""
+    stream = wait_for_sample(NvidiaSmiDmon(interval=30))
+    assert stream.process.args[1:4] == ["dmon", "-d", "10"]
+    assert stream.get_gpu_stats() == {
+        "gpu_usage": 0.03,
+        "gpu_vram_mib": 768,
+        "gpu_utilized": 1,
+    }
+    stream.close()
+
+
+@pytest.mark.skipif(system() == "Windows", reason="fake nvidia-smi is a script")
+def test_nvidia_smi_dmon_device_stats(fake_nvidia_smi):
+    """Test that the per-GPU stats are parsed from `nvidia-smi dmon` in index order."""
+    stream = wait_for_sample(NvidiaSmiDmon(devices=True))
+    assert "pucmt" in stream.process.args
+    assert stream.device_count == 2
+    devices = stream.get_device_stats()
+    assert [device["sm_clock_mhz"] for device in devices] == [1980, 210]
+    assert devices[0]["power_w"] == 250
+    assert devices[0]["pcie_rx_mib_s"] == 100
+    stream.close()
+
+
+@pytest.mark.skipif(system() == "Windows", reason="fake nvidia-smi is a script")
+def test_system_tracker_per_device_columns(fake_nvidia_smi, monkeypatch):
+    """Test that the per-GPU columns are reported with gpu_columns="per_device"."""
+    from resource_tracker import SystemTracker
+
+    monkeypatch.setattr("resource_tracker.nvidia.load_nvml", lambda: None)
+    pytest.raises(ValueError, SystemTracker, autostart=False, gpu_columns="foo")
+    tracker = SystemTracker(autostart=False, gpu_columns="per_device")
+    # no subprocess is left behind by trackers that are never started
+    assert tracker.gpu_monitor is None
+    tracker.start_gpu_monitor()
+    wait_for_sample(tracker.gpu_monitor)
+    stats = tracker.diff_stats()
+    tracker.gpu_monitor.close()
+    assert stats["gpu_vram_mib"] == 768
+    assert stats["gpu0_power_w"] == 250
+    assert stats["gpu1_sm_clock_mhz"] == 210
+    assert "gpu2_usage" not in stats
+    assert "gpu0_usage" not in SystemTracker(autostart=False).diff_stats()
+
+
+@pytest.mark.skipif(system() == "Windows", reason="fake nvidia-smi is a script")
+def test_run_nvidia_smi(fake_nvidia_smi):
+    """Test that the short-lived `nvidia-smi` queries are tracked as helpers."""
+    assert run_nvidia_smi("-L").startswith("GPU 0")
+    pytest.raises(CalledProcessError, run_nvidia_smi, "foo")
+    assert not HELPER_PIDS
+
+
+@pytest.mark.skipif(system() == "Windows", reason="fake nvidia-smi is a script")
+def test_nvidia_smi_compute_apps(fake_nvidia_smi):
+    """Test that the GPU utilization is attributed to processes by their VRAM share."""
+    monitor = NvidiaSmiComputeApps()
+    assert len(monitor.latest[0]) == 8
+    stats = monitor.get_process_gpu_stats({100})
+    monitor.close()
+    # 1/4 of GPU 0 at 50%, and all of GPU 7 at 100%
+    assert stats == {
+        "gpu_usage": 1.125,
+        "gpu_vram_mib": 1536,
+        "gpu_utilized": 2,
+        "gpu_utilized_indexes": {0, 7},
+    }
+    assert monitor.get_process_gpu_stats()["gpu_usage"] == 2
+    assert monitor.get_process_gpu_stats({400})["gpu_utilized"] == 0
+
+
+@pytest.mark.skipif(system() == "Windows", reason="fake nvidia-smi is a script")
+def test_start_gpu_monitor_many_gpus(fake_nvidia_smi, monkeypatch):
+    """Test that `nvidia-smi pmon` is only used for up to 4 GPUs."""
+    monkeypatch.setattr("resource_tracker.nvidia.load_nvml", lambda: None)
+    monitor = start_gpu_monitor("process")
+    assert isinstance(monitor, NvidiaSmiPmon)
+    monitor.close()
+    monkeypatch.setattr(
+        "resource_tracker.nvidia.get_nvidia_smi_device_count", lambda: 8
+    )
+    monitor = start_gpu_monitor("process")
+    assert isinstance(monitor, NvidiaSmiComputeApps)
+    monitor.close()
+
+    def query():
+        raise TimeoutExpired("nvidia-smi", 5)
+
+    # falls back to pmon when the queries fail or hang
+    monkeypatch.setattr(NvidiaSmiComputeApps, "query", staticmethod(query))
+    monitor = start_gpu_monitor("process")
+    assert isinstance(monitor, NvidiaSmiPmon)
+    monitor.close()
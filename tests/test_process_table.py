@@ -0,0 +1,139 @@
+from importlib import import_module
+from os import getpid, path
+from platform import system
+from subprocess import Popen
+from time import sleep
+
+import pytest
+
+pytestmark = pytest.mark.skipif(
+    system() != "Linux", reason="process table only works on Linux"
+)
+
+
+def test_process_table_descendants():
+    """Test that the process table finds the same children as procfs."""
+    from resource_tracker.process_table import ProcessTable
+    from resource_tracker.tracker_procfs import get_process_children
+
+    children = [Popen(["sleep", "10"]) for _ in range(3)]
+    try:
+        table = ProcessTable()
+        table.refresh()
+        assert {child.pid for child in children} <= table.descendants(getpid())
+        assert table.descendants(getpid()) == get_process_children(getpid())
+    finally:
+        for child in children:
+            child.kill()
+            child.wait()
+    table.refresh()
+    assert not {child.pid for child in children} & table.descendants(getpid())
+
+
+def test_process_table_reparented():
+    """Test that orphaned grandchildren are still tracked after their parent exits."""
+    from resource_tracker.process_table import ProcessTable
+    from resource_tracker.tracker_procfs import get_process_children
+
+    table = ProcessTable()
+    parent = Popen(["sh", "-c", "sleep 10 & sleep 0.5"])
+    sleep(0.25)
+    table.refresh()
+    grandchildren = table.descendants(parent.pid)
+    assert len(grandchildren) >= 1
+    parent.wait()
+    # the short-lived sleep exited along with its parent
+    grandchildren = {pid for pid in grandchildren if path.exists(f"/proc/{pid}")}
+    assert len(grandchildren) == 1
+    table.refresh()
+    try:
+        assert grandchildren <= table.descendants(getpid())
+        assert not grandchildren & get_process_children(getpid())
+    finally:
+        for pid in grandchildren:
+            Popen(["kill", str(pid)]).wait()
+
+
+@pytest.mark.parametrize(
+    "tracker_implementation",
+    ["resource_tracker.tracker_psutil", "resource_tracker.tracker_procfs"],
+)
+def test_get_process_stats_process_table(tracker_implementation):
+    """Test that both implementations can use the process table."""
+    from resource_tracker.process_table import ProcessTable
+
+    get_process_stats = getattr(
+        import_module(tracker_implementation), "get_process_stats"
+    )
+    children = [Popen(["sleep", "10"]) for _ in range(3)]
+    try:
+        stats = get_process_stats(getpid(), process_table=ProcessTable())
+        assert stats["children"] >= 3
+        assert stats["memory_mib"] > 0
+    finally:
+        for child in children:
+            child.kill()
+            child.wait()
+
+
+def test_process_table_descendants_exclude():
+    """Test that excluded processes are skipped along with their descendants."""
+    from resource_tracker.process_table import ProcessTable
+    from resource_tracker.tracker_procfs import get_process_children
+
+    parent = Popen(["sh", "-c", "sleep 10 & sleep 10"])
+    sleep(0.25)
+    try:
+        table = ProcessTable()
+        table.refresh()
+        subtree = table.descendants(parent.pid) | {parent.pid}
+        assert len(subtree) >= 3
+        assert subtree <= table.descendants(getpid())
+        assert not subtree & table.descendants(getpid(), exclude={parent.pid})
+        assert not subtree & get_process_children(getpid(), exclude={parent.pid})
+    finally:
+        Popen(["pkill", "-P", str(parent.pid)]).wait()
+        parent.kill()
+        parent.wait()
+
+
+@pytest.mark.parametrize("process_table", [False, True])
+@pytest.mark.parametrize(
+    "tracker_implementation",
+    ["resource_tracker.tracker_psutil", "resource_tracker.tracker_procfs"],
+)
+def test_get_process_stats_exclude_pids(tracker_implementation, process_table):
+    """Test that both implementations skip the excluded processes."""
+    from resource_tracker.process_table import ProcessTable
+
+    get_process_stats = getattr(
+        import_module(tracker_implementation), "get_process_stats"
+    )
+    children = [Popen(["sleep", "10"]) for _ in range(3)]
+    kwargs = {"process_table": ProcessTable()} if process_table else {}
+    try:
+        stats = get_process_stats(getpid(), **kwargs)
+        excluded = get_process_stats(getpid(), exclude_pids={children[0].pid}, **kwargs)
+        assert excluded["children"] == stats["children"] - 1
+    finally:
+        for child in children:
+            child.kill()
+            child.wait()
+
+
+def test_process_table_reused_pid():
+    """Test that a reused process ID is not attributed to the old parent."""
+    from os import getppid
+
+    from resource_tracker.process_table import ProcessTable, get_process_ppid
+
+    table = ProcessTable()
+    table.refresh()
+    # simulate the parent's process ID being reused after it was indexed as a
+    # child of the current process with another start time
+    table._remove(getppid())
+    table._add(getppid(), getpid(), -1)
+    assert getppid() not in table.descendants(getpid())
+    assert (table.parents[getppid()], table.start_times[getppid()]) == (
+        get_process_ppid(getppid())
+    )
@@ -0,0 +1,106 @@
+from platform import system
+
+import pytest
+
+from resource_tracker.procfs_parsers import (
+    SystemRecord,
+    parse_loadavg,
+    parse_meminfo,
+    parse_net_dev,
+    parse_stat,
+)
+
+STAT = b"""cpu  4705 356 584 3699176 23060 0 277 0 0 0
+cpu0 1393 280 293 920196 6209 0 142 0 0 0
+intr 114930548 113199788 3 0 5 263 0 4 [... lots more numbers ...]
+procs_running 2
+procs_blocked 1
+"""
+
+MEMINFO = b"""MemTotal:       16287400 kB
+MemFree:         9871232 kB
+MemAvailable:   13213164 kB
+Buffers:          249564 kB
+Cached:          3128888 kB
+SwapCached:            8 kB
+Active:          2513776 kB
+Inactive:        3327452 kB
+Active(anon):    1025584 kB
+Inactive(anon):   321188 kB
+SReclaimable:     258492 kB
+"""
+
+NET_DEV = b"""Inter-|   Receive                                                |  Transmit
+ face |bytes    packets errs drop fifo frame compressed multicast|bytes    packets errs drop fifo colls carrier compressed
+    lo: 1000       10    0    0    0     0          0         0     1000      10    0    0    0     0       0          0
+  eth0: 2000       20    0    0    0     0          0         0      300       3    0    0    0     0       0          0
+ wlo1: 40          1    0    0    0     0          0         0        5       1    0    0    0     0       0          0
+"""
+
+
+def test_parse_stat():
+    record = SystemRecord()
+    parse_stat(STAT, len(STAT), record)
+    assert (record.cpu_user, record.cpu_nice, record.cpu_system) == (4705, 356, 584)
+    assert (record.procs_running, record.procs_blocked) == (2, 1)
+
+
+def test_parse_loadavg():
+    content = b"0.20 0.18 0.12 1/80 11206\n"
+    record = SystemRecord()
+    parse_loadavg(content, len(content), record)
+    assert record.tasks_total == 80
+
+
+def test_parse_meminfo():
+    record = SystemRecord()
+    parse_meminfo(MEMINFO, len(MEMINFO), record)
+    assert record.mem_total == 16287400
+    assert record.mem_available == 13213164
+    # not confused with SwapCached, Active(anon) or Inactive(anon)
+    assert record.cached == 3128888
+    assert record.active == 2513776
+    assert record.inactive == 3327452
+    assert record.sreclaimable == 258492
+
+
+def test_parse_meminfo_missing_field():
+    content = MEMINFO.replace(b"MemAvailable:   13213164 kB\n", b"")
+    record = SystemRecord()
+    parse_meminfo(content, len(content), record)
+    assert record.mem_available is None
+    assert record.mem_free == 9871232
+
+
+def test_parse_net_dev():
+    record = SystemRecord()
+    parse_net_dev(NET_DEV, len(NET_DEV), record)
+    # loopback is skipped, but not other interfaces ending with "lo"
+    assert record.net_recv_bytes == 2040
+    assert record.net_sent_bytes == 305
+
+
+def test_parse_reused_buffer():
+    """Only the first `size` bytes of a reused buffer are parsed."""
+    buffer = bytearray(NET_DEV + b" stale: 9 9 9 9 9 9 9 9 9 9 9 9 9 9 9 9\n")
+    record = SystemRecord()
+    parse_net_dev(buffer, len(NET_DEV), record)
+    assert record.net_recv_bytes == 2040
+
+
+@pytest.mark.skipif(system() != "Linux", reason="procfs is only available on Linux")
+def test_parsers_on_procfs():
+    from resource_tracker.tracker_procfs import SystemStatsReader
+
+    reader = SystemStatsReader()
+    try:
+        buffer, size = reader.readinto("/proc/meminfo")
+        parse_meminfo(buffer, size, reader.record)
+        mem_info = {
+            line.split(":")[0]: int(line.split()[1])
+            for line in buffer[:size].decode().splitlines()
+        }
+        assert reader.record.mem_total == mem_info["MemTotal"]
+        assert reader.record.cached == mem_info["Cached"]
+    finally:
+        reader.close()
@@ -0,0 +1,102 @@
+from statistics import mean
+
+from pytest import raises
+
+from resource_tracker.retention import MetricsRetention
+from resource_tracker.tiny_data_frame import StatSpec, TinyDataFrame
+
+
+def test_retention_history():
+    """Test that the history covers all samples with bounded number of rows."""
+    retention = MetricsRetention(raw_samples=10, resolutions=(1, 5))
+    timestamps = [100.3 + i / 10 for i in range(200)]
+    for i, timestamp in enumerate(timestamps):
+        retention.add({"timestamp": timestamp, "value": i})
+        history = retention.history()
+        assert len(history) <= 30
+        assert history["timestamp"] == sorted(history["timestamp"])
+        # the coarsest rollup still covers the first sample
+        assert history["timestamp"][0] == timestamps[0]
+        assert history["timestamp"][-1] == timestamp
+    assert retention.samples == 200
+    assert len(retention.raw) == 10
+    assert retention.raw["value"] == list(range(190, 200))
+    rollup = retention.rollup(5)
+    assert rollup["samples"][0] == 47
+    assert rollup["value_min"][0] == 0
+    assert rollup["value_max"][0] == 46
+    assert rollup["value_mean"][0] == 23
+    with raises(ValueError):
+        retention.rollup(2)
+
+
+def test_retention_stats():
+    """Test that the stats are computed from all samples, not the rollups."""
+    retention = MetricsRetention(raw_samples=5, resolutions=(60,))
+    values = [(i * 7) % 11 for i in range(100)]
+    for i, value in enumerate(values):
+        retention.add({"timestamp": i, "value": value, "gpu": None})
+    specs = [
+        StatSpec(column="value", agg=mean, round=2),
+        StatSpec(column="value", agg=max),
+        StatSpec(column="value", agg=sum, agg_name="total"),
+        StatSpec(column="value", agg=len),
+        StatSpec(column="gpu", agg=max),
+    ]
+    assert retention.stats(specs) == {
+        "value": {
+            "mean": round(mean(values), 2),
+            "max": max(values),
+            "total": sum(values),
+        }
+    }
+
+
+def test_retention_sources():
+    """Test that the rows of the sources are paired into prefixed samples."""
+    batches = {
+        "system_": [
+            TinyDataFrame({"timestamp": [1, 2], "cpu": [10, 20]}),
+            {"timestamp": [3], "cpu": [30]},
+        ],
+        "process_": [TinyDataFrame({"timestamp": [1.1], "cpu": [1]})]
+        + [{"timestamp": [2.1, 3.1], "cpu": [2, 3]}],
+    }
+    retention = MetricsRetention(
+        sources={prefix: iter(rows).__next__ for prefix, rows in batches.items()}
+    )
+    retention.update()
+    assert retention.raw.to_dict() == [
+        {"timestamp": 1, "system_cpu": 10, "process_cpu": 1}
+    ]
+    retention.update()
+    assert retention.raw["process_cpu"] == [1, 2, 3]
+    assert retention.raw["timestamp"] == [1, 2, 3]
+
+
+def test_retention_sources_bounded():
+    """Test that the rows waiting for a stalled source are capped."""
+    retention = MetricsRetention(
+        sources={
+            "system_": lambda: {"timestamp": [1, 2, 3, 4, 5], "cpu": [1, 2, 3, 4, 5]},
+            "process_": lambda: {"timestamp": [], "cpu": []},
+        },
+        raw_samples=3,
+    )
+    retention.update()
+    retention.update()
+    assert retention.samples == 0
+    assert [row["cpu"] for row in retention._pending["system_"]] == [3, 4, 5]
+
+
+def test_retention_since():
+    """Test that the samples not processed yet are returned with the new offset."""
+    retention = MetricsRetention(raw_samples=3)
+    for i in range(5):
+        retention.add({"timestamp": i})
+    rows, offset = retention.since(3)
+    assert rows["timestamp"] == [3, 4]
+    assert offset == 5
+    # dropped samples are skipped
+    rows, offset = retention.since(0)
+    assert rows["timestamp"] == [2, 3, 4]
@@ -0,0 +1,89 @@
+from pytest import raises
+
+from resource_tracker.ring_buffer import RingBufferReader, RingBufferWriter
+
+
+def test_ring_buffer_read_write():
+    """Test that the rows written are read with the original types."""
+    reader = RingBufferReader(capacity=4, max_columns=3)
+    try:
+        assert reader.read() == {}
+        writer = RingBufferWriter(reader.name)
+        writer.write({"timestamp": 1.5, "pid": 42, "gpu_usage": None})
+        writer.write({"timestamp": 2.5, "pid": 43, "gpu_usage": 0.25})
+        assert reader.read() == {
+            "timestamp": [1.5, 2.5],
+            "pid": [42, 43],
+            "gpu_usage": [None, 0.25],
+        }
+        writer.write({"timestamp": 3.5, "pid": 44, "gpu_usage": 0})
+        assert reader.read()["pid"] == [42, 43, 44]
+        writer.close()
+    finally:
+        reader.close()
+    # the rows read are kept after closing
+    assert reader.read()["pid"] == [42, 43, 44]
+
+
+def test_ring_buffer_lost_rows():
+    """Test that the overwritten rows are counted as lost."""
+    reader = RingBufferReader(capacity=4, max_columns=2)
+    try:
+        writer = RingBufferWriter(reader.name)
+        for i in range(10):
+            writer.write({"timestamp": i, "value": i * 2})
+        data = reader.read()
+        # the oldest slot might be overwritten by the next row while reading
+        assert data["timestamp"] == [7, 8, 9]
+        assert reader.lost == 7
+        writer.close()
+    finally:
+        reader.close()
+
+
+def test_ring_buffer_keep():
+    """Test that only the rows not returned before are read with keep=False."""
+    reader = RingBufferReader(capacity=4, max_columns=2, keep=False)
+    try:
+        writer = RingBufferWriter(reader.name)
+        writer.write({"timestamp": 1, "value": 2})
+        writer.write({"timestamp": 2, "value": 4})
+        # rows drained in the background are returned on the next read
+        reader.poll()
+        writer.write({"timestamp": 3, "value": 6})
+        assert reader.read()["value"] == [2, 4, 6]
+        assert reader.read() == {"timestamp": [], "value": []}
+        writer.close()
+    finally:
+        reader.close()
+
+
+def test_ring_buffer_read_without_copy():
+    """Test that the rows read before are not copied again with keep=True."""
+    reader = RingBufferReader(capacity=4, max_columns=2)
+    try:
+        writer = RingBufferWriter(reader.name)
+        writer.write({"timestamp": 1, "value": 2})
+        first = reader.read()
+        writer.write({"timestamp": 2, "value": 4})
+        # rows drained in the background are only added on the next read
+        reader.poll()
+        assert first["value"] == [2]
+        second = reader.read()
+        assert second["value"] is first["value"]
+        assert second["value"] == [2, 4]
+        writer.close()
+    finally:
+        reader.close()
+
+
+def test_ring_buffer_too_many_columns():
+    """Test that rows not fitting into the ring buffer are rejected."""
+    reader = RingBufferReader(capacity=4, max_columns=2)
+    try:
+        writer = RingBufferWriter(reader.name)
+        with raises(ValueError):
+            writer.write({"a": 1, "b": 2, "c": 3})
+        writer.close()
+    finally:
+        reader.close()
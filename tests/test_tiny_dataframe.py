@@ -3,7 +3,12 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
-from resource_tracker.tiny_data_frame import DictReader, StatSpec, TinyDataFrame
+from resource_tracker.tiny_data_frame import (
+    DictReader,
+    IncrementalCsvReader,
+    StatSpec,
+    TinyDataFrame,
+)
 
 
 @pytest.fixture
@@ -681,3 +686,56 @@ def test_stats_with_failing_agg(sample_data):
     assert "bad" not in result.get("cpu", {})
     # the valid spec should still produce a result
     assert result["memory"]["max"] == 4800
+
+
+def test_incremental_csv_reader(tmp_path):
+    """Test that only the complete lines appended since the last read are parsed."""
+    csv_file = tmp_path / "metrics.csv"
+    csv_file.write_bytes(b"")
+    csv_reader = IncrementalCsvReader(str(csv_file))
+    assert len(csv_reader.read()) == 0
+
+    with open(csv_file, "ab") as f:
+        f.write(b'"timestamp","cpu","name"\n1,0.5,"foo"\n2,')
+    df = csv_reader.read()
+    assert df.columns == ["timestamp", "cpu", "name"]
+    assert df.to_dict() == [{"timestamp": 1, "cpu": 0.5, "name": "foo"}]
+
+    with open(csv_file, "ab") as f:
+        f.write(b'1.5,"bar"\n3,,"baz"\n')
+    with patch("resource_tracker.tiny_data_frame.parse_csv_value") as parse:
+        parse.side_effect = lambda value: value
+        csv_reader.read()
+        # the previous rows are not parsed again
+        assert parse.call_count == 6
+    assert csv_reader.read()["timestamp"] == [1, "2", "3"]
+
+
+def test_incremental_csv_reader_truncated(tmp_path):
+    """Test that a truncated file is parsed again from the beginning."""
+    csv_file = tmp_path / "metrics.csv"
+    csv_file.write_text('"timestamp","cpu"\n1,10\n2,20\n')
+    csv_reader = IncrementalCsvReader(str(csv_file))
+    assert len(csv_reader.read()) == 2
+    csv_file.write_text('"timestamp","cpu"\n3,30\n')
+    assert csv_reader.read()["cpu"] == [30]
+
+
+def test_incremental_csv_reader_corrupt(tmp_path):
+    """Test that lines with an unexpected number of fields are rejected."""
+    csv_file = tmp_path / "metrics.csv"
+    csv_file.write_text('"timestamp","cpu"\n1,10,100\n')
+    with pytest.raises(ValueError):
+        IncrementalCsvReader(str(csv_file)).read()
+
+
+def test_incremental_csv_reader_keep(tmp_path):
+    """Test that only the new rows are returned without keeping the parsed rows."""
+    csv_file = tmp_path / "metrics.csv"
+    csv_file.write_text('"timestamp","cpu"\n1,10\n2,20\n')
+    csv_reader = IncrementalCsvReader(str(csv_file), keep=False)
+    assert csv_reader.read()["cpu"] == [10, 20]
+    with open(csv_file, "a") as f:
+        f.write("3,30\n")
+    assert csv_reader.read().to_dict() == [{"timestamp": 3, "cpu": 30}]
+    assert len(csv_reader.read()) == 0
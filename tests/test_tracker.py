@@ -1,5 +1,5 @@
 from importlib import import_module
-from os import getpid
+from os import getpid, path
 from platform import system
 
 import pytest
@@ -71,6 +71,315 @@ def test_get_system_stats_implementations(tracker_implementation):
     assert stats["memory_used_mib"] > 0
 
 
+@pytest.mark.parametrize(
+    "tracker_implementation",
+    [
+        "resource_tracker.tracker_psutil",
+        pytest.param(
+            "resource_tracker.tracker_procfs",
+            marks=pytest.mark.skipif(
+                system() != "Linux", reason="procfs implementation only works on Linux"
+            ),
+        ),
+    ],
+)
+def test_get_process_stats_adaptive_memory(tracker_implementation):
+    """Test that PSS is only refreshed periodically with a PssSampler."""
+    from resource_tracker.helpers import PssSampler
+
+    module = import_module(tracker_implementation)
+    get_process_stats = getattr(module, "get_process_stats")
+    assert "memory_pss_share" not in get_process_stats(getpid())
+
+    # children (e.g. the multiprocessing resource tracker started by other
+    # tests) are not affected by the RSS change below
+    sampler = PssSampler(every=3)
+    stats = get_process_stats(getpid(), children=False, pss_sampler=sampler)
+    assert stats["memory_pss_share"] == 1
+    stats_estimated = get_process_stats(getpid(), children=False, pss_sampler=sampler)
+    assert stats_estimated["memory_pss_share"] == 0
+    assert abs(stats_estimated["memory_mib"] - stats["memory_mib"]) < 10
+    # refresh after a large change in RSS
+    bigobj = bytearray(100 * 1024 * 1024)  # 100MB
+    stats_refreshed = get_process_stats(getpid(), children=False, pss_sampler=sampler)
+    assert stats_refreshed["memory_pss_share"] == 1
+    assert stats_refreshed["memory_mib"] >= stats["memory_mib"] + 90
+    del bigobj
+
+
+def test_process_tracker_adaptive_memory():
+    """Test that the process tracker reports the PSS share in adaptive mode."""
+    from resource_tracker import ProcessTracker
+
+    pytest.raises(ValueError, ProcessTracker, autostart=False, memory_sampling="foo")
+    tracker = ProcessTracker(autostart=False, memory_sampling="adaptive")
+    stats = tracker.diff_stats()
+    assert stats["memory_mib"] > 0
+    assert 0 <= stats["memory_pss_share"] <= 1
+    assert "memory_pss_share" not in ProcessTracker(autostart=False).diff_stats()
+
+
+def test_psutil_process_cache():
+    """Test that psutil.Process objects are reused between samples."""
+    from resource_tracker.tracker_psutil import ProcessCache, get_process_stats
+
+    cache = ProcessCache()
+    process = cache.get(getpid())
+    assert cache.get(getpid()) is process
+    assert cache.get(getpid(), 1) is not process
+    process = cache.get(getpid(), 1)
+    assert cache.get(getpid(), 1) is process
+    # reused process ID with a different creation time
+    assert cache.get(getpid(), 2) is not process
+
+    stats = get_process_stats(getpid(), process_cache=cache)
+    assert stats["memory_mib"] > 0
+    assert stats["utime"] > 0
+    cache.forget_others(set())
+    assert cache.processes == {}
+
+
+@pytest.mark.skipif(
+    not path.exists(f"/proc/{getpid()}/task/{getpid()}/children"),
+    reason="requires procfs children files",
+)
+def test_psutil_process_cache_children():
+    """Test that psutil.Process objects are only created for new children."""
+    from subprocess import Popen
+    from unittest.mock import patch
+
+    from psutil import Process
+
+    from resource_tracker import tracker_psutil
+    from resource_tracker.process_table import ProcessTable
+    from resource_tracker.tracker_psutil import ProcessCache, get_child_pids
+
+    children = [Popen(["sleep", "10"]) for _ in range(3)]
+    try:
+        assert get_child_pids(getpid()) == {
+            child.pid for child in Process().children(recursive=True)
+        }
+        cache = ProcessCache()
+        tracker_psutil.get_process_stats(getpid(), process_cache=cache)
+        with patch.object(tracker_psutil, "Process", side_effect=Process) as created:
+            stats = tracker_psutil.get_process_stats(getpid(), process_cache=cache)
+            assert stats["children"] >= 3
+            assert created.call_count == 0
+        # simulate a cached object of an earlier process with the same ID
+        cache.create_times[children[1].pid] -= 1
+        cached = cache.processes[children[1].pid]
+        tracker_psutil.get_process_stats(getpid(), process_cache=cache)
+        assert cache.processes[children[1].pid] is not cached
+        # the start times from the process table detect reused process IDs
+        table = ProcessTable()
+        tracker_psutil.get_process_stats(
+            getpid(), process_cache=cache, process_table=table
+        )
+        # simulate a cached object of an earlier process with the same ID
+        cache.create_times[children[0].pid] -= 1
+        cached = cache.processes[children[0].pid]
+        tracker_psutil.get_process_stats(
+            getpid(), process_cache=cache, process_table=table
+        )
+        assert cache.processes[children[0].pid] is not cached
+    finally:
+        for child in children:
+            child.kill()
+            child.wait()
+
+
+@pytest.mark.skipif(
+    system() != "Linux", reason="procfs implementation only works on Linux"
+)
+def test_get_process_schedstat():
+    """Test that the run time of all threads is summed from schedstat."""
+    from threading import Event, Thread
+
+    from resource_tracker.tracker_procfs import get_process_schedstat
+
+    run_time, wait_time = get_process_schedstat(getpid())
+    assert run_time > 0 and wait_time >= 0
+    assert get_process_schedstat(2**22 + 1) == (0, 0)
+
+    stop = Event()
+    thread = Thread(target=stop.wait)
+    thread.start()
+    try:
+        # the main thread's schedstat only covers that thread
+        assert (
+            get_process_schedstat(getpid())[0]
+            >= get_process_schedstat(getpid(), threads=1)[0]
+        )
+    finally:
+        stop.set()
+        thread.join()
+
+
+@pytest.mark.skipif(
+    system() != "Linux", reason="procfs implementation only works on Linux"
+)
+def test_process_tracker_schedstat():
+    """Test CPU usage from the scheduler's nanosecond run times."""
+    from time import perf_counter
+
+    from resource_tracker import ProcessTracker
+
+    pytest.raises(ValueError, ProcessTracker, autostart=False, cpu_accounting="foo")
+    tracker = ProcessTracker(autostart=False, cpu_accounting="schedstat")
+    end = perf_counter() + 0.2
+    while perf_counter() < end:
+        pass
+    stats = tracker.diff_stats()
+    assert 0.5 < stats["cpu_usage"] < 1.5
+    assert stats["run_queue_wait"] >= 0
+    assert "run_queue_wait" not in ProcessTracker(autostart=False).diff_stats()
+
+
+@pytest.mark.skipif(system() != "Linux", reason="/proc/loadavg is only on Linux")
+def test_system_tracker_process_counting():
+    """Test counting processes via /proc/loadavg instead of listing all processes."""
+    from resource_tracker import SystemTracker
+
+    pytest.raises(ValueError, SystemTracker, autostart=False, process_counting="foo")
+    scan = SystemTracker(autostart=False).diff_stats()
+    loadavg = SystemTracker(autostart=False, process_counting="loadavg").diff_stats()
+    # tasks include threads, so at least as many as processes
+    assert loadavg["processes"] >= scan["processes"] - 5
+    assert loadavg["procs_running"] >= 1
+    assert loadavg["procs_blocked"] >= 0
+
+
+def test_trackers_multi_rate_intervals():
+    """Test that metric groups are only collected at their own intervals."""
+    from resource_tracker import ProcessTracker, ResourceTracker, SystemTracker
+
+    pytest.raises(ValueError, SystemTracker, autostart=False, intervals={"foo": 1})
+    pytest.raises(ValueError, ProcessTracker, autostart=False, intervals={"network": 1})
+    pytest.raises(ValueError, ResourceTracker, intervals={"foo": 1})
+
+    collected = []
+
+    def spy(get_stats):
+        def wrapper(*args, groups=None):
+            collected.append(groups)
+            return get_stats(*args, groups=groups)
+
+        return wrapper
+
+    tracker = SystemTracker(
+        interval=0.01, autostart=False, intervals={"disk_space": 0.03, "gpu": 0.03}
+    )
+    tracker.get_system_stats = spy(tracker.get_system_stats)
+    rows = [tracker.diff_stats() for _ in range(3)]
+    assert all(row.keys() == rows[0].keys() for row in rows)
+    assert ["disk_space" in groups for groups in collected] == [False, False, True]
+    assert "cpu" in collected[0] and "gpu" not in collected[0]
+    # carried forward from the initial collection
+    assert rows[0]["disk_space_total_gb"] > 0
+
+    collected.clear()
+    tracker = ProcessTracker(interval=0.01, autostart=False, intervals={"memory": 0.02})
+    tracker.get_process_stats = spy(tracker.get_process_stats)
+    rows = [tracker.diff_stats() for _ in range(3)]
+    assert ["memory" in groups for groups in collected] == [False, True, False]
+    assert all(row["memory_mib"] > 0 for row in rows)
+
+
+@pytest.mark.skipif(
+    system() != "Linux", reason="procfs implementation only works on Linux"
+)
+def test_get_process_record_procfs():
+    """Test the single-pass procfs record of a process tree."""
+    from subprocess import Popen
+
+    from resource_tracker.tracker_procfs import get_process_record, get_process_stats
+
+    record = get_process_record(getpid())
+    assert record.pid == getpid()
+    assert record.utime > 0
+    assert record.pss > 0
+    assert get_process_record(2**22 + 1) is None
+
+    children = [Popen(["sleep", "10"]) for _ in range(3)]
+    try:
+        stats = get_process_stats(getpid())
+        assert stats["children"] >= 3
+        assert stats["memory_mib"] > record.pss / 1024
+    finally:
+        for child in children:
+            child.kill()
+            child.wait()
+
+
+@pytest.mark.skipif(
+    system() != "Linux", reason="procfs implementation only works on Linux"
+)
+def test_system_stats_reader_procfs():
+    """Test that rereading open procfs files gives the same results as opening them."""
+    from resource_tracker.tracker_procfs import (
+        ProcFile,
+        SystemStatsReader,
+        get_system_stats,
+    )
+
+    # start with a tiny buffer to test growing it
+    proc_file = ProcFile("/proc/meminfo", buffer_size=16)
+    try:
+        with open("/proc/meminfo") as f:
+            assert proc_file.read().split(":")[0] == f.read().split(":")[0]
+        assert proc_file.read().startswith("MemTotal:")
+    finally:
+        proc_file.close()
+
+    reader = SystemStatsReader()
+    try:
+        for _ in range(2):
+            stats_reader = get_system_stats(reader=reader)
+            stats = get_system_stats()
+            assert stats_reader.keys() == stats.keys()
+            assert stats_reader["disk_stats"].keys() == stats["disk_stats"].keys()
+            assert stats_reader["disk_spaces"].keys() == stats["disk_spaces"].keys()
+            assert abs(stats_reader["memory_used_mib"] - stats["memory_used_mib"]) < 50
+            assert stats_reader["utime"] > 0
+    finally:
+        reader.close()
+    assert reader.files == {}
+
+
+@pytest.mark.skipif(
+    system() != "Linux", reason="procfs implementation only works on Linux"
+)
+def test_system_stats_reader_disk_spaces_procfs():
+    """Test that the mount table and disk space stats are cached by the reader."""
+    from resource_tracker.tracker_procfs import (
+        MountTable,
+        SystemStatsReader,
+        get_disk_spaces,
+        parse_mounts,
+    )
+
+    with open("/proc/mounts") as f:
+        mount_points, check_zfs = parse_mounts(f.read())
+    mounts = MountTable()
+    try:
+        assert mounts.mount_points == mount_points
+        assert mounts.check_zfs == check_zfs
+        assert not mounts.update()
+    finally:
+        mounts.close()
+
+    reader = SystemStatsReader()
+    try:
+        disk_spaces = reader.get_disk_spaces()
+        assert disk_spaces.keys() == get_disk_spaces(mount_points, check_zfs).keys()
+        assert reader.get_disk_spaces() is disk_spaces
+        reader.disk_space_interval = 0
+        assert reader.get_disk_spaces() is not disk_spaces
+    finally:
+        reader.close()
+    assert reader.mounts is None
+
+
 @pytest.mark.skipif(
     system() != "Linux", reason="procfs implementation only works on Linux"
 )
@@ -285,3 +594,274 @@ def test_resource_tracker_restart():
     pytest.raises(RuntimeError, tracker.start)
     tracker.stop()
     pytest.raises(RuntimeError, tracker.start)
+
+
+def test_resource_tracker_implementation():
+    """Test that the selected implementation is passed to the trackers and recorded."""
+    from resource_tracker import ResourceTracker
+
+    pytest.raises(ValueError, ResourceTracker, implementation="foo")
+    tracker = ResourceTracker(implementation="auto", interval=0.1)
+    tracker.start()
+    while tracker.n_samples == 0:
+        cpu_single(duration=0.1)
+    tracker.stop()
+    metadata = tracker.snapshot()["metadata"]["resource_tracker"]
+    assert metadata["implementation"] in ("psutil", "procfs")
+    assert metadata["implementation"] in metadata["implementation_timings"]
+    restored = ResourceTracker.from_snapshot(tracker.snapshot())
+    assert restored.implementation == metadata["implementation"]
+    assert restored.implementation_timings == metadata["implementation_timings"]
+
+
+def test_combined_tracker_calibrates_once(monkeypatch):
+    """Test that the implementation is calibrated once for both trackers."""
+    from resource_tracker import helpers
+    from resource_tracker.trackers import CombinedTracker
+
+    calls = []
+
+    def calibrate(pid=None):
+        calls.append(pid)
+        return {"procfs": 0.1}
+
+    monkeypatch.setattr(helpers, "calibrate_tracker_implementations", calibrate)
+    tracker = CombinedTracker(autostart=False, implementation="auto")
+    assert len(calls) == 1
+    for collector in (tracker.process_tracker, tracker.system_tracker):
+        assert collector.implementation == "procfs"
+        assert collector.implementation_timings == {"procfs": 0.1}
+
+
+def test_resource_tracker_combined_sampler():
+    """Test that the combined sampler writes aligned process and system rows."""
+    from resource_tracker import ResourceTracker
+
+    pytest.raises(ValueError, ResourceTracker, sampler="foo")
+    assert ResourceTracker(sampler="combined", track_system=False).sampler == "separate"
+    tracker = ResourceTracker(sampler="combined", interval=0.1)
+    tracker.start()
+    wait_for_tracker(tracker)
+    tracker.stop()
+    assert tracker.trackers == ["combined_tracker"]
+    assert tracker.combined_tracker_metrics[0]["process_memory_mib"] > 0
+    process_metrics = tracker.process_metrics
+    system_metrics = tracker.system_metrics
+    assert process_metrics["timestamp"] == system_metrics["timestamp"]
+    assert process_metrics[0]["memory_mib"] > 0
+    assert system_metrics[0]["memory_used_mib"] > 0
+    assert "processes" not in process_metrics.columns
+    combined = tracker.get_combined_metrics()
+    assert len(combined) == tracker.n_samples
+    assert combined[0]["system_processes"] > 0
+    restored = ResourceTracker.from_snapshot(tracker.snapshot())
+    assert restored.sampler == "combined"
+    assert (
+        restored.snapshot()["process_metrics"] == tracker.snapshot()["process_metrics"]
+    )
+    assert restored.system_metrics["timestamp"] == system_metrics["timestamp"]
+
+
+@pytest.mark.parametrize("sampler", ["separate", "combined"])
+def test_resource_tracker_sampling_diagnostics(sampler):
+    """Test that the trackers report how late and how long each sample was."""
+    from resource_tracker import ResourceTracker
+
+    tracker = ResourceTracker(method="thread", interval=0.1, sampler=sampler)
+    tracker.start()
+    wait_for_tracker(tracker)
+    tracker.stop()
+    for metrics in (tracker.process_metrics, tracker.system_metrics):
+        assert metrics[0]["sample_latency_ms"] > 0
+        assert metrics[0]["schedule_lag_ms"] >= 0
+    sampling = tracker.snapshot()["metadata"]["sampling"]
+    assert sampling["process"]["sample_latency_ms"]["max"] > 0
+    assert sampling["system"]["skipped_ticks"] >= 0
+
+
+@pytest.mark.parametrize("method", [None, "thread"])
+def test_resource_tracker_overhead(method):
+    """Test that the trackers report their own resource usage."""
+    from resource_tracker import ResourceTracker
+
+    tracker = ResourceTracker(method=method, interval=0.1)
+    tracker.start()
+    wait_for_tracker(tracker)
+    tracker.stop()
+    for metrics in (tracker.process_metrics, tracker.system_metrics):
+        assert metrics[0]["tracker_cpu_usage"] >= 0
+    stats = tracker.stats()
+    assert stats["tracker_cpu_usage"]["max"] > 0
+    if method == "thread":
+        assert "tracker_memory_mib" not in stats
+    else:
+        assert stats["tracker_memory_mib"]["mean"] > 0
+
+
+@pytest.mark.parametrize("method", [None, "agent"])
+def test_resource_tracker_excludes_trackers(method):
+    """Test that the tracker subprocesses are not counted as children."""
+    from resource_tracker import ResourceTracker
+    from resource_tracker.tracker_procfs import get_process_children
+
+    others = len(get_process_children(getpid()))
+    tracker = ResourceTracker(method=method, interval=0.1)
+    tracker.start()
+    wait_for_tracker(tracker)
+    tracker.stop()
+    children = [row["children"] or 0 for row in tracker.process_metrics]
+    assert max(children) <= others
+
+
+def test_system_tracker_skips_missed_ticks():
+    """Test that a slow sample skips the missed ticks instead of catching up."""
+    from threading import Event, Thread
+    from time import sleep
+    from unittest.mock import MagicMock, patch
+
+    from resource_tracker import SystemTracker
+
+    stop_event = Event()
+    tracker = SystemTracker(autostart=False, interval=0.05, stop_event=stop_event)
+    diff_stats = tracker.diff_stats
+
+    def slow_diff_stats():
+        if tracker.cycle == 2:
+            sleep(0.23)
+        return diff_stats()
+
+    rows = []
+    tracker.diff_stats = slow_diff_stats
+    sink = MagicMock()
+    sink.write.side_effect = lambda row: rows.append(dict(row))
+    with patch("resource_tracker.trackers.MetricsSink", return_value=sink):
+        thread = Thread(target=tracker.start_tracking, daemon=True)
+        thread.start()
+        sleep(0.6)
+        stop_event.set()
+        thread.join(1)
+    assert max(row["sample_latency_ms"] for row in rows) > 200
+    # no burst of late samples after the slow one
+    assert max(row["schedule_lag_ms"] for row in rows) < 50
+
+
+@pytest.mark.parametrize("sampler", ["separate", "combined"])
+def test_resource_tracker_thread(sampler):
+    """Test that the trackers can run in threads instead of subprocesses."""
+    from threading import Thread
+
+    from resource_tracker import ResourceTracker
+
+    tracker = ResourceTracker(method="thread", interval=0.1, sampler=sampler)
+    tracker.start()
+    wait_for_tracker(tracker)
+    tracker.stop()
+    workers = [getattr(tracker, f"{name}_process") for name in tracker.trackers]
+    assert all(isinstance(worker, Thread) for worker in workers)
+    assert not any(worker.is_alive() for worker in workers)
+    assert tracker.process_metrics[0]["memory_mib"] > 0
+    assert tracker.system_metrics[0]["memory_used_mib"] > 0
+    assert tracker.get_combined_metrics()[0]["process_utime"] >= 0
+
+
+@pytest.mark.parametrize("sampler", ["separate", "combined"])
+def test_resource_tracker_agent(sampler):
+    """Test that the trackers can run as lean agent subprocesses."""
+    from subprocess import Popen
+
+    from resource_tracker import ResourceTracker
+
+    tracker = ResourceTracker(method="agent", interval=0.1, sampler=sampler)
+    tracker.start()
+    wait_for_tracker(tracker)
+    tracker.stop()
+    workers = [getattr(tracker, f"{name}_process") for name in tracker.trackers]
+    assert all(isinstance(worker, Popen) for worker in workers)
+    assert all(worker.poll() is not None for worker in workers)
+    assert tracker.process_metrics[0]["memory_mib"] > 0
+    assert tracker.system_metrics[0]["memory_used_mib"] > 0
+
+
+@pytest.mark.parametrize("method", [None, "thread"])
+@pytest.mark.parametrize("csv_sink", [False, True])
+def test_resource_tracker_shared_memory(method, csv_sink):
+    """Test that the trackers can pass the rows via shared-memory ring buffers."""
+    from os import path
+
+    from resource_tracker import ResourceTracker
+
+    tracker = ResourceTracker(
+        method=method, interval=0.1, transport="shared_memory", csv_sink=csv_sink
+    )
+    tracker.start()
+    wait_for_tracker(tracker)
+    tracker.stop()
+    assert tracker.process_metrics[0]["memory_mib"] > 0
+    assert tracker.system_metrics[0]["memory_used_mib"] > 0
+    assert tracker.snapshot()["metadata"]["transport"] == "shared_memory"
+    assert (path.getsize(tracker.system_tracker_filepath) > 0) == csv_sink
+    n_samples = tracker.n_samples
+    tracker.cleanup()
+    # the rows read are kept after removing the ring buffers
+    assert tracker.n_samples == n_samples
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [{}, {"transport": "shared_memory"}, {"sampler": "combined"}],
+)
+def test_resource_tracker_retention(kwargs):
+    """Test that only the recent samples and the rollups are kept."""
+    from resource_tracker import ResourceTracker
+
+    tracker = ResourceTracker(interval=0.1, retention=5, rollups=(0.5, 1), **kwargs)
+    tracker.start()
+    tracker.wait_for_samples(n=15, timeout=10)
+    tracker.stop()
+    n_samples = tracker.n_samples
+    assert n_samples >= 15
+    process_metrics = tracker.process_metrics
+    assert len(process_metrics) < n_samples
+    assert len(process_metrics) == len(tracker.system_metrics)
+    assert process_metrics["memory_mib"][0] > 0
+    stats = tracker.stats()
+    # computed from all samples
+    assert stats["timestamp"]["duration"] >= n_samples * 0.1 - 0.01
+    assert (
+        stats["process_memory_mib"]["max"] >= max(process_metrics["memory_mib"]) - 0.01
+    )
+    snapshot = tracker.snapshot()
+    assert snapshot["metadata"]["retention"] == 5
+    assert snapshot["metadata"]["sampling"]["system"]["skipped_ticks"] == 0
+    tracker.cleanup()
+    restored = ResourceTracker.from_snapshot(snapshot)
+    assert restored.retention == 5
+    assert restored.rollups == (0.5, 1)
+    assert restored.transport == kwargs.get("transport", "csv")
+    # missing values are restored from the CSV files as empty strings
+    restored_metrics = restored.process_metrics
+    assert restored_metrics["timestamp"] == [
+        row["timestamp"] for row in snapshot["process_metrics"]
+    ]
+    assert restored_metrics["memory_mib"] == [
+        row["memory_mib"] for row in snapshot["process_metrics"]
+    ]
+
+
+def test_resource_tracker_retention_validation():
+    """Test that unsupported retention settings are rejected."""
+    from resource_tracker import ResourceTracker
+
+    with pytest.raises(ValueError):
+        ResourceTracker(retention=0)
+    with pytest.raises(ValueError):
+        ResourceTracker(retention=10, rollups=(60, 90))
+
+
+def test_agent_usage():
+    """Test that the agent requires a known tracker type."""
+    from resource_tracker.agent import main
+
+    with pytest.raises(SystemExit) as e:
+        main(["foo"])
+    assert e.value.code == 2
@@ -0,0 +1,109 @@
+from os import getpid
+from platform import system
+
+import pytest
+
+from resource_tracker import tracker_cgroup
+
+
+def make_cgroup(tmp_path):
+    """Create a fake cgroup v2 directory with the tracked process in it."""
+    tmp_path.mkdir(parents=True, exist_ok=True)
+    (tmp_path / "cgroup.procs").write_text(f"{getpid()}\n12345\n")
+    (tmp_path / "cpu.stat").write_text(
+        "usage_usec 3500000\nuser_usec 2500000\nsystem_usec 1000000\n"
+    )
+    (tmp_path / "memory.current").write_text(f"{300 * 1024**2}\n")
+    (tmp_path / "memory.stat").write_text(
+        f"anon {200 * 1024**2}\nfile {100 * 1024**2}\ninactive_file {50 * 1024**2}\n"
+    )
+    (tmp_path / "io.stat").write_text(
+        "8:0 rbytes=1000 wbytes=2000 rios=1 wios=2 dbytes=0 dios=0\n"
+        "259:0 rbytes=10 wbytes=20 rios=1 wios=2 dbytes=0 dios=0\n"
+    )
+    return str(tmp_path)
+
+
+@pytest.fixture
+def cgroup(tmp_path):
+    """Path of a fake cgroup v2 directory."""
+    return make_cgroup(tmp_path)
+
+
+def test_get_cgroup_stats(cgroup):
+    """Test parsing the cgroup v2 accounting files."""
+    stats = tracker_cgroup.get_cgroup_stats(cgroup)
+    assert stats == {
+        "utime": 2.5,
+        "stime": 1.0,
+        "memory_mib": 250,
+        "disk_read_bytes": 1010,
+        "disk_write_bytes": 2020,
+    }
+
+
+def test_get_process_stats_cgroup(cgroup):
+    """Test collecting process stats from the cgroup of the process."""
+    stats = tracker_cgroup.get_process_stats(getpid(), cgroup=cgroup)
+    assert stats["children"] == 1
+    assert stats["utime"] == 2.5
+    assert stats["memory_mib"] == 250
+    # memory is reported as 0 once the tracked process left the cgroup
+    assert tracker_cgroup.get_process_stats(1, cgroup=cgroup)["memory_mib"] == 0
+
+
+@pytest.mark.skipif(system() != "Linux", reason="cgroups are specific to Linux")
+def test_get_process_cgroup(tmp_path, monkeypatch):
+    """Test finding the cgroup of a process."""
+    with open(f"/proc/{getpid()}/cgroup") as f:
+        cgroup_path = [line[3:].strip() for line in f if line.startswith("0::")]
+    if not cgroup_path:
+        pytest.skip("No cgroup v2 hierarchy")
+    mount = tmp_path / "cgroup2"
+    monkeypatch.setattr(tracker_cgroup, "get_cgroup2_mount", lambda: str(mount))
+    # no accounting files yet
+    assert tracker_cgroup.get_process_cgroup(getpid()) is None
+    cgroup = make_cgroup(mount / cgroup_path[0].lstrip("/"))
+    assert tracker_cgroup.get_process_cgroup(getpid()).rstrip("/") == cgroup
+
+
+@pytest.mark.skipif(system() != "Linux", reason="cgroups are specific to Linux")
+def test_process_tracker_cgroup():
+    """Test that the process tracker uses or falls back from cgroup accounting."""
+    from resource_tracker import ProcessTracker
+
+    tracker = ProcessTracker(autostart=False, process_accounting="cgroup")
+    assert tracker.process_accounting in ("tree", "cgroup")
+    assert tracker.diff_stats()["memory_mib"] > 0
+
+
+@pytest.mark.skipif(system() != "Linux", reason="cgroups are specific to Linux")
+def test_process_tracker_cgroup_exit(tmp_path, monkeypatch):
+    """Test that the exit of the process is detected while the cgroup is still used."""
+    from subprocess import Popen
+    from threading import Event, Thread
+
+    from resource_tracker import ProcessTracker
+
+    process = Popen(["sleep", "0.3"])
+    cgroup = make_cgroup(tmp_path / "cgroup")
+    # the cgroup is still charged for memory after the process exited
+    (tmp_path / "cgroup" / "cgroup.procs").write_text(f"{process.pid}\n{getpid()}\n")
+    monkeypatch.setattr(tracker_cgroup, "get_process_cgroup", lambda pid: cgroup)
+    assert tracker_cgroup.is_process_running(process.pid)
+    stop_event = Event()
+    tracker = ProcessTracker(
+        pid=process.pid,
+        interval=0.1,
+        autostart=False,
+        process_accounting="cgroup",
+        stop_event=stop_event,
+    )
+    assert tracker.process_accounting == "cgroup"
+    thread = Thread(target=tracker.start_tracking, args=(str(tmp_path / "out.csv"),))
+    thread.start()
+    process.wait()
+    thread.join(timeout=5)
+    stop_event.set()
+    assert not tracker_cgroup.is_process_running(process.pid)
+    assert tracker.status == "exited"